@@ -4,9 +4,32 @@ A Streamlit application to help Security Engineers onboard log sources into Splu
 Supports multiple AI backends: Groq (free), HuggingFace (free), Claude (paid), Ollama (local).
 """
 
+import html
+import os
+import shutil
+import tempfile
+import time
+from contextlib import nullcontext
+
 import streamlit as st
 from utils.kb_loader import KBLoader
+from utils.kb_watcher import KBWatcher
+from utils.source_picker import SourceTypeahead
+from utils.kb_tables import KBTableStore
+from utils.fast_answer import FastAnswerEngine
+from utils.kb_index import KBSearchIndex
+from utils.citations import CitationIndex, format_sources
+from utils.prefetch import Prefetcher
+from utils.cascade import ESCALATION_REASONS, CascadeClient
+from utils.config_generator import ConfigGenerator
+from utils.log_analyzer import LogAnalyzer
+from utils.link_validator import LinkValidator, BROKEN_STATUSES, format_checked_at
+from utils.fanout import FanOutRunner
+from utils.response_cache import ResponseCache
+from utils.usage_ledger import UsageLedger
 from utils.ai_client import AIClientFactory, BaseAIClient
+from utils.telemetry import trace
+from utils.profiler import RerunProfiler, instrument_module_functions, profiling_enabled
 
 # Page configuration
 st.set_page_config(
@@ -16,6 +39,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Opt-in rerun profiler (SIEM_PROFILE=1): times the sidebar, each tab and the spans inside them
+profiler = None
+if profiling_enabled():
+    instrument_module_functions(st, ["markdown"])
+    if "profiler" not in st.session_state:
+        st.session_state.profiler = RerunProfiler()
+    profiler = st.session_state.profiler
+    profiler.start()
+
+def section(name: str):
+    """Profiler section for a block of the script (no-op unless profiling)."""
+    return profiler.section(name) if profiler is not None else nullcontext()
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -114,9 +150,118 @@ if "selected_provider" not in st.session_state:
     st.session_state.selected_provider = None
 if "ai_client" not in st.session_state:
     st.session_state.ai_client = None
+if "recent_sources" not in st.session_state:
+    st.session_state.recent_sources = []
+
+# Initialize KB Loader (shared by all sessions and kept in sync with kb/ edits)
+@st.cache_resource
+def get_kb_loader() -> KBLoader:
+    """Create the shared KB loader and start the hot-reload watcher."""
+    loader = KBLoader()
+    BaseAIClient.invalidate_prompts_on_change(loader)
+    KBWatcher(loader).start()
+    return loader
+
+kb_loader = get_kb_loader()
+
+@st.cache_resource
+def get_source_picker() -> SourceTypeahead:
+    """Build the typeahead index over the catalog, rebuilt when the KB changes."""
+    picker = SourceTypeahead(kb_loader.get_available_sources())
+    kb_loader.add_change_listener(lambda slugs: picker.build(kb_loader.get_available_sources()))
+    return picker
+
+source_picker = get_source_picker()
+
+@st.cache_resource
+def get_table_store() -> KBTableStore:
+    """Parse the KB tables once; the store follows KB edits on its own."""
+    return KBTableStore(kb_loader).load_all()
+
+table_store = get_table_store()
+fast_answer_engine = FastAnswerEngine(table_store)
+
+@st.cache_resource
+def get_citation_index() -> CitationIndex:
+    """N-gram index linking AI answers to KB sections, rebuilt per KB version."""
+    return CitationIndex(kb_loader)
+
+citation_index = get_citation_index()
+
+@st.cache_resource
+def get_search_index() -> KBSearchIndex:
+    """BM25 index the model cascade retrieves KB sections from; sources are indexed on first use."""
+    return KBSearchIndex(kb_loader)
+
+search_index = get_search_index()
 
-# Initialize KB Loader
-kb_loader = KBLoader()
+@st.cache_resource
+def get_prefetcher() -> Prefetcher:
+    """Background warm-up of newly selected sources, shared by all sessions."""
+    return Prefetcher(kb_loader, [citation_index.prepare, search_index.index_source])
+
+prefetcher = get_prefetcher()
+
+def citation_link_base(source_slug: str) -> str:
+    """Page that citation anchors point into: the static site export when
+    SIEM_SITE_URL is set, otherwise the current page."""
+    site_url = os.environ.get("SIEM_SITE_URL", "").rstrip("/")
+    return f"{site_url}/sources/{source_slug}.html" if site_url else ""
+
+@st.cache_resource
+def get_config_generator() -> ConfigGenerator:
+    """Shared generator so compiled bundles are reused across sessions."""
+    return ConfigGenerator(kb_loader, table_store)
+
+config_generator = get_config_generator()
+
+@st.cache_resource
+def get_link_validator() -> LinkValidator:
+    """Shared validator; results persist in .cache/link_status.json across restarts."""
+    return LinkValidator.for_loader(kb_loader)
+
+link_validator = get_link_validator()
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Persistent answer cache, also filled by the nightly batch runner."""
+    cache = ResponseCache.for_loader(kb_loader)
+    BaseAIClient.response_cache = cache
+    return cache
+
+response_cache = get_response_cache()
+
+@st.cache_resource
+def get_usage_ledger() -> UsageLedger:
+    """Token and latency ledger shared with the API and batch runner (python -m utils.usage_ledger)."""
+    ledger = UsageLedger.for_loader(kb_loader)
+    BaseAIClient.usage_ledger = ledger
+    return ledger
+
+usage_ledger = get_usage_ledger()
+
+def link_badge(url: str) -> str:
+    """Status icon for a reference link from the last validation run."""
+    result = link_validator.get_status(url)
+    if result is None:
+        return ""
+    if result["status"] == "ok":
+        return ' <span title="Link checked OK">✅</span>'
+    label = result["detail"] or result["status"]
+    icon = "❌" if result["status"] in BROKEN_STATUSES else "⚠️"
+    return f' <span title="{html.escape(label, quote=True)}">{icon}</span>'
+
+def comparison_rows(results):
+    """Table rows for the multi-source comparison view."""
+    return [
+        {
+            "Source": result["display_name"],
+            "Answer": result["response"] or f"⚠️ {result['message']}",
+            "Via": "⚡ KB" if result["fast_path"] else "🤖 AI",
+            "Seconds": result["elapsed_seconds"]
+        }
+        for result in results
+    ]
 
 # Helper function to get secrets safely
 def get_secrets_dict():
@@ -136,11 +281,14 @@ def get_secrets_dict():
     return secrets
 
 # Helper function to initialize AI client
-def initialize_ai_client(provider: str, secrets: dict) -> BaseAIClient:
-    """Initialize AI client for the selected provider."""
+def initialize_ai_client(provider: str, secrets: dict, cascade: bool = False) -> BaseAIClient:
+    """Initialize AI client for the selected provider, optionally as a small-to-large model cascade."""
     provider_info = AIClientFactory.PROVIDERS.get(provider, {})
     key_name = provider_info.get("key_name")
     
+    if cascade and (provider == "ollama" or (key_name and secrets.get(key_name))):
+        return CascadeClient.for_provider(provider, secrets.get(key_name) if key_name else None, kb_loader,
+                                          search_index=search_index, citation_index=citation_index)
     if provider == "ollama":
         return AIClientFactory.create_client("ollama")
     elif key_name and secrets.get(key_name):
@@ -148,7 +296,7 @@ def initialize_ai_client(provider: str, secrets: dict) -> BaseAIClient:
     return None
 
 # Sidebar
-with st.sidebar:
+with st.sidebar, section("sidebar"):
     st.image("https://img.icons8.com/color/96/000000/security-checked.png", width=80)
     st.markdown("## 🛡️ SIEM Onboarding")
     st.markdown("---")
@@ -156,18 +304,48 @@ with st.sidebar:
     # Log source selection
     st.markdown("### 📋 Select Log Source")
     log_sources = kb_loader.get_available_sources()
+    if not log_sources:
+        st.warning(f"⚠️ No log sources found. Add KB guides to `{kb_loader.kb_path}/` to get started.")
+        st.stop()
+    
+    # Typeahead: only the top matches are sent to the browser, recent sources first
+    source_query = st.text_input(
+        "Search sources:",
+        placeholder="Name, vendor, category or sourcetype",
+        key="source_query"
+    )
+    matching_sources = source_picker.search(
+        source_query,
+        recent=st.session_state.recent_sources,
+        top_k=20
+    )
+    if not matching_sources:
+        st.caption("No matching sources.")
+    # A query that filters out the current source must not switch to another
+    # one (and clear the chat); it stays selected until the user picks a match
+    current = st.session_state.selected_source
+    if current in log_sources and current not in matching_sources:
+        matching_sources = [current] + matching_sources
+    elif not matching_sources:
+        matching_sources = [next(iter(log_sources))]
+    
+    current_index = 0
+    if current in matching_sources:
+        current_index = matching_sources.index(current)
     
     selected_source = st.selectbox(
         "Choose a log source to onboard:",
-        options=list(log_sources.keys()),
-        format_func=lambda x: log_sources[x]["display_name"],
-        key="source_selector"
+        options=matching_sources,
+        index=current_index,
+        format_func=lambda x: log_sources[x]["display_name"]
     )
     
     # Update session state when source changes
     if st.session_state.selected_source != selected_source:
         st.session_state.selected_source = selected_source
         st.session_state.chat_history = []  # Clear chat when source changes
+        recent = [slug for slug in st.session_state.recent_sources if slug != selected_source]
+        st.session_state.recent_sources = ([selected_source] + recent)[:10]
     
     st.markdown("---")
     
@@ -194,18 +372,49 @@ with st.sidebar:
             key="provider_selector"
         )
         
-        # Initialize client if provider changed
-        if st.session_state.selected_provider != selected_provider:
+        cascade_enabled = False
+        if providers[selected_provider].get("models"):
+            cascade_enabled = st.checkbox(
+                "🪜 Small model first",
+                value=False,
+                key="cascade_enabled",
+                help=f"Answer with {providers[selected_provider]['models']['small']} on the matching KB "
+                     f"sections and only ask {providers[selected_provider]['models']['large']} when the "
+                     "small model is unsure or its answer does not match the KB."
+            )
+        
+        # Initialize client if provider (or cascade mode) changed
+        if (st.session_state.selected_provider != selected_provider
+                or st.session_state.get("cascade_active", False) != cascade_enabled):
             st.session_state.selected_provider = selected_provider
-            st.session_state.ai_client = initialize_ai_client(selected_provider, secrets)
+            st.session_state.cascade_active = cascade_enabled
+            st.session_state.ai_client = initialize_ai_client(selected_provider, secrets, cascade_enabled)
             st.session_state.chat_history = []
         
         if st.session_state.ai_client:
             st.success(f"✅ {st.session_state.ai_client.get_provider_name()}")
+        
+        st.checkbox(
+            "⚡ Instant answers from KB",
+            value=True,
+            key="fast_answers_enabled",
+            help="Answer lookup questions (ports, sourcetypes, indexes, add-ons, log types) "
+                 "directly from the KB tables and only call the AI when unsure."
+        )
     else:
         st.warning("⚠️ No AI configured")
         st.markdown("Add an API key in Settings → Secrets")
     
+    # Prepare the selected source (KB, indices, prompt, provider cache) in the
+    # background so the first question is answered as fast as later ones;
+    # switching again cancels the previous prefetch
+    prefetch_key = (selected_source, st.session_state.selected_provider, st.session_state.get("cascade_active"))
+    if st.session_state.get("prefetch_key") != prefetch_key:
+        st.session_state.prefetch_key = prefetch_key
+        st.session_state.prefetch_task = prefetcher.prefetch(
+            selected_source, st.session_state.ai_client, previous=st.session_state.get("prefetch_task")
+        )
+    
     st.markdown("---")
     
     # Quick navigation
@@ -233,10 +442,13 @@ st.markdown('<p class="main-header">🛡️ SIEM Log Source Onboarding Assistant
 st.markdown(f'<p class="sub-header">Currently viewing: <strong>{log_sources[selected_source]["display_name"]}</strong></p>', unsafe_allow_html=True)
 
 # Create tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📘 Integration Guide", "🔗 References", "💬 AI Chat", "⚙️ AI Setup"])
+tab1, tab2, tab3, tab_config, tab_analyzer, tab_sizing, tab_network, tab4 = st.tabs(
+    ["📘 Integration Guide", "🔗 References", "💬 AI Chat", "🧩 Config Generator", "🔍 Log Analyzer",
+     "📐 Sizing", "🌐 Connectivity", "⚙️ AI Setup"]
+)
 
 # Tab 1: Integration Guide
-with tab1:
+with tab1, section("tab.guide"):
     kb_content = kb_loader.load_kb_content(selected_source)
     
     if kb_content["success"]:
@@ -251,13 +463,13 @@ with tab1:
                 <li>Create a file named <code>kb/{selected_source}.md</code></li>
                 <li>Follow the KB template structure (see README.md)</li>
                 <li>Add references in <code>kb/references.json</code></li>
-                <li>Restart the application</li>
             </ol>
+            <p>Changes under <code>kb/</code> are picked up automatically; no restart is needed.</p>
         </div>
         """, unsafe_allow_html=True)
 
 # Tab 2: References
-with tab2:
+with tab2, section("tab.references"):
     references = kb_loader.get_references(selected_source)
     
     st.markdown(f"### 📚 Resources for {log_sources[selected_source]['display_name']}")
@@ -265,13 +477,31 @@ with tab2:
     if references["success"]:
         ref_data = references["data"]
         
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            check_links = st.button("🔎 Check links", help="Validate these links (cached results are reused)")
+        if check_links:
+            with st.spinner("Checking links..."):
+                link_validator.validate_references(kb_loader, [selected_source])
+        
+        statuses = [link_validator.get_status(entry["url"]) for entries in ref_data.values() for entry in entries]
+        checked = [status for status in statuses if status is not None]
+        with col2:
+            if checked:
+                broken_links = [status for status in checked if status["status"] in BROKEN_STATUSES]
+                last_checked = format_checked_at(max(status["checked_at"] for status in checked))
+                if broken_links:
+                    st.warning(f"{len(broken_links)} of {len(statuses)} links look broken (last checked {last_checked}).")
+                else:
+                    st.caption(f"All {len(checked)} checked links OK (last checked {last_checked}).")
+        
         # Official Documentation
         st.markdown("#### 📄 Official Documentation")
         if ref_data.get("official_docs"):
             for doc in ref_data["official_docs"]:
                 st.markdown(f"""
                 <div class="reference-card">
-                    <a href="{doc['url']}" target="_blank">📌 {doc['title']}</a>
+                    <a href="{doc['url']}" target="_blank">📌 {doc['title']}</a>{link_badge(doc['url'])}
                 </div>
                 """, unsafe_allow_html=True)
         else:
@@ -287,7 +517,7 @@ with tab2:
                 with cols[idx % 2]:
                     st.markdown(f"""
                     <div class="reference-card">
-                        <a href="{video['url']}" target="_blank">▶️ {video['title']}</a>
+                        <a href="{video['url']}" target="_blank">▶️ {video['title']}</a>{link_badge(video['url'])}
                     </div>
                     """, unsafe_allow_html=True)
         else:
@@ -301,7 +531,7 @@ with tab2:
             for blog in ref_data["blogs_optional"]:
                 st.markdown(f"""
                 <div class="reference-card">
-                    <a href="{blog['url']}" target="_blank">📖 {blog['title']}</a>
+                    <a href="{blog['url']}" target="_blank">📖 {blog['title']}</a>{link_badge(blog['url'])}
                 </div>
                 """, unsafe_allow_html=True)
     else:
@@ -314,11 +544,63 @@ with tab2:
         """, unsafe_allow_html=True)
 
 # Tab 3: AI Chat
-with tab3:
+with tab3, section("tab.chat"):
     st.markdown("### 💬 Ask Questions About This Integration")
     
-    if st.session_state.ai_client:
+    compare_mode = st.checkbox(
+        "🔀 Compare across sources",
+        key="fanout_mode",
+        help="Ask one question about several sources at once and compare the answers side by side"
+    )
+    
+    if st.session_state.ai_client and compare_mode:
+        compare_sources = st.multiselect(
+            "Sources to compare",
+            options=list(log_sources.keys()),
+            default=[selected_source] if selected_source in log_sources else [],
+            format_func=lambda slug: log_sources[slug]["display_name"],
+            key="fanout_sources"
+        )
+        with st.form(key="fanout_form"):
+            compare_question = st.text_input(
+                "Question for every source:",
+                placeholder="e.g., Does this source need a Heavy Forwarder?"
+            )
+            compare_button = st.form_submit_button("Compare 🔀")
+        
+        if compare_button and compare_question.strip() and compare_sources:
+            runner = FanOutRunner(
+                kb_loader, st.session_state.ai_client,
+                fast_answer_engine if st.session_state.get("fast_answers_enabled", True) else None
+            )
+            st.caption(f"Asking {len(compare_sources)} sources, up to {runner.max_workers} at a time...")
+            table_placeholder = st.empty()
+            fanout_results = {}
+            for result in runner.run(compare_question, compare_sources):
+                fanout_results[result["source"]] = result
+                table_placeholder.dataframe(
+                    comparison_rows([fanout_results[slug] for slug in compare_sources if slug in fanout_results]),
+                    use_container_width=True
+                )
+            table_placeholder.empty()
+            st.session_state.fanout_results = {
+                "question": compare_question,
+                "results": [fanout_results[slug] for slug in compare_sources]
+            }
+        
+        last_comparison = st.session_state.get("fanout_results")
+        if last_comparison:
+            st.markdown(f"#### {last_comparison['question']}")
+            st.dataframe(comparison_rows(last_comparison["results"]), use_container_width=True)
+            for result in last_comparison["results"]:
+                with st.expander(result["display_name"]):
+                    st.markdown(result["response"] or f"⚠️ {result['message']}")
+    elif st.session_state.ai_client:
         st.markdown(f"*Using **{st.session_state.ai_client.get_provider_name()}** to answer questions about **{log_sources[selected_source]['display_name']}** integration.*")
+        prefetch_task = st.session_state.get("prefetch_task")
+        if (prefetch_task is not None and prefetch_task.done() and not prefetch_task.error
+                and not st.session_state.chat_history):
+            st.caption(f"🔥 Prepared in the background: {prefetch_task.describe()}")
         
         # Display chat history
         for message in st.session_state.chat_history:
@@ -329,11 +611,23 @@ with tab3:
                 </div>
                 """, unsafe_allow_html=True)
             else:
+                author = "⚡ KB" if message.get("fast_path") else ("🤖 AI (cached)" if message.get("cached") else "🤖 AI")
                 st.markdown(f"""
                 <div class="chat-message assistant-message">
-                    <strong>🤖 AI:</strong><br>{message["content"]}
+                    <strong>{author}:</strong><br>{message["content"]}
                 </div>
                 """, unsafe_allow_html=True)
+                if message.get("sources"):
+                    st.caption(f"📎 {message['sources']}")
+                if message.get("ungrounded"):
+                    st.caption("⚠️ Little of this answer matches the KB. Check it against the Integration Guide.")
+                if message.get("tier") == "small":
+                    st.caption(f"🪜 Answered by {message['model']}")
+                elif message.get("tier") == "large":
+                    st.caption(f"🪜 Escalated to {message['model']}: "
+                               f"{ESCALATION_REASONS.get(message['escalation_reason'], message['escalation_reason'])}")
+                if message.get("timings"):
+                    st.caption(f"⏱️ {message['timings']}")
         
         # Chat input
         with st.form(key="chat_form", clear_on_submit=True):
@@ -358,23 +652,48 @@ with tab3:
                 "content": user_question
             })
             
-            # Get KB content for context
-            kb_data = kb_loader.load_kb_content(selected_source)
-            kb_context = kb_data["content"] if kb_data["success"] else "No KB content available for this source."
-            
-            # Get AI response
-            with st.spinner("AI is thinking..."):
-                response = st.session_state.ai_client.get_response(
-                    question=user_question,
-                    kb_content=kb_context,
-                    source_name=log_sources[selected_source]["display_name"],
-                    chat_history=st.session_state.chat_history[:-1]
-                )
+            # Spans from KB loading, prompt building and the provider call land in chat_trace
+            with trace("chat") as chat_trace:
+                # Lookup questions are answered from the KB tables without an LLM call
+                response = {"success": False}
+                if st.session_state.get("fast_answers_enabled", True):
+                    response = fast_answer_engine.answer(selected_source, user_question)
+                fast_path = response["success"]
+                
+                if not fast_path:
+                    # Get KB content for context
+                    kb_data = kb_loader.load_kb_content(selected_source)
+                    kb_context = kb_data["content"] if kb_data["success"] else "No KB content available for this source."
+                    
+                    # Get AI response
+                    with st.spinner("AI is thinking..."):
+                        response = st.session_state.ai_client.get_cached_response(
+                            question=user_question,
+                            kb_content=kb_context,
+                            source_name=log_sources[selected_source]["display_name"],
+                            chat_history=st.session_state.chat_history[:-1]
+                        )
             
             if response["success"]:
+                # Fast-path answers already end with their source line
+                grounding = {"citations": [], "ungrounded": False}
+                if not fast_path:
+                    grounding = citation_index.cite(selected_source, response["response"])
+                    if not response.get("cached") and response.get("tier") != "small":
+                        # The call refreshed the provider's prompt cache
+                        prefetcher.mark_used(st.session_state.ai_client,
+                                             log_sources[selected_source]["display_name"], kb_context)
                 st.session_state.chat_history.append({
                     "role": "assistant",
-                    "content": response["response"]
+                    "content": response["response"],
+                    "fast_path": fast_path,
+                    "cached": response.get("cached", False),
+                    "sources": format_sources(grounding["citations"], citation_link_base(selected_source)),
+                    "ungrounded": grounding["ungrounded"],
+                    "model": response.get("model"),
+                    "tier": response.get("tier"),
+                    "escalation_reason": response.get("escalation_reason"),
+                    "timings": chat_trace.describe()
                 })
             else:
                 st.error(f"Error: {response['message']}")
@@ -389,8 +708,288 @@ with tab3:
         </div>
         """, unsafe_allow_html=True)
 
+# Config Generator Tab
+with tab_config, section("tab.config"):
+    st.markdown(f"### 🧩 Splunk Configuration for {log_sources[selected_source]['display_name']}")
+    st.markdown("Generated instantly from the KB's index, sourcetypes, ports and collection method. "
+                "The same KB always produces the same files.")
+    
+    bundle = config_generator.generate(selected_source)
+    
+    if bundle["success"]:
+        st.caption(f"Collection method: {', '.join(bundle['methods'])}")
+        st.download_button(
+            "⬇️ Download bundle (.zip)",
+            data=config_generator.bundle_zip(selected_source),
+            file_name=f"{selected_source}_splunk_config.zip",
+            mime="application/zip"
+        )
+        
+        for file_name, text in bundle["files"].items():
+            st.markdown(f"#### `{file_name}`")
+            st.code(text, language="ini")
+        
+        if st.session_state.ai_client and st.button("🤖 Explain this configuration"):
+            kb_data = kb_loader.load_kb_content(selected_source)
+            configs = "\n\n".join(f"{name}:\n{text}" for name, text in bundle["files"].items())
+            with st.spinner("AI is thinking..."):
+                explanation = st.session_state.ai_client.get_response(
+                    question="Explain what each stanza in this generated Splunk configuration does "
+                             "and what placeholders must be filled in:\n\n" + configs,
+                    kb_content=kb_data["content"] if kb_data["success"] else "",
+                    source_name=log_sources[selected_source]["display_name"]
+                )
+            if explanation["success"]:
+                st.markdown(explanation["response"])
+            else:
+                st.error(f"Error: {explanation['message']}")
+    else:
+        st.warning(bundle["message"])
+
+# Log Analyzer Tab
+with tab_analyzer, section("tab.analyzer"):
+    st.markdown("### 🔍 Validate a Sample Log")
+    st.markdown("Upload a raw log sample (syslog, Windows event export, audit log) to detect which source "
+                "and sourcetype it matches and how much of it parses. For multi-GB files use "
+                "`python -m utils.log_analyzer <file> --expect <source>`.")
+    
+    uploaded_sample = st.file_uploader("Log sample", key="log_sample")
+    
+    if uploaded_sample is not None:
+        # Spool to disk so the analyzer can memory-map it instead of holding a copy
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as spool:
+            shutil.copyfileobj(uploaded_sample, spool, length=1024 * 1024)
+        try:
+            with st.spinner("Analyzing sample..."):
+                analysis = LogAnalyzer(kb_loader).analyze_file(spool.name, expected_source=selected_source)
+        finally:
+            os.unlink(spool.name)
+        
+        if not analysis["success"]:
+            st.error(analysis["message"])
+        else:
+            detected = analysis["detected_source"]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Lines", f"{analysis['lines']:,}")
+            col2.metric("Parse rate", f"{analysis['parse_rate']:.1%}")
+            col3.metric("Detected source", log_sources.get(detected, {}).get("display_name", detected or "Unknown"))
+            col4.metric("Sourcetype", analysis["detected_sourcetype"] or "Unknown")
+            
+            if analysis.get("matches_kb"):
+                st.success(f"✅ Sample matches the KB for {log_sources[selected_source]['display_name']}.")
+            else:
+                st.warning(f"⚠️ Sample does not match what the KB for "
+                           f"{log_sources[selected_source]['display_name']} says should arrive.")
+            if analysis.get("unexpected_sourcetypes"):
+                st.caption("Sourcetypes not listed in the KB: " + ", ".join(analysis["unexpected_sourcetypes"]))
+            
+            st.markdown("#### Formats")
+            st.dataframe(
+                [
+                    {
+                        "Format": name,
+                        "Source": info["source"],
+                        "Lines": info["lines"],
+                        "Parsed": info["parsed"],
+                        "Parse rate": f"{info['parse_rate']:.1%}",
+                        "Fields": ", ".join(info["fields"])
+                    }
+                    for name, info in analysis["formats"].items()
+                ],
+                use_container_width=True
+            )
+            
+            for name, info in analysis["formats"].items():
+                with st.expander(f"Extracted fields: {name}"):
+                    st.json({"top_values": info["top_values"], "samples": info["samples"]})
+            if analysis["unmatched_samples"]:
+                with st.expander(f"Unrecognized lines ({analysis['unmatched']:,})"):
+                    st.code("\n".join(analysis["unmatched_samples"]))
+
+# Sizing Tab
+with tab_sizing, section("tab.sizing"):
+    st.markdown(f"### 📐 Sizing: {log_sources[selected_source]['display_name']}")
+    st.markdown("Estimate events per second, daily license volume, indexers and storage. "
+                "Rates start from planning defaults per log type priority; replace them with measured values.")
+    
+    # Streamlit runs every tab body on each rerun; the calculator imports NumPy,
+    # most of the app's import time, so it only loads once asked for
+    sizing_enabled = st.checkbox("📐 Estimate sizing", key="sizing_enabled",
+                                 help="Load the sizing calculator for the selected source")
+    if not sizing_enabled:
+        st.info("Tick **📐 Estimate sizing** to size this source.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sizing_devices = st.number_input("Devices", min_value=1, value=10, step=1, key="sizing_devices")
+            sizing_retention = st.number_input("Retention (days)", min_value=1, value=90, step=1, key="sizing_retention")
+        with col2:
+            sizing_rf = st.number_input("Replication factor", min_value=1, max_value=5, value=1, key="sizing_rf")
+            sizing_sf = st.number_input("Search factor", min_value=1, max_value=5, value=1, key="sizing_sf")
+        with col3:
+            sizing_capacity = st.number_input("GB/day per indexer", min_value=10, value=250, step=10,
+                                              key="sizing_capacity")
+            sizing_peak = st.number_input("Peak / average EPS", min_value=1.0, value=3.0, step=0.5,
+                                          key="sizing_peak")
+    
+        from utils.sizing import SizingCalculator
+        sizing_calculator = SizingCalculator(table_store)
+        sizing_profile = sizing_calculator.profile(selected_source)
+        edited_rates = st.data_editor(
+            [
+                {"Log type": name, "Priority": priority, "Enabled": True,
+                 "EPS per device": float(rate), "Event size (bytes)": int(size)}
+                for name, priority, rate, size in zip(
+                    sizing_profile["log_types"], sizing_profile["priorities"],
+                    sizing_profile["eps"], sizing_profile["event_bytes"]
+                )
+            ],
+            disabled=["Log type", "Priority"],
+            use_container_width=True,
+            key=f"sizing_rates_{selected_source}"
+        )
+    
+        # Cleared cells come back as None; leave them out so the default applies
+        sizing_overrides = {
+            row["Log type"]: {
+                key: row[column]
+                for key, column in (("eps", "EPS per device"), ("event_bytes", "Event size (bytes)"),
+                                    ("enabled", "Enabled"))
+                if row[column] is not None
+            }
+            for row in edited_rates
+        }
+        sizing_parameters = {
+            "retention_days": sizing_retention,
+            "replication_factor": sizing_rf,
+            "search_factor": sizing_sf,
+            "indexer_capacity_gb": sizing_capacity,
+            "peak_factor": sizing_peak
+        }
+        estimate = sizing_calculator.estimate(selected_source, sizing_devices, sizing_overrides, **sizing_parameters)
+    
+        if estimate["success"]:
+            totals = estimate["totals"]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Average EPS", f"{totals['avg_eps']:,.0f}", help=f"Peak ≈ {totals['peak_eps']:,.0f} EPS")
+            col2.metric("License volume", f"{totals['gb_per_day']:,.2f} GB/day")
+            col3.metric("Indexers", totals["indexers"])
+            col4.metric("Storage", f"{totals['storage_gb']:,.0f} GB")
+        
+            st.markdown("#### Volume by Log Type")
+            st.bar_chart({row["log_type"]: row["gb_per_day"] for row in estimate["log_types"]})
+        
+            st.markdown("#### Sensitivity (±50%)")
+            sensitivity = sizing_calculator.sensitivity(
+                selected_source, {**sizing_parameters, "devices": sizing_devices}, metric="storage_gb",
+                overrides=sizing_overrides
+            )
+            st.dataframe(
+                [
+                    {"Parameter": item["parameter"], "Storage at -50% (GB)": round(item["low"], 1),
+                     "Storage at +50% (GB)": round(item["high"], 1), "Swing (GB)": round(item["swing"], 1)}
+                    for item in sensitivity
+                ],
+                use_container_width=True
+            )
+        
+            st.markdown("#### Growth Sweep")
+            eps_scales = (0.5, 1.0, 2.0, 3.0)
+            device_range = list(range(1, max(int(sizing_devices) * 4, 20) + 1))
+            grid = sizing_calculator.scenario_grid(
+                selected_source, sizing_overrides, eps_scale=eps_scales, devices=device_range,
+                **{name: [value] for name, value in sizing_parameters.items()}
+            )
+            gb_by_scale = grid["gb_per_day"].reshape(len(eps_scales), len(device_range))
+            st.line_chart(
+                {"Devices": device_range,
+                 **{f"{scale:g}x EPS (GB/day)": gb_by_scale[i] for i, scale in enumerate(eps_scales)}},
+                x="Devices"
+            )
+        else:
+            st.error(estimate["message"])
+
+# Connectivity Tab
+with tab_network, section("tab.connectivity"):
+    st.markdown("### 🌐 Connectivity Checks")
+    st.markdown("Probes the flows from each KB's *Network Connectivity Requirements* table from this machine. "
+                "Map the KB roles to your hosts below; SaaS endpoints named in the KB are probed directly.")
+    
+    network_sources = st.multiselect(
+        "Sources",
+        options=list(log_sources.keys()),
+        default=[selected_source],
+        format_func=lambda slug: log_sources[slug]["display_name"],
+        key="network_sources"
+    )
+    inventory_text = st.text_area(
+        "Host inventory",
+        placeholder="Splunk Indexer: idx1.example.com, idx2.example.com\n"
+                    "Splunk HF: hf1.example.com\nDeployment Server: ds.example.com",
+        help="One 'Role: host, host' line per role, or a JSON object of role to host list",
+        key="network_inventory"
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        network_vantage = st.text_input("This machine's role (optional)", placeholder="Splunk HF",
+                                        key="network_vantage")
+    with col2:
+        network_concurrency = st.number_input("Concurrent probes", min_value=1, max_value=2000, value=200,
+                                              key="network_concurrency")
+    with col3:
+        network_timeout = st.number_input("Timeout per probe (s)", min_value=0.5, max_value=30.0, value=3.0,
+                                          step=0.5, key="network_timeout")
+    
+    if st.button("▶️ Run checks", disabled=not network_sources):
+        from utils.connectivity_checker import ConnectivityChecker, parse_inventory, results_matrix
+        try:
+            inventory = parse_inventory(inventory_text)
+        except ValueError as e:
+            st.error(f"Invalid inventory: {str(e)}")
+        else:
+            checker = ConnectivityChecker(table_store, inventory, concurrency=int(network_concurrency),
+                                          timeout=float(network_timeout))
+            probes = checker.plan(network_sources, network_vantage or None)
+            progress = st.progress(0.0, text=f"Running {len(probes)} probes...")
+            matrix_placeholder = st.empty()
+            results = []
+            last_draw = 0.0
+            for result in checker.stream(probes):
+                results.append(result)
+                # Redraw at most a few times per second; every result would thrash the frontend
+                if time.monotonic() - last_draw > 0.25 or len(results) == len(probes):
+                    progress.progress(len(results) / len(probes), text=f"{len(results)}/{len(probes)} probes")
+                    matrix_placeholder.dataframe(results_matrix(results), use_container_width=True)
+                    last_draw = time.monotonic()
+            progress.empty()
+            matrix_placeholder.empty()
+            st.session_state.connectivity_results = results
+    
+    connectivity_results = st.session_state.get("connectivity_results")
+    if connectivity_results:
+        from utils.connectivity_checker import results_matrix, summarize
+        summary = summarize(connectivity_results)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Probes", summary["total"])
+        col2.metric("Passed", summary["passed"])
+        col3.metric("Failed", summary["failed"])
+        col4.metric("Not tested", summary["by_status"].get("skipped", 0) + summary["by_status"].get("unresolved", 0))
+        st.dataframe(results_matrix(connectivity_results), use_container_width=True)
+        st.caption("✅ open · 🔒 TLS handshake OK · ❌ refused/error · ⏱️ timeout · ⚠️ TLS error · "
+                   "❓ DNS failure · ➖ UDP (not testable by connect) · · no inventory hosts")
+        with st.expander("Probe details"):
+            st.dataframe(
+                [
+                    {"Host": result["host"] or "", "Role": result["dst"], "Port": result["port"],
+                     "Probe": result["kind"], "Status": result["status"], "Latency (ms)": result["latency_ms"],
+                     "Detail": result["detail"], "Required by": ", ".join(result["sources"])}
+                    for result in connectivity_results
+                ],
+                use_container_width=True
+            )
+
 # Tab 4: AI Setup
-with tab4:
+with tab4, section("tab.setup"):
     st.markdown("### ⚙️ AI Provider Configuration")
     st.markdown("Configure an AI provider to enable the chat assistant. **Free options available!**")
     
@@ -520,3 +1119,46 @@ st.markdown("""
     🐛 <a href="https://github.com/your-repo/siem-onboarding-app/issues" target="_blank">Report Issues</a></p>
 </div>
 """, unsafe_allow_html=True)
+
+# Rerun profiler panel (only with SIEM_PROFILE=1); rendered after the rerun is recorded
+if profiler is not None:
+    profiler.finish()
+    with st.expander("🧪 Rerun Profiler", expanded=False):
+        stats = profiler.rerun_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Reruns", stats["reruns"], help=f"{stats['interrupted']} interrupted by st.rerun/st.stop")
+        col2.metric("Mean", f"{stats['mean_ms']} ms" if stats["reruns"] else "—")
+        col3.metric("p95", f"{stats['p95_ms']} ms" if stats["reruns"] else "—")
+        col4.metric("Last", f"{stats['last_ms']} ms" if stats["reruns"] else "—")
+        
+        rows = profiler.summary()
+        if rows:
+            st.dataframe(
+                [{
+                    "Section": "\u2003" * row["depth"] + row["section"],
+                    "Mean (ms)": row["mean_ms"],
+                    "Max (ms)": row["max_ms"],
+                    "Calls/rerun": row["calls_per_rerun"],
+                    "Share": row["share"]
+                } for row in rows],
+                column_config={"Share": st.column_config.ProgressColumn(
+                    "Share of rerun", min_value=0, max_value=100, format="%.1f%%")},
+                hide_index=True,
+                use_container_width=True
+            )
+        
+        col1, col2 = st.columns(2)
+        if col1.button("📸 Profile next rerun", help="Run the next rerun under cProfile and save a .pstats file"):
+            profiler.capture_next_rerun()
+            st.rerun()
+        if col2.button("🧹 Reset history"):
+            profiler.records.clear()
+            profiler.interrupted = 0
+        
+        if profiler.last_dump:
+            st.caption(f"Last cProfile dump: `{profiler.last_dump['path']}` "
+                       f"(open with `python -m pstats` or snakeviz)")
+            with open(profiler.last_dump["path"], "rb") as f:
+                st.download_button("⬇️ Download .pstats", f.read(),
+                                   file_name=os.path.basename(profiler.last_dump["path"]))
+            st.code(profiler.last_dump["text"], language=None)
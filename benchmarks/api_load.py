@@ -0,0 +1,213 @@
+"""
+API Load Test
+Drives the headless API (server.py) with a mixed workload against a mock
+LLM provider and reports sustained requests per second and latency
+percentiles per endpoint.
+
+    python -m benchmarks.api_load --workers 2 --concurrency 64 --duration 20
+
+Requires httpx (``pip install httpx``) in addition to the API dependencies.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .mock_llm import MockLLMServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# (name, weight): catalog and search dominate automation traffic; chat is
+# split between fresh questions (cache misses) and repeated FAQ questions
+WORKLOAD = [
+    ("sources", 2),
+    ("section", 2),
+    ("search", 3),
+    ("chat", 2),
+    ("chat_faq", 2),
+    ("chat_stream", 1)
+]
+SEARCH_TERMS = ["syslog port", "sourcetype", "heavy forwarder", "tls 6514", "index", "troubleshooting",
+                "api token", "add-on", "firewall traffic", "event hub"]
+FAQ = ["What are the prerequisites?", "How do I validate the data in Splunk?", "What are the security notes?"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoadTest:
+    """Closed-loop load generator: ``concurrency`` clients issue requests back to back."""
+
+    def __init__(self, base_url: str, concurrency: int, duration: float, token: Optional[str] = None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.duration = duration
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.latencies: Dict[str, List[float]] = {name: [] for name, _ in WORKLOAD}
+        self.first_byte: List[float] = []
+        self.errors: Dict[str, int] = {name: 0 for name, _ in WORKLOAD}
+        self.sources: List[str] = []
+        self.sections: Dict[str, List[str]] = {}
+
+    async def _request(self, client, name: str) -> None:
+        source = random.choice(self.sources)
+        if name == "sources":
+            response = await client.get("/sources")
+        elif name == "section":
+            response = await client.get(f"/sources/{source}/sections",
+                                        params={"section": random.choice(self.sections[source])})
+        elif name == "search":
+            response = await client.get("/search", params={"q": random.choice(SEARCH_TERMS)})
+        elif name == "chat_stream":
+            body = {"source": source, "question": f"Stream check {random.random()}", "use_cache": False}
+            started = time.perf_counter()
+            async with client.stream("POST", "/chat/stream", json=body) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("event: delta") and started is not None:
+                        self.first_byte.append(time.perf_counter() - started)
+                        started = None
+            return response.raise_for_status()
+        else:
+            question = random.choice(FAQ) if name == "chat_faq" else f"Load test question {random.random()}"
+            response = await client.post("/chat", json={"source": source, "question": question,
+                                                        "fast_answer": False})
+        response.raise_for_status()
+
+    async def _worker(self, client, deadline: float, weights: List[int]) -> None:
+        names = [name for name, _ in WORKLOAD]
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                await self._request(client, name)
+                self.latencies[name].append(time.perf_counter() - started)
+            except Exception:
+                self.errors[name] += 1
+
+    async def run(self) -> Dict:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, headers=self.headers, limits=limits,
+                                     timeout=60) as client:
+            catalog = (await client.get("/sources")).json()["sources"]
+            self.sources = [source["slug"] for source in catalog]
+            for slug in self.sources:
+                detail = (await client.get(f"/sources/{slug}")).json()
+                self.sections[slug] = [section["id"] for section in detail["sections"]] or [""]
+
+            weights = [weight for _, weight in WORKLOAD]
+            started = time.perf_counter()
+            deadline = started + self.duration
+            await asyncio.gather(*(self._worker(client, deadline, weights) for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - started
+
+        endpoints = {}
+        for name, values in self.latencies.items():
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 0.5) * 1000, 1) if values else None,
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1) if values else None,
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1) if values else None
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "duration_seconds": round(elapsed, 1),
+            "concurrency": self.concurrency,
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": round(total / elapsed, 1),
+            "stream_ttfb_p50_ms": round(percentile(self.first_byte, 0.5) * 1000, 1) if self.first_byte else None,
+            "endpoints": endpoints
+        }
+
+
+def wait_for(url: str, timeout: float = 60) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"API did not become healthy at {url}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.api_load``."""
+    parser = argparse.ArgumentParser(description="Load test the headless API against a mock LLM provider.")
+    parser.add_argument("--url", help="Test an already running API instead of starting one")
+    parser.add_argument("--token", default=os.environ.get("SIEM_API_TOKEN"), help="API bearer token")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers to start")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of sustained load")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Mock provider seconds per answer")
+    parser.add_argument("--llm-slots", type=int, default=64, help="Concurrent LLM calls per deployment")
+    args = parser.parse_args(argv)
+
+    mock = server = None
+    base_url = args.url
+    cache_dir = tempfile.TemporaryDirectory(prefix="api-load-")
+    try:
+        if base_url is None:
+            mock = MockLLMServer(latency=args.llm_latency).start()
+            port = free_port()
+            env = {
+                **os.environ,
+                "SIEM_API_PROVIDER": "ollama",
+                "OLLAMA_BASE_URL": mock.base_url,
+                # Mock answers must not land in the real response cache
+                "SIEM_CACHE_PATH": cache_dir.name,
+                "SIEM_API_MAX_CONCURRENCY": str(args.llm_slots),
+                "SIEM_API_RPM": "0",
+                "WEB_CONCURRENCY": str(args.workers)
+            }
+            server = subprocess.Popen(
+                # uvicorn starts WEB_CONCURRENCY workers, as in production
+                [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port),
+                 "--log-level", "warning", "--no-access-log"],
+                cwd=REPO_ROOT, env=env
+            )
+            base_url = f"http://127.0.0.1:{port}"
+            wait_for(base_url)
+
+        report = asyncio.run(LoadTest(base_url, args.concurrency, args.duration, args.token).run())
+        if mock is not None:
+            report["provider_requests"] = mock.requests_served
+        print(json.dumps(report, indent=2))
+        return 0 if report["errors"] == 0 else 1
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if mock is not None:
+            mock.stop()
+        cache_dir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Citation Benchmark
+Times ``CitationIndex.cite`` on long synthetic answers (KB sentences mixed
+with unrelated ones) for every source, and fails when the median exceeds a
+per-answer budget.
+
+    python -m benchmarks.citations
+    python -m benchmarks.citations --words 5000 --budget-ms 20
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from utils.citations import CitationIndex, split_sentences
+from utils.kb_loader import KBLoader
+
+DEFAULT_WORDS = 2000
+DEFAULT_RUNS = 20
+DEFAULT_BUDGET_MS = 10.0
+
+UNRELATED = [
+    "Kubernetes pods can be scaled horizontally with the HorizontalPodAutoscaler.",
+    "Remember to rotate your database credentials every quarter.",
+    "A PodDisruptionBudget avoids downtime while nodes are drained.",
+    "Prometheus adapters expose queue depth as a custom metric.",
+]
+
+
+def synthetic_answer(kb_loader: KBLoader, source_slug: str, words: int, seed: int = 0) -> str:
+    """An answer of roughly ``words`` words: three KB sentences for every unrelated one."""
+    rng = random.Random(seed)
+    kb_sentences = [sentence for block in kb_loader.get_kb_section_blocks(source_slug)
+                    for sentence in split_sentences(block["content"]) if len(sentence.split()) > 4]
+    parts: List[str] = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(UNRELATED) if rng.random() < 0.25 else rng.choice(kb_sentences)
+        parts.append(sentence)
+        count += len(sentence.split())
+    return "\n".join(parts)
+
+
+def run(kb_path: str, words: int, runs: int) -> Dict:
+    """
+    Median cite latency per source.
+
+    Returns:
+        Dictionary with 'sources' (per-source median ms and grounding),
+        'build_ms' (median first-use index build) and 'median_ms'
+    """
+    kb_loader = KBLoader(kb_path)
+    index = CitationIndex(kb_loader)
+    results, builds = {}, []
+    for source_slug in kb_loader.get_available_sources():
+        answer = synthetic_answer(kb_loader, source_slug, words)
+        started = time.perf_counter()
+        result = index.cite(source_slug, answer)
+        builds.append((time.perf_counter() - started) * 1000)
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            index.cite(source_slug, answer)
+            samples.append((time.perf_counter() - started) * 1000)
+        results[source_slug] = {"median_ms": round(statistics.median(samples), 2),
+                                "grounding": result["grounding"], "citations": len(result["citations"])}
+    return {
+        "words": words,
+        "sources": results,
+        "build_ms": round(statistics.median(builds), 2),
+        "median_ms": round(statistics.median(row["median_ms"] for row in results.values()), 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.citations``."""
+    parser = argparse.ArgumentParser(description="Time citation linking of long answers.")
+    parser.add_argument("--kb", default="kb", help="KB directory")
+    parser.add_argument("--words", type=int, default=DEFAULT_WORDS, help="Approximate words per answer")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Timed runs per source")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail when the median per-answer time exceeds this")
+    args = parser.parse_args(argv)
+
+    report = run(args.kb, args.words, args.runs)
+    print(json.dumps(report, indent=2))
+    print(f"{args.words}-word answers: {report['median_ms']}ms median per answer "
+          f"(index build {report['build_ms']}ms)", file=sys.stderr)
+    if report["median_ms"] > args.budget_ms:
+        print(f"REGRESSION median {report['median_ms']}ms exceeds the {args.budget_ms}ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
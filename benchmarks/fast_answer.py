@@ -0,0 +1,113 @@
+"""
+Fast-Path Routing Check
+Runs a fixed set of questions through ``FastAnswerEngine`` for every source
+and fails when one is routed the wrong way: a lookup that no longer gets a
+table answer, or a question needing reasoning or advice that gets one
+instead of going to the LLM. Source-specific cases also check what a table
+answer contains, so a question narrowed to one log type or one pair of
+roles does not get the whole table, and a narrowing the tables do not know
+goes to the LLM.
+
+    python -m benchmarks.fast_answer
+    python -m benchmarks.fast_answer --sources palo_alto linux
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+from utils.fast_answer import FastAnswerEngine
+from utils.kb_loader import KBLoader
+from utils.kb_tables import KBTableStore
+
+# Question -> intent expected to be answered from the tables (None: LLM)
+CASES = {
+    "What ports need to be open?": "ports",
+    "What port does syslog use?": "ports",
+    "Which sourcetypes does this source use?": "sourcetype",
+    "What is the sourcetype?": "sourcetype",
+    "What is the index?": "index",
+    "Which index do the logs go to?": "index",
+    "List the required add-ons": "addon",
+    "What log types are there?": "log_types",
+    # Mention an intent noun without asking for it
+    "What happens when the index fills up?": None,
+    "What is the data retention for the index?": None,
+    "What if the sourcetype is wrong in search results?": None,
+    "Which ports should I avoid exposing to the internet?": None,
+    "What TA version is supported on Splunk 9?": None,
+    "How do I configure the inputs for this index?": None,
+    "Why are no events arriving on port 514?": None,
+    "Which sourcetype should I use for firewall logs?": None
+}
+
+# (source, question, expected intent or None, text the answer must contain,
+# text it must not contain)
+SOURCE_CASES = [
+    ("windows_events", "What sourcetype is used for Sysmon events?", None, [], []),
+    ("windows_events", "What sourcetype do Security events use?", "sourcetype",
+     ["WinEventLog:Security"], ["WinEventLog:System"]),
+    ("palo_alto", "Which ports do I need to open between the HF and the indexers?", "ports",
+     ["9997"], ["514"]),
+    ("palo_alto", "What UDP ports are needed?", "ports", ["514", "515"], ["9997"]),
+    ("palo_alto", "Which ports does the deployment server need?", None, [], []),
+    ("windows_events", "What are the high priority log types?", "log_types", ["Security"], ["System"])
+]
+
+
+def run(kb_path: str, sources: Optional[List[str]] = None) -> Dict:
+    """
+    Route every case for every source.
+
+    Returns:
+        Dictionary with 'cases', 'sources' and 'misrouted' (one entry per
+        question and source routed the wrong way)
+    """
+    kb_loader = KBLoader(kb_path)
+    engine = FastAnswerEngine(KBTableStore(kb_loader).load_all())
+    sources = sources or list(kb_loader.get_available_sources())
+    misrouted = []
+    for question, expected in CASES.items():
+        for source_slug in sources:
+            result = engine.answer(source_slug, question)
+            routed = result["intent"] if result["success"] else None
+            # A lookup the source's tables cannot answer still belongs to the
+            # right intent; only the classification is checked for those
+            if expected is not None and not result["success"]:
+                routed = result["intent"] if result["confidence"] >= engine.threshold else None
+            if routed != expected:
+                misrouted.append({"question": question, "source": source_slug, "expected": expected,
+                                  "routed": routed, "confidence": result["confidence"]})
+    for source_slug, question, expected, present, absent in SOURCE_CASES:
+        if source_slug not in sources:
+            continue
+        result = engine.answer(source_slug, question)
+        routed = result["intent"] if result["success"] else None
+        wrong = [text for text in present if text not in result["response"]]
+        wrong += [text for text in absent if text in result["response"]]
+        if routed != expected or wrong:
+            misrouted.append({"question": question, "source": source_slug, "expected": expected,
+                              "routed": routed, "confidence": result["confidence"],
+                              "wrong_content": wrong})
+    return {"cases": len(CASES) + len(SOURCE_CASES), "sources": len(sources), "misrouted": misrouted}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.fast_answer``."""
+    parser = argparse.ArgumentParser(description="Check which questions take the fast answer path.")
+    parser.add_argument("--kb", default="kb", help="KB directory")
+    parser.add_argument("--sources", nargs="+", help="Source slugs to check (default: all)")
+    args = parser.parse_args(argv)
+
+    report = run(args.kb, args.sources)
+    print(json.dumps(report, indent=2))
+    for row in report["misrouted"]:
+        print(f"MISROUTED [{row['source']}] {row['question']!r}: expected {row['expected'] or 'LLM'}, "
+              f"got {row['routed'] or 'LLM'} (confidence {row['confidence']})"
+              + (f", answer wrong about {row['wrong_content']}" if row.get("wrong_content") else ""), file=sys.stderr)
+    return 1 if report["misrouted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Import-Time Benchmark
+Measures the cold-start cost of the modules ``app.py`` imports from
+``utils`` in fresh interpreters and fails when it exceeds a budget, or when
+a module meant to load on first use (provider clients and SDKs, NumPy, the
+connectivity checker) is pulled in eagerly.
+
+The fastest run is compared, not the median: scheduler and disk noise only
+ever add time, so the minimum is the stable estimate of the real cost. With
+``--baseline`` the budget is the saved minimum plus a tolerance, which
+follows the machine instead of a fixed number.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save import_baseline.json
+    python -m benchmarks.import_time --baseline import_baseline.json
+"""
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Milliseconds allowed for the fastest import of the app's utils modules
+# when no baseline is given
+DEFAULT_BUDGET_MS = 200.0
+DEFAULT_RUNS = 7
+# Relative slack over a saved baseline's fastest run
+DEFAULT_TOLERANCE = 0.25
+TOP_MODULES = 10
+
+# Must not be imported until a client is created, a check runs or sizing is asked for
+LAZY_MODULES = ("anthropic", "requests", "httpx", "numpy", "utils.providers.claude", "utils.providers.groq",
+                "utils.providers.huggingface", "utils.providers.ollama", "utils.sizing",
+                "utils.connectivity_checker")
+
+
+def app_utils_imports(app_path: Path = REPO_ROOT / "app.py") -> List[str]:
+    """``utils`` modules imported at the top level of the Streamlit app."""
+    tree = ast.parse(app_path.read_text(encoding="utf-8"))
+    modules = set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("utils."):
+            modules.add(node.module)
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names if alias.name.startswith("utils."))
+    return sorted(modules)
+
+
+def _run(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    return subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+
+def time_imports(modules: List[str], runs: int) -> Dict:
+    """
+    Time to import ``modules`` in fresh interpreters, measured inside the
+    child so interpreter startup is excluded.
+
+    Returns:
+        Dictionary with 'import_ms', 'min_ms', 'max_ms' and 'loaded'
+        (every module in sys.modules afterwards)
+    """
+    probe = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {', '.join(modules)}\n"
+        "print(json.dumps({'seconds': time.perf_counter() - started, 'loaded': sorted(sys.modules)}))"
+    )
+    samples, loaded = [], []
+    for _ in range(runs):
+        result = json.loads(_run(probe).stdout)
+        samples.append(result["seconds"] * 1000)
+        loaded = result["loaded"]
+    return {"import_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1),
+            "max_ms": round(max(samples), 1), "loaded": loaded}
+
+
+def slowest_imports(modules: List[str], top: int = TOP_MODULES) -> List[Dict]:
+    """Top-level imports by cumulative time, from ``python -X importtime``."""
+    result = _run(f"import {', '.join(modules)}", importtime=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Direct imports only: nested ones are indented under their parent
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.import_time``."""
+    parser = argparse.ArgumentParser(description="Check the cold-start import cost of the app's utils modules.")
+    parser.add_argument("modules", nargs="*", help="Modules to import (default: the utils modules app.py imports)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Fresh interpreters per measurement")
+    parser.add_argument("--budget-ms", type=float,
+                        help=f"Fail when the fastest import exceeds this (default: the baseline's fastest "
+                             f"plus the tolerance, or {DEFAULT_BUDGET_MS:g}ms without a baseline)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slack over the baseline")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a saved JSON file and fail on regressions")
+    args = parser.parse_args(argv)
+
+    budget = args.budget_ms
+    if budget is None and args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        budget = round(baseline["min_ms"] * (1 + args.tolerance), 1)
+    if budget is None:
+        budget = DEFAULT_BUDGET_MS
+
+    modules = args.modules or app_utils_imports()
+    measured = time_imports(modules, args.runs)
+    eager = [name for name in LAZY_MODULES if name in measured["loaded"]]
+    report = {
+        "modules": modules,
+        "import_ms": measured["import_ms"],
+        "min_ms": measured["min_ms"],
+        "max_ms": measured["max_ms"],
+        "budget_ms": budget,
+        "eager_lazy_modules": eager,
+        "slowest": slowest_imports(modules)
+    }
+    print(json.dumps(report, indent=2))
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failures = []
+    if measured["min_ms"] > budget:
+        failures.append(f"fastest import {measured['min_ms']}ms exceeds the {budget}ms budget")
+    for name in eager:
+        failures.append(f"{name} is imported at startup but should load on first use")
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    print(f"{len(modules)} modules: {measured['min_ms']}ms fastest, {measured['import_ms']}ms median "
+          f"(up to {measured['max_ms']}ms over {args.runs} runs)", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Link Validator Check
+Runs ``LinkValidator`` against the local mock link server and fails when a
+link is classified wrongly: 200, 301 to a live page, 404, 403, HEAD
+rejected with 405, a timeout, and a malformed YouTube URL. A second pass
+must reuse fresh results without requests, and a forced pass must
+revalidate the live page with a conditional request (304).
+
+    python -m benchmarks.link_validator
+    python -m benchmarks.link_validator --timeout 0.5 --slow-delay 2
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from utils.link_validator import LinkValidator
+
+from .mock_links import DEFAULT_SLOW_DELAY, MockLinkServer
+
+DEFAULT_TIMEOUT = 0.5
+MALFORMED_YOUTUBE = "https://www.youtube.com/watch?v=splunk-guide"
+
+# Mock path -> (expected status, expected HTTP status)
+EXPECTED = {
+    "/ok": ("ok", 200),
+    "/moved": ("ok", 200),
+    "/gone": ("broken", 404),
+    "/forbidden": ("blocked", 403),
+    "/get-only": ("ok", 200),
+    "/slow": ("error", None)
+}
+
+
+def run(timeout: float, slow_delay: float) -> Dict:
+    """
+    Validate every mock link three times (cold, cached, forced).
+
+    Returns:
+        Dictionary with 'elapsed_s' (cold pass), 'results' (cold pass
+        status per URL) and 'failures'
+    """
+    mock = MockLinkServer(slow_delay=slow_delay).start()
+    try:
+        validator = LinkValidator(timeout=timeout, domain_interval=0.0)
+        urls = {path: mock.url_for(path) for path in EXPECTED}
+        failures: List[str] = []
+
+        started = time.perf_counter()
+        results = validator.validate([*urls.values(), MALFORMED_YOUTUBE])
+        elapsed = time.perf_counter() - started
+        for path, (status, http_status) in EXPECTED.items():
+            result = results[urls[path]]
+            if (result["status"], result["http_status"]) != (status, http_status):
+                failures.append(f"{path}: expected {status}/{http_status}, "
+                                f"got {result['status']}/{result['http_status']} ({result['detail']})")
+        if not results[urls["/moved"]]["final_url"].endswith("/ok"):
+            failures.append(f"/moved: final URL {results[urls['/moved']]['final_url']} is not the redirect target")
+        if results[MALFORMED_YOUTUBE]["status"] != "invalid":
+            failures.append(f"malformed YouTube URL: expected invalid, got {results[MALFORMED_YOUTUBE]['status']}")
+
+        # Fresh results are reused; only the transient error is retried
+        served = mock.requests_served()
+        validator.validate(urls.values())
+        again = {key: count - served.get(key, 0) for key, count in mock.requests_served().items()
+                 if count != served.get(key, 0)}
+        if any(not key.endswith("/slow") for key in again):
+            failures.append(f"cached pass made requests: {again}")
+
+        forced = validator.validate([urls["/ok"]], force=True)[urls["/ok"]]
+        if (forced["status"], forced["http_status"]) != ("ok", 304):
+            failures.append(f"/ok forced recheck: expected ok/304, got {forced['status']}/{forced['http_status']}")
+    finally:
+        mock.stop()
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "results": {url: results[url]["status"] for url in [*urls.values(), MALFORMED_YOUTUBE]},
+        "failures": failures
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.link_validator``."""
+    parser = argparse.ArgumentParser(description="Check link classification against a local mock server.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Validator seconds per request")
+    parser.add_argument("--slow-delay", type=float, default=DEFAULT_SLOW_DELAY,
+                        help="Seconds the mock's slow link takes (must exceed --timeout)")
+    args = parser.parse_args(argv)
+
+    report = run(args.timeout, args.slow_delay)
+    print(json.dumps(report, indent=2))
+    for failure in report["failures"]:
+        print(f"FAILED {failure}", file=sys.stderr)
+    print(f"{len(report['results'])} links checked in {report['elapsed_s']}s", file=sys.stderr)
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
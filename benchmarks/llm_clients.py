@@ -0,0 +1,220 @@
+"""
+AI Client Benchmark
+Drives every AI client end to end against the local mock provider and
+reports latency percentiles, time to first token, throughput and prompt
+bytes. Results can be saved as a baseline and compared on later runs to
+catch regressions offline.
+
+    python -m benchmarks.llm_clients --requests 200 --concurrency 8 --save baseline.json
+    python -m benchmarks.llm_clients --requests 200 --concurrency 8 --baseline baseline.json
+"""
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.ai_client import AIClientFactory, BaseAIClient
+from utils.kb_loader import KBLoader
+
+from .mock_llm import DEFAULT_LATENCY, DEFAULT_TOKENS, DEFAULT_TOKENS_PER_SECOND, MockLLMServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PROVIDERS = ["claude", "groq", "huggingface", "ollama"]
+MOCK_PROTOCOLS = {"claude": "anthropic", "groq": "openai", "huggingface": "huggingface", "ollama": "ollama"}
+QUESTIONS = [
+    "What ports need to be open between the source and Splunk?",
+    "Which sourcetype and index should be used?",
+    "How do I validate that logs are arriving?",
+    "What are the prerequisites for this integration?"
+]
+
+# Relative slack before a metric counts as a regression
+DEFAULT_TOLERANCE = {"latency_p95_ms": 0.25, "ttft_p50_ms": 0.25, "prompt_bytes": 0.05, "throughput_rps": 0.2}
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 1)
+
+
+def create_client(provider: str, mock: MockLLMServer) -> BaseAIClient:
+    """Client for ``provider`` pointed at the mock server."""
+    client = AIClientFactory.create_client(provider, "mock-key", base_url=mock.url_for(provider))
+    if client is None or not getattr(client, "available", True):
+        raise RuntimeError(f"Cannot create a {provider} client (is its SDK installed?)")
+    return client
+
+
+def run_provider(client: BaseAIClient, mock: MockLLMServer, workload: List[Dict],
+                 concurrency: int, stream: bool) -> Dict:
+    """
+    Send every workload item through one client and measure it.
+
+    Args:
+        client: Client under test
+        mock: Mock server the client talks to (for request byte counts)
+        workload: Dicts with 'question', 'kb_content' and 'source_name'
+        concurrency: Parallel requests
+        stream: Use ``stream_response`` (time to first token is measured)
+
+    Returns:
+        Dictionary of metrics
+    """
+    def call(item: Dict) -> Dict:
+        started = time.perf_counter()
+        first_token = None
+        if stream:
+            done = {}
+            for event in client.stream_response(item["question"], item["kb_content"], item["source_name"]):
+                if event["type"] == "delta" and first_token is None:
+                    first_token = time.perf_counter() - started
+                elif event["type"] == "done":
+                    done = event
+            success, usage = done.get("success", False), done.get("usage")
+        else:
+            response = client.get_response(item["question"], item["kb_content"], item["source_name"])
+            success, usage = response["success"], response.get("usage")
+        elapsed = time.perf_counter() - started
+        return {"success": success, "latency": elapsed, "ttft": first_token if stream else elapsed,
+                "output_tokens": (usage or {}).get("output_tokens") or 0}
+
+    mock.reset_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, workload))
+    elapsed = time.perf_counter() - started
+    server_stats = mock.stats().get(MOCK_PROTOCOLS[client.PROVIDER], {})
+
+    ok = [result for result in results if result["success"]]
+    latencies = [result["latency"] for result in ok]
+    ttfts = [result["ttft"] for result in ok if result["ttft"] is not None]
+    requests_sent = server_stats.get("requests", 0)
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "http_requests": requests_sent,
+        "latency_p50_ms": ms(percentile(latencies, 0.5)),
+        "latency_p95_ms": ms(percentile(latencies, 0.95)),
+        "latency_p99_ms": ms(percentile(latencies, 0.99)),
+        "ttft_p50_ms": ms(percentile(ttfts, 0.5)),
+        "ttft_p95_ms": ms(percentile(ttfts, 0.95)),
+        "throughput_rps": round(len(ok) / elapsed, 1),
+        "output_tokens_per_second": round(sum(result["output_tokens"] for result in ok) / elapsed, 1),
+        "prompt_bytes": round(server_stats.get("request_bytes", 0) / requests_sent) if requests_sent else None
+    }
+
+
+def build_workload(kb_loader: KBLoader, requests: int) -> List[Dict]:
+    """Real KB content and questions, cycled over the catalog, so prompt sizes are representative."""
+    items = []
+    catalog = list(kb_loader.get_available_sources().items())
+    for i in range(requests):
+        slug, metadata = catalog[i % len(catalog)]
+        items.append({
+            "question": QUESTIONS[i % len(QUESTIONS)],
+            "kb_content": kb_loader.load_kb_content(slug)["content"],
+            "source_name": metadata["display_name"]
+        })
+    return items
+
+
+def compare(results: Dict, baseline: Dict, tolerance: Dict[str, float]) -> List[str]:
+    """
+    Regressions of ``results`` against ``baseline``.
+
+    Returns:
+        Human-readable descriptions, empty when nothing regressed
+    """
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, slack in tolerance.items():
+            current, previous = metrics.get(metric), reference.get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            # Throughput regresses downwards, everything else upwards
+            worse = -change if metric == "throughput_rps" else change
+            if worse > slack:
+                regressions.append(f"{name} {metric}: {previous} -> {current} ({change:+.0%}, limit {slack:.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.llm_clients``."""
+    parser = argparse.ArgumentParser(description="Benchmark the AI clients against a local mock provider.")
+    parser.add_argument("providers", nargs="*", help=f"Providers (default: all of {', '.join(PROVIDERS)})")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per provider and mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel requests")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Mock seconds to first token")
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS, help="Mock words per answer")
+    parser.add_argument("--tokens-per-second", type=float, default=DEFAULT_TOKENS_PER_SECOND,
+                        help="Mock generation rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock requests to fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a saved JSON file and fail on regressions")
+    parser.add_argument("--kb", default=str(REPO_ROOT / "kb"), help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+    unknown = set(args.providers) - set(PROVIDERS)
+    if unknown:
+        parser.error(f"unknown providers: {', '.join(sorted(unknown))}")
+
+    # The mock accepts any model name; SDK model deprecation notices are noise here
+    warnings.simplefilter("ignore", DeprecationWarning)
+    kb_loader = KBLoader(args.kb)
+    workload = build_workload(kb_loader, args.requests)
+    mock = MockLLMServer(latency=args.latency, tokens=args.tokens, tokens_per_second=args.tokens_per_second,
+                         error_rate=args.error_rate, error_status=args.error_status).start()
+    results = {}
+    try:
+        for provider in args.providers or PROVIDERS:
+            client = create_client(provider, mock)
+            # Warm the prompt cache and connection setup outside the measurement
+            client.get_response(QUESTIONS[0], workload[0]["kb_content"], workload[0]["source_name"])
+            for mode in ("request", "stream"):
+                name = f"{provider}/{mode}"
+                results[name] = run_provider(client, mock, workload, args.concurrency, stream=mode == "stream")
+                row = results[name]
+                print(f"{name:<20} p50 {row['latency_p50_ms']}ms  p95 {row['latency_p95_ms']}ms  "
+                      f"p99 {row['latency_p99_ms']}ms  ttft {row['ttft_p50_ms']}ms  "
+                      f"{row['throughput_rps']} req/s  {row['prompt_bytes']} B/prompt  "
+                      f"{row['errors']} errors", file=sys.stderr)
+    finally:
+        mock.stop()
+
+    report = {
+        "settings": {key: getattr(args, key) for key in
+                     ("requests", "concurrency", "latency", "tokens", "tokens_per_second", "error_rate")},
+        "results": results
+    }
+    print(json.dumps(report, indent=2))
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("settings") != report["settings"]:
+            print("Warning: baseline was recorded with different settings", file=sys.stderr)
+        regressions = compare(results, baseline.get("results", {}), DEFAULT_TOLERANCE)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
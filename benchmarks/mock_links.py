@@ -0,0 +1,167 @@
+"""
+Mock Link Server
+Local stand-in for the sites in ``kb/references.json``, serving one path
+per outcome the link validator has to tell apart:
+
+    /ok          200 with ETag and Last-Modified (304 to a matching
+                 If-None-Match)
+    /moved       301 to /ok
+    /gone        404
+    /forbidden   403, as bot protection answers
+    /get-only    405 to HEAD, 200 to GET
+    /slow        200 after ``slow_delay`` seconds (longer than a check's
+                 timeout)
+
+    python -m benchmarks.mock_links --port 8080
+"""
+
+import argparse
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_SLOW_DELAY = 2.0
+ETAG = '"mock-v1"'
+LAST_MODIFIED = formatdate(0, usegmt=True)
+BODY = b"<html><body>Reference page</body></html>"
+
+# Path -> (status to HEAD, status to GET)
+ROUTES = {
+    "/ok": (200, 200),
+    "/moved": (301, 301),
+    "/gone": (404, 404),
+    "/forbidden": (403, 403),
+    "/get-only": (405, 200),
+    "/slow": (200, 200)
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_MockLinkHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self) -> None:
+        self._respond(head=True)
+
+    def do_GET(self) -> None:
+        self._respond(head=False)
+
+    def _respond(self, head: bool) -> None:
+        path = self.path.split("?", 1)[0]
+        self.server.record(self.command, path)
+        route = ROUTES.get(path)
+        if route is None:
+            self._send(404, head)
+            return
+        if path == "/slow":
+            time.sleep(self.server.slow_delay)
+        status = route[0] if head else route[1]
+        if status == 301:
+            self._send(301, head, {"Location": "/ok"})
+        elif status == 200 and path == "/ok":
+            if self.headers.get("If-None-Match") == ETAG:
+                self._send(304, head, {"ETag": ETAG})
+            else:
+                self._send(200, head, {"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+        else:
+            self._send(status, head)
+
+    def _send(self, status: int, head: bool, headers: Optional[Dict[str, str]] = None) -> None:
+        body = BODY if status == 200 else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+class _MockLinkHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, slow_delay: float):
+        super().__init__(address, _Handler)
+        self.slow_delay = slow_delay
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+
+    def record(self, method: str, path: str) -> None:
+        with self._lock:
+            key = f"{method} {path}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def handle_error(self, request, client_address) -> None:
+        # The validator drops /slow connections when it times out
+        pass
+
+
+class MockLinkServer:
+    """Mock reference-link server running in a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, slow_delay: float = DEFAULT_SLOW_DELAY):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            slow_delay: Seconds /slow waits before answering
+        """
+        self._server = _MockLinkHTTPServer((host, port), slow_delay)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, path: str) -> str:
+        return self.base_url + path
+
+    def requests_served(self) -> Dict[str, int]:
+        """Request counts keyed by "METHOD /path"."""
+        with self._server._lock:
+            return dict(self._server.requests)
+
+    def start(self) -> "MockLinkServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-links", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None) -> int:
+    """Command line entry point: ``python -m benchmarks.mock_links``."""
+    parser = argparse.ArgumentParser(description="Serve mock reference links for the link validator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--slow-delay", type=float, default=DEFAULT_SLOW_DELAY,
+                        help="Seconds /slow waits before answering")
+    args = parser.parse_args(argv)
+
+    server = MockLinkServer(args.host, args.port, args.slow_delay).start()
+    print(f"Mock links listening on {server.base_url}", file=sys.stderr)
+    for path in ROUTES:
+        print(f"  {server.url_for(path)}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""
+Mock LLM Provider
+Local stand-in for the AI providers' HTTP APIs, used by the benchmarks so
+they measure this code base rather than a remote model.
+
+One server speaks every protocol the clients use, dispatched by path:
+
+    Ollama              GET /api/tags, POST /api/chat
+    Groq / OpenAI       POST /openai/v1/chat/completions, POST /v1/chat/completions
+    HuggingFace         POST /models/<model id>
+    Anthropic Messages  POST /v1/messages
+
+With ``cold_latency`` set, requests whose system prompt is not warm pay
+that much extra, as a provider does to process a long uncached prompt or
+load a model: Anthropic prompts are warm for five minutes after a request
+that marked them with ``cache_control``, Ollama keeps the last system prompt
+per model warm, and the other protocols are never warm.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_LATENCY = 0.05
+DEFAULT_TOKENS = 32
+DEFAULT_TOKENS_PER_SECOND = 500.0
+ANTHROPIC_CACHE_TTL = 300
+
+# Client base URLs for each provider, relative to the mock's root
+PROVIDER_PATHS = {
+    "claude": "",
+    "groq": "/openai/v1/chat/completions",
+    "huggingface": "/models/mistralai/Mixtral-8x7B-Instruct-v0.1",
+    "ollama": ""
+}
+
+ANTHROPIC_ERROR_TYPES = {
+    400: "invalid_request_error",
+    401: "authentication_error",
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error"
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_MockHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    # ------------------------------------------------------------------
+    # Plumbing
+    # ------------------------------------------------------------------
+
+    def _send_json(self, status: int, body) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_chunked(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _sse(self, data: Dict, event: Optional[str] = None) -> None:
+        prefix = f"event: {event}\n" if event else ""
+        self._write_chunk(f"{prefix}data: {json.dumps(data)}\n\n".encode("utf-8"))
+
+    def _words(self, limit: Optional[int] = None) -> List[str]:
+        count = self.server.settings["tokens"]
+        return [f"tok{i}" for i in range(min(count, limit) if limit else count)]
+
+    def _prompt_is_warm(self, protocol: str, body: Dict) -> bool:
+        """Whether the request's system prompt is in the simulated provider cache (and cache it)."""
+        server = self.server
+        now = time.monotonic()
+        with server._lock:
+            if protocol == "ollama":
+                messages = body.get("messages") or [{}]
+                system = messages[0].get("content") if messages[0].get("role") == "system" else None
+                warm = system is not None and server.ollama_prompts.get(body.get("model")) == system
+                server.ollama_prompts[body.get("model")] = system
+                return warm
+            if protocol == "anthropic" and isinstance(body.get("system"), list):
+                blocks = body["system"]
+                if not any(block.get("cache_control") for block in blocks):
+                    return False
+                key = (body.get("model"), json.dumps(blocks, sort_keys=True))
+                warm = server.anthropic_cache.get(key, 0) > now
+                server.anthropic_cache[key] = now + ANTHROPIC_CACHE_TTL
+                return warm
+        return False
+
+    def _pace(self) -> None:
+        rate = self.server.settings["tokens_per_second"]
+        if rate:
+            time.sleep(1.0 / rate)
+
+    def _generate(self) -> None:
+        """Sleep for the time the whole answer takes at the configured token rate."""
+        rate = self.server.settings["tokens_per_second"]
+        if rate:
+            time.sleep(self.server.settings["tokens"] / rate)
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "llama3.2"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path == "/api/chat":
+            protocol = "ollama"
+        elif self.path in ("/openai/v1/chat/completions", "/v1/chat/completions"):
+            protocol = "openai"
+        elif self.path.startswith("/models/"):
+            protocol = "huggingface"
+        elif self.path == "/v1/messages":
+            protocol = "anthropic"
+        else:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        settings = self.server.settings
+        self.server.record(protocol, len(raw))
+        body = json.loads(raw or b"{}")
+        time.sleep(settings["latency"])
+
+        if settings["error_rate"] and random.random() < settings["error_rate"]:
+            self.server.record_error(protocol)
+            status = settings["error_status"]
+            if protocol == "anthropic":
+                error_type = ANTHROPIC_ERROR_TYPES.get(status, "api_error")
+                self._send_json(status, {"type": "error", "error": {"type": error_type, "message": "Injected error"}})
+            else:
+                self._send_json(status, {"error": {"message": "Injected error", "code": status}})
+            return
+
+        warm = self._prompt_is_warm(protocol, body)
+        if settings["cold_latency"] and not warm:
+            time.sleep(settings["cold_latency"])
+        self.warm = warm
+        getattr(self, f"_{protocol}")(body, len(raw) // 4)
+
+    # ------------------------------------------------------------------
+    # Protocols
+    # ------------------------------------------------------------------
+
+    def _ollama(self, body: Dict, prompt_tokens: int) -> None:
+        words = self._words((body.get("options") or {}).get("num_predict"))
+        if not body.get("stream", True):
+            self._generate()
+            self._send_json(200, {
+                "model": body.get("model"),
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "done": True,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": len(words)
+            })
+            return
+
+        # Newline-delimited JSON, ending with a "done" record carrying the counters
+        self._start_chunked("application/x-ndjson")
+        for word in words:
+            self._write_chunk(json.dumps({"message": {"role": "assistant", "content": word + " "},
+                                          "done": False}).encode("utf-8") + b"\n")
+            self._pace()
+        self._write_chunk(json.dumps({"message": {"role": "assistant", "content": ""}, "done": True,
+                                      "prompt_eval_count": prompt_tokens,
+                                      "eval_count": len(words)}).encode("utf-8") + b"\n")
+        self._end_chunked()
+
+    def _openai(self, body: Dict, prompt_tokens: int) -> None:
+        words = self._words()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        if not body.get("stream"):
+            self._generate()
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage
+            })
+            return
+
+        self._start_chunked("text/event-stream")
+        for word in words:
+            self._sse({"id": completion_id, "object": "chat.completion.chunk", "model": body.get("model"),
+                       "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]})
+            self._pace()
+        self._sse({"id": completion_id, "object": "chat.completion.chunk", "model": body.get("model"),
+                   "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._sse({"id": completion_id, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._end_chunked()
+
+    def _huggingface(self, body: Dict, prompt_tokens: int) -> None:
+        self._generate()
+        self._send_json(200, [{"generated_text": " ".join(self._words())}])
+
+    def _anthropic(self, body: Dict, prompt_tokens: int) -> None:
+        words = self._words(body.get("max_tokens"))
+        cache_usage = {"cache_read_input_tokens": prompt_tokens if self.warm else 0}
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        message = {"id": message_id, "type": "message", "role": "assistant", "model": body.get("model"),
+                   "stop_reason": None, "stop_sequence": None}
+        if not body.get("stream"):
+            self._generate()
+            self._send_json(200, {**message, "stop_reason": "end_turn",
+                                  "content": [{"type": "text", "text": " ".join(words)}],
+                                  "usage": {"input_tokens": prompt_tokens, "output_tokens": len(words),
+                                            **cache_usage}})
+            return
+
+        self._start_chunked("text/event-stream")
+        self._sse({"type": "message_start", "message": {**message, "content": [],
+                   "usage": {"input_tokens": prompt_tokens, "output_tokens": 0, **cache_usage}}},
+                  "message_start")
+        self._sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                  "content_block_start")
+        for word in words:
+            self._sse({"type": "content_block_delta", "index": 0,
+                       "delta": {"type": "text_delta", "text": word + " "}}, "content_block_delta")
+            self._pace()
+        self._sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+        self._sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                   "usage": {"output_tokens": len(words)}}, "message_delta")
+        self._sse({"type": "message_stop"}, "message_stop")
+        self._end_chunked()
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, settings: dict):
+        super().__init__(address, _Handler)
+        self.settings = settings
+        self.stats: Dict[str, Dict[str, int]] = {}
+        # Simulated provider caches (see _Handler._prompt_is_warm)
+        self.ollama_prompts: Dict[str, Optional[str]] = {}
+        self.anthropic_cache: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive connections mid-read are expected under load
+        pass
+
+    def record(self, protocol: str, request_bytes: int) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(protocol, {"requests": 0, "errors": 0, "request_bytes": 0})
+            stats["requests"] += 1
+            stats["request_bytes"] += request_bytes
+
+    def record_error(self, protocol: str) -> None:
+        with self._lock:
+            self.stats[protocol]["errors"] += 1
+
+
+class MockLLMServer:
+    """
+    Multi-protocol mock LLM server running in a background thread.
+
+    Each request waits ``latency`` seconds (time to first token), plus
+    ``cold_latency`` when its system prompt is not warm, then returns or
+    streams ``tokens`` words at ``tokens_per_second``. A fraction
+    ``error_rate`` of requests fails with ``error_status`` instead, in the
+    provider's error format.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = DEFAULT_LATENCY,
+                 tokens: int = DEFAULT_TOKENS, tokens_per_second: float = DEFAULT_TOKENS_PER_SECOND,
+                 error_rate: float = 0.0, error_status: int = 429, cold_latency: float = 0.0):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency: Seconds before the first token
+            tokens: Words per answer
+            tokens_per_second: Generation rate (0 returns everything at once)
+            error_rate: Fraction of requests to fail
+            error_status: HTTP status of injected failures
+            cold_latency: Extra seconds for requests with a cold system prompt
+        """
+        settings = {"latency": latency, "tokens": tokens, "tokens_per_second": tokens_per_second,
+                    "error_rate": error_rate, "error_status": error_status, "cold_latency": cold_latency}
+        self._server = _MockHTTPServer((host, port), settings)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, provider: str) -> str:
+        """Base URL to pass to ``AIClientFactory.create_client`` for a provider."""
+        return self.base_url + PROVIDER_PATHS[provider]
+
+    @property
+    def requests_served(self) -> int:
+        return sum(stats["requests"] for stats in self.stats().values())
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-protocol request, error and request-byte counters."""
+        with self._server._lock:
+            return {protocol: dict(stats) for protocol, stats in self._server.stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._server._lock:
+            self._server.stats.clear()
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None) -> int:
+    """Command line entry point: ``python -m benchmarks.mock_llm``."""
+    parser = argparse.ArgumentParser(description="Serve a mock LLM API speaking every provider protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Seconds before the first token")
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS, help="Words per answer")
+    parser.add_argument("--tokens-per-second", type=float, default=DEFAULT_TOKENS_PER_SECOND,
+                        help="Generation rate (0 for instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests to fail")
+    parser.add_argument("--error-status", type=int, default=429, help="HTTP status of injected failures")
+    parser.add_argument("--cold-latency", type=float, default=0.0,
+                        help="Extra seconds for requests whose system prompt is not cached")
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.tokens, args.tokens_per_second,
+                           args.error_rate, args.error_status, args.cold_latency).start()
+    print(f"Mock LLM listening on {server.base_url}", file=sys.stderr)
+    for provider in PROVIDER_PATHS:
+        print(f"  {provider:<12} base_url={server.url_for(provider)}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
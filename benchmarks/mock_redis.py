@@ -0,0 +1,190 @@
+"""
+Mock Redis Server
+In-memory stand-in for a Redis-protocol server, covering the commands the
+shared cache backend uses (PING, AUTH, SELECT, GET, SET with PX/EX/NX,
+DEL, INCR, EXISTS, FLUSHDB and its compare-and-delete EVAL script). Lets
+the benchmarks and local multi-replica setups run without installing Redis.
+
+    python -m benchmarks.mock_redis --port 6379
+    SIEM_CACHE_URL=redis://127.0.0.1:6379/0 streamlit run app.py
+"""
+
+import argparse
+import socketserver
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.cache_backend import _COMPARE_AND_DELETE
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_MockRedisTCPServer"
+
+    def handle(self) -> None:
+        while True:
+            try:
+                command = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if command is None:
+                return
+            self.wfile.write(self.server.store.execute(command))
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. typed into telnet)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            header = self.rfile.readline()
+            length = int(header[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+class _MockRedisTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, store: "MockRedisStore"):
+        super().__init__(address, _Handler)
+        self.store = store
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients dropping connections mid-benchmark are expected
+        pass
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class MockRedisStore:
+    """Thread-safe key space with millisecond expiry and per-command counts."""
+
+    def __init__(self):
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self.commands: Dict[str, int] = {}
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def execute(self, args: List[bytes]) -> bytes:
+        if not args:
+            return b"-ERR empty command\r\n"
+        name = args[0].decode("utf-8", "replace").upper()
+        with self._lock:
+            self.commands[name] = self.commands.get(name, 0) + 1
+            handler = getattr(self, f"_cmd_{name.lower()}", None)
+            if handler is None:
+                return f"-ERR unknown command '{name}'\r\n".encode("utf-8")
+            try:
+                return handler(args[1:])
+            except (IndexError, ValueError):
+                return f"-ERR wrong arguments for '{name}'\r\n".encode("utf-8")
+
+    def _cmd_ping(self, args: List[bytes]) -> bytes:
+        return b"+PONG\r\n"
+
+    def _cmd_auth(self, args: List[bytes]) -> bytes:
+        return b"+OK\r\n"
+
+    def _cmd_select(self, args: List[bytes]) -> bytes:
+        return b"+OK\r\n"
+
+    def _cmd_get(self, args: List[bytes]) -> bytes:
+        return _bulk(self._live(args[0]))
+
+    def _cmd_set(self, args: List[bytes]) -> bytes:
+        key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+        expires = None
+        if b"PX" in options:
+            expires = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+        elif b"EX" in options:
+            expires = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+        if b"NX" in options and self._live(key) is not None:
+            return b"$-1\r\n"
+        self._data[key] = (value, expires)
+        return b"+OK\r\n"
+
+    def _cmd_del(self, args: List[bytes]) -> bytes:
+        removed = sum(1 for key in args if self._live(key) is not None and self._data.pop(key, None))
+        return b":%d\r\n" % removed
+
+    def _cmd_exists(self, args: List[bytes]) -> bytes:
+        return b":%d\r\n" % sum(1 for key in args if self._live(key) is not None)
+
+    def _cmd_incr(self, args: List[bytes]) -> bytes:
+        value = int(self._live(args[0]) or 0) + 1
+        expires = self._data.get(args[0], (None, None))[1]
+        self._data[args[0]] = (str(value).encode("utf-8"), expires)
+        return b":%d\r\n" % value
+
+    def _cmd_flushdb(self, args: List[bytes]) -> bytes:
+        self._data.clear()
+        return b"+OK\r\n"
+
+    def _cmd_eval(self, args: List[bytes]) -> bytes:
+        if args[0].decode("utf-8") != _COMPARE_AND_DELETE:
+            return b"-ERR only the cache backend's compare-and-delete script is supported\r\n"
+        key, expected = args[2], args[3]
+        if self._live(key) == expected:
+            del self._data[key]
+            return b":1\r\n"
+        return b":0\r\n"
+
+
+class MockRedisServer:
+    """Mock Redis server running in a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.store = MockRedisStore()
+        self._server = _MockRedisTCPServer((host, port), self.store)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "MockRedisServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None) -> int:
+    """Command line entry point: ``python -m benchmarks.mock_redis``."""
+    parser = argparse.ArgumentParser(description="Serve an in-memory Redis-protocol stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(argv)
+
+    server = MockRedisServer(args.host, args.port).start()
+    print(f"Mock Redis listening on {server.url}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
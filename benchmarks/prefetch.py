@@ -0,0 +1,114 @@
+"""
+Prefetch Benchmark
+Measures how long the first question about a freshly selected source takes,
+with and without a background prefetch started at selection, against the
+local mock provider with simulated cold-prompt latency. Fails when prefetch
+does not cut the median first-answer latency by at least ``--min-saving``.
+
+    python -m benchmarks.prefetch
+    python -m benchmarks.prefetch --providers ollama --cold-latency 1.5 --think-time 2
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from utils.citations import CitationIndex
+from utils.kb_loader import KBLoader
+from utils.prefetch import Prefetcher
+
+from .llm_clients import create_client
+from .mock_llm import MockLLMServer
+
+# Providers whose clients have something to warm up
+DEFAULT_PROVIDERS = ["claude", "ollama"]
+DEFAULT_COLD_LATENCY = 0.5
+# Seconds between selecting a source and sending the first question
+DEFAULT_THINK_TIME = 1.0
+DEFAULT_MIN_SAVING = 0.3
+QUESTION = "What ports need to be open between the source and Splunk?"
+
+
+def first_answer(kb_path: str, mock: MockLLMServer, provider: str, source_slug: str,
+                 prefetch: bool, think_time: float) -> float:
+    """
+    Seconds from sending the first question to its answer, in a fresh
+    process-like state (new loader, indices and client).
+    """
+    kb_loader = KBLoader(kb_path)
+    client = create_client(provider, mock)
+    prefetcher = Prefetcher(kb_loader, [CitationIndex(kb_loader).prepare])
+    try:
+        if prefetch:
+            prefetcher.prefetch(source_slug, client)
+        time.sleep(think_time)
+        started = time.perf_counter()
+        source_name = kb_loader.get_source_metadata(source_slug)["display_name"]
+        kb_data = kb_loader.load_kb_content(source_slug)
+        response = client.get_response(QUESTION, kb_data["content"], source_name)
+        if not response["success"]:
+            raise RuntimeError(response["message"])
+        return time.perf_counter() - started
+    finally:
+        prefetcher.close()
+
+
+def run(kb_path: str, providers: List[str], cold_latency: float, think_time: float) -> Dict:
+    """
+    First-answer latency per provider, with and without prefetch.
+
+    Returns:
+        Dictionary with per-provider 'cold_ms', 'prefetched_ms' and 'saving'
+        (share of the cold latency saved)
+    """
+    sources = list(KBLoader(kb_path).get_available_sources())
+    results = {}
+    for provider in providers:
+        timings: Dict[str, List[float]] = {"cold": [], "prefetched": []}
+        for source_slug in sources:
+            for mode in ("cold", "prefetched"):
+                # A fresh mock per run, so no prompt is warm from an earlier one
+                mock = MockLLMServer(latency=0.01, tokens=20, cold_latency=cold_latency).start()
+                try:
+                    timings[mode].append(first_answer(kb_path, mock, provider, source_slug,
+                                                      mode == "prefetched", think_time))
+                finally:
+                    mock.stop()
+        cold, prefetched = statistics.median(timings["cold"]), statistics.median(timings["prefetched"])
+        results[provider] = {"cold_ms": round(cold * 1000, 1), "prefetched_ms": round(prefetched * 1000, 1),
+                             "saving": round(1 - prefetched / cold, 3)}
+    return {"cold_latency_s": cold_latency, "think_time_s": think_time, "sources": len(sources),
+            "providers": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m benchmarks.prefetch``."""
+    parser = argparse.ArgumentParser(description="Compare first-answer latency with and without prefetch.")
+    parser.add_argument("--kb", default="kb", help="KB directory")
+    parser.add_argument("--providers", nargs="+", default=DEFAULT_PROVIDERS, help="Providers to measure")
+    parser.add_argument("--cold-latency", type=float, default=DEFAULT_COLD_LATENCY,
+                        help="Simulated extra seconds for a cold prompt")
+    parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_TIME,
+                        help="Seconds between selecting a source and asking")
+    parser.add_argument("--min-saving", type=float, default=DEFAULT_MIN_SAVING,
+                        help="Fail when prefetch saves less than this share of first-answer latency")
+    args = parser.parse_args(argv)
+
+    report = run(args.kb, args.providers, args.cold_latency, args.think_time)
+    print(json.dumps(report, indent=2))
+    failed = False
+    for provider, row in report["providers"].items():
+        print(f"{provider}: first answer {row['cold_ms']}ms cold, {row['prefetched_ms']}ms prefetched "
+              f"({row['saving']:.0%} saved)", file=sys.stderr)
+        if row["saving"] < args.min_saving:
+            print(f"REGRESSION {provider} prefetch saves {row['saving']:.0%}, "
+                  f"below {args.min_saving:.0%}", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+SIEM Onboarding API
+Headless HTTP service exposing the knowledge base, search and chat to
+automation (ticketing, SOAR playbooks). Shares the KB loader, caches and
+AI client layer with the Streamlit app.
+
+Run with (uvicorn starts WEB_CONCURRENCY workers; do not use --workers,
+which uvicorn does not pass on to the workers):
+    WEB_CONCURRENCY=4 uvicorn server:app --host 0.0.0.0 --port 8000
+
+Environment:
+    WEB_CONCURRENCY            Worker processes; provider limits are split across them
+    SIEM_KB_PATH               Knowledge base directory (default: kb)
+    SIEM_CACHE_PATH            Cache directory (default: <kb>/../.cache)
+    SIEM_CACHE_URL             Shared response cache for all workers and replicas
+                               (sqlite:///path or redis://host:6379/0; default: a
+                               SQLite file in the cache directory)
+    SIEM_API_PROVIDER          AI provider (default: first one with credentials)
+    SIEM_API_CASCADE           1 to answer with the provider's small model first and
+                               escalate to the large one when unsure (see utils.cascade)
+    SIEM_API_TOKEN             When set, requests must send "Authorization: Bearer <token>"
+                               (except /metrics, which is meant for the scraper)
+    SIEM_API_MAX_CONCURRENCY   Override the provider's max_concurrency
+    SIEM_API_RPM               Override the provider's requests_per_minute (0 disables)
+    OLLAMA_BASE_URL            Ollama endpoint (default: http://localhost:11434)
+    GROQ_API_KEY, ...          Provider keys, as for the batch runner
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from anyio import CancelScope, from_thread
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from utils.ai_client import AIClientFactory, BaseAIClient
+from utils.batch_runner import load_secrets
+from utils.cascade import CascadeClient
+from utils.citations import CitationIndex
+from utils.fanout import RateLimiter
+from utils.fast_answer import FastAnswerEngine
+from utils.kb_index import KBSearchIndex
+from utils.kb_loader import KBLoader
+from utils.kb_tables import KBTableStore
+from utils.kb_watcher import KBWatcher
+from utils.response_cache import ResponseCache
+from utils.telemetry import REGISTRY, SPAN_SECONDS, render_metrics, span, trace
+from utils.usage_ledger import GROUP_COLUMNS, UsageLedger
+
+NO_KB_CONTENT = "No KB content available for this source."
+
+
+def worker_count(argv: Sequence[str] = (), environ: Optional[Dict[str, str]] = None) -> int:
+    """
+    Number of server processes sharing the provider limits.
+
+    uvicorn reads ``WEB_CONCURRENCY`` as its worker count, but with
+    ``--workers N`` it neither sets the variable nor tells the workers, so
+    each would assume it is alone and take the provider's whole quota.
+
+    Args:
+        argv: Command line of this process (workers inherit uvicorn's)
+        environ: Environment (default: ``os.environ``)
+
+    Returns:
+        The worker count (1 when neither is given)
+
+    Raises:
+        RuntimeError: When ``--workers`` is given without a matching
+            ``WEB_CONCURRENCY``, or ``WEB_CONCURRENCY`` is not a positive integer
+    """
+    environ = os.environ if environ is None else environ
+    cli_workers = None
+    for index, arg in enumerate(argv):
+        if arg == "--workers" and index + 1 < len(argv):
+            cli_workers = argv[index + 1]
+        elif arg.startswith("--workers="):
+            cli_workers = arg.split("=", 1)[1]
+
+    value = environ.get("WEB_CONCURRENCY")
+    if value is None and cli_workers is None:
+        return 1
+    try:
+        workers = int(value) if value is not None else None
+    except ValueError:
+        workers = None
+    if value is not None and (workers is None or workers < 1):
+        raise RuntimeError(f"WEB_CONCURRENCY must be a positive integer, got {value!r}")
+    if cli_workers is not None and value != cli_workers:
+        seen = "is not visible to the workers" if value is None else f"does not match WEB_CONCURRENCY={value}"
+        raise RuntimeError(
+            f"Cannot split provider limits: --workers {cli_workers} {seen}. "
+            f"Start the API with WEB_CONCURRENCY={cli_workers} uvicorn server:app (without --workers)."
+        )
+    return workers
+
+
+class ChatMessage(BaseModel):
+    role: str = Field(pattern="^(user|assistant)$")
+    content: str
+
+
+class ChatRequest(BaseModel):
+    source: str
+    question: str = Field(min_length=1, max_length=4000)
+    history: List[ChatMessage] = []
+    use_cache: bool = True
+    fast_answer: bool = True
+
+
+class APIState:
+    """
+    Per-worker shared state: one loader, table store, search index and AI
+    client, built once at startup and kept in sync with KB edits.
+
+    Provider limits are split across uvicorn workers (``worker_count``),
+    so several workers together stay within the provider's quota.
+    """
+
+    def __init__(self, kb_path: str, cache_path: Optional[str] = None, provider: Optional[str] = None,
+                 ai_client: Optional[BaseAIClient] = None, watch: bool = True):
+        self.kb_loader = KBLoader(kb_path, cache_path)
+        BaseAIClient.invalidate_prompts_on_change(self.kb_loader)
+        self.table_store = KBTableStore(self.kb_loader).load_all()
+        self.fast_answer_engine = FastAnswerEngine(self.table_store)
+        self.search_index = KBSearchIndex(self.kb_loader)
+        self.search_index.index_all()
+        self.citation_index = CitationIndex(self.kb_loader)
+        self.response_cache = ResponseCache.for_loader(self.kb_loader)
+        BaseAIClient.response_cache = self.response_cache
+        self.usage_ledger = UsageLedger.for_loader(self.kb_loader)
+        BaseAIClient.usage_ledger = self.usage_ledger
+        self.watcher = KBWatcher(self.kb_loader).start() if watch else None
+
+        self.ai_client = ai_client if ai_client is not None else self._create_client(provider)
+        limits = AIClientFactory.PROVIDERS.get(getattr(self.ai_client, "PROVIDER", None), {})
+        workers = worker_count(sys.argv)
+        concurrency = int(os.environ.get("SIEM_API_MAX_CONCURRENCY") or limits.get("max_concurrency") or 4)
+        rpm = float(os.environ.get("SIEM_API_RPM") or limits.get("requests_per_minute") or 0)
+        self.llm_slots = asyncio.Semaphore(max(1, concurrency // workers))
+        self.rate_limiter = RateLimiter(rpm / workers) if rpm else None
+
+    def _create_client(self, provider: Optional[str]) -> Optional[BaseAIClient]:
+        secrets_ = load_secrets()
+        ollama_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+        if provider and os.environ.get("SIEM_API_CASCADE") == "1":
+            key_name = AIClientFactory.PROVIDERS.get(provider, {}).get("key_name")
+            client = CascadeClient.for_provider(
+                provider, secrets_.get(key_name) if key_name else None, self.kb_loader,
+                search_index=self.search_index, citation_index=self.citation_index,
+                **({"base_url": ollama_url} if provider == "ollama" else {}))
+        elif provider == "ollama":
+            client = AIClientFactory.create_client("ollama", base_url=ollama_url)
+        elif provider:
+            key_name = AIClientFactory.PROVIDERS.get(provider, {}).get("key_name")
+            client = AIClientFactory.create_client(provider, secrets_.get(key_name) if key_name else None)
+        else:
+            client = AIClientFactory.get_first_available_client(secrets_)
+        if client is None or not getattr(client, "available", True):
+            return None
+        return client
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.response_cache.close()
+        self.usage_ledger.close()
+
+
+def create_app(kb_path: Optional[str] = None, cache_path: Optional[str] = None,
+               provider: Optional[str] = None, ai_client: Optional[BaseAIClient] = None) -> FastAPI:
+    """
+    Build the API application.
+
+    State is created in the lifespan handler, so each uvicorn worker builds
+    its own copy after the fork.
+
+    Args:
+        kb_path: Knowledge base directory (default: ``SIEM_KB_PATH`` or kb)
+        cache_path: Cache directory (default: ``SIEM_CACHE_PATH`` or the loader's default)
+        provider: AI provider (default: ``SIEM_API_PROVIDER`` or the first with credentials)
+        ai_client: Pre-built client, overriding ``provider``
+
+    Returns:
+        The FastAPI application
+    """
+    kb_path = kb_path or os.environ.get("SIEM_KB_PATH", "kb")
+    cache_path = cache_path or os.environ.get("SIEM_CACHE_PATH")
+    provider = provider or os.environ.get("SIEM_API_PROVIDER")
+    api_token = os.environ.get("SIEM_API_TOKEN")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.api = await run_in_threadpool(APIState, kb_path, cache_path, provider, ai_client)
+        yield
+        app.state.api.close()
+
+    async def authorize(authorization: Optional[str] = Header(None)) -> None:
+        if api_token and not secrets.compare_digest(authorization or "", f"Bearer {api_token}"):
+            raise HTTPException(status_code=401, detail="Missing or invalid API token")
+
+    app = FastAPI(title="SIEM Onboarding API", lifespan=lifespan)
+
+    @app.middleware("http")
+    async def record_request(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        # Route templates (not raw paths) keep the label set small
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        SPAN_SECONDS.observe(time.perf_counter() - started, (f"http {request.method} {route}", ""))
+        return response
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        """Prometheus metrics of this worker."""
+        return PlainTextResponse(render_metrics(), media_type=REGISTRY.CONTENT_TYPE)
+
+    def state() -> APIState:
+        return app.state.api
+
+    def source_metadata(source_slug: str) -> Dict:
+        metadata = state().kb_loader.get_source_metadata(source_slug)
+        if metadata is None:
+            raise HTTPException(status_code=404, detail=f"Unknown log source: {source_slug}")
+        return metadata
+
+    # ------------------------------------------------------------------
+    # Knowledge base
+    # ------------------------------------------------------------------
+
+    @app.get("/health", dependencies=[Depends(authorize)])
+    async def health() -> Dict:
+        api = state()
+        return {
+            "status": "ok",
+            "sources": len(api.kb_loader.get_available_sources()),
+            "provider": api.ai_client.get_provider_name() if api.ai_client else None
+        }
+
+    @app.get("/sources", dependencies=[Depends(authorize)])
+    async def list_sources() -> Dict:
+        catalog = state().kb_loader.get_available_sources()
+        return {"sources": [{"slug": slug, **metadata} for slug, metadata in catalog.items()]}
+
+    @app.get("/sources/{source_slug}", dependencies=[Depends(authorize)])
+    async def get_source(source_slug: str) -> Dict:
+        metadata = source_metadata(source_slug)
+        kb_loader = state().kb_loader
+        return {
+            "slug": source_slug,
+            **metadata,
+            "fields": kb_loader.get_kb_header_fields(source_slug),
+            "sections": [
+                {"id": block["id"], "title": block["title"], "level": block["level"], "anchor": block["anchor"]}
+                for block in kb_loader.get_kb_section_blocks(source_slug)
+            ]
+        }
+
+    @app.get("/sources/{source_slug}/sections", dependencies=[Depends(authorize)])
+    async def get_sections(source_slug: str, section: Optional[str] = Query(None, description="Section id or anchor")) -> Dict:
+        source_metadata(source_slug)
+        blocks = state().kb_loader.get_kb_section_blocks(source_slug)
+        if section is not None:
+            blocks = [block for block in blocks if section in (block["id"], block["anchor"])]
+            if not blocks:
+                raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+        return {"source": source_slug, "sections": blocks}
+
+    @app.get("/sources/{source_slug}/references", dependencies=[Depends(authorize)])
+    async def get_references(source_slug: str) -> Dict:
+        source_metadata(source_slug)
+        result = state().kb_loader.get_references(source_slug)
+        return {"source": source_slug, "references": result["data"], "message": result["message"]}
+
+    @app.get("/search", dependencies=[Depends(authorize)])
+    async def search(q: str = Query(..., min_length=1), source: Optional[List[str]] = Query(None),
+                     top_k: int = Query(5, ge=1, le=50)) -> Dict:
+        results = await run_in_threadpool(state().search_index.search, q, source, top_k)
+        return {"query": q, "results": results}
+
+    @app.get("/usage", dependencies=[Depends(authorize)])
+    async def usage(by: List[str] = Query(["source"], description=f"Any of {', '.join(GROUP_COLUMNS)}"),
+                    since: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+                    until: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+                    provider: Optional[str] = None) -> Dict:
+        """Token usage and latency totals from the shared usage ledger (all workers and the batch runner)."""
+        unknown = set(by) - set(GROUP_COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Cannot group by {', '.join(sorted(unknown))}")
+        ledger = state().usage_ledger
+        # Include this worker's pending calls
+        await run_in_threadpool(ledger.flush)
+        rows = await run_in_threadpool(ledger.aggregate, by, since, until, provider)
+        return {"group_by": by, "rows": rows}
+
+    # ------------------------------------------------------------------
+    # Chat
+    # ------------------------------------------------------------------
+
+    def prepare_chat(request: ChatRequest):
+        api = state()
+        metadata = source_metadata(request.source)
+        if request.fast_answer and not request.history:
+            fast = api.fast_answer_engine.answer(request.source, request.question)
+            if fast["success"]:
+                return api, metadata, None, fast
+        if api.ai_client is None:
+            raise HTTPException(status_code=503, detail="No AI provider configured")
+        kb_data = api.kb_loader.load_kb_content(request.source)
+        kb_context = kb_data["content"] if kb_data["success"] else NO_KB_CONTENT
+        return api, metadata, kb_context, None
+
+    async def take_rate_token(api: APIState) -> None:
+        if api.rate_limiter is not None:
+            await run_in_threadpool(api.rate_limiter.acquire)
+
+    async def take_llm_slot(api: APIState) -> None:
+        """Wait for a concurrency slot and a rate-limit token (the "llm.queue" span)."""
+        with span("llm.queue", api.ai_client.PROVIDER):
+            await api.llm_slots.acquire()
+            try:
+                await take_rate_token(api)
+            except BaseException:
+                api.llm_slots.release()
+                raise
+
+    @contextmanager
+    def llm_slot(api: APIState) -> Iterator[None]:
+        """``take_llm_slot`` for code running in the threadpool; entered only around provider calls."""
+        from_thread.run(take_llm_slot, api)
+        # The release may run on another thread, e.g. when an abandoned stream is closed
+        loop = from_thread.run_sync(asyncio.get_running_loop)
+        try:
+            yield
+        finally:
+            loop.call_soon_threadsafe(api.llm_slots.release)
+
+    @app.post("/chat", dependencies=[Depends(authorize)])
+    async def chat(request: ChatRequest, http_response: Response) -> Dict:
+        """Answer a question; the ``Server-Timing`` header breaks down where the time went."""
+        with trace("api.chat") as request_trace:
+            api, metadata, kb_context, fast = await run_in_threadpool(prepare_chat, request)
+            if fast is None:
+                history = [message.model_dump() for message in request.history]
+
+                def ask() -> Dict:
+                    # Cache hits skip the provider slot and rate limit
+                    if request.use_cache:
+                        return api.ai_client.get_cached_response(
+                            request.question, kb_context, metadata["display_name"], history,
+                            provider_slot=lambda: llm_slot(api))
+                    with llm_slot(api):
+                        return api.ai_client.get_response(request.question, kb_context,
+                                                          metadata["display_name"], history)
+
+                response = await run_in_threadpool(ask)
+        http_response.headers["Server-Timing"] = request_trace.server_timing()
+
+        if fast is not None:
+            return {"source": request.source, "success": True, "response": fast["response"],
+                    "message": fast["message"], "via": "kb", "cached": False, "usage": None,
+                    "citations": fast["citations"], "grounding": 1.0, "ungrounded": False,
+                    "latency_seconds": round(request_trace.duration, 3)}
+        if not response["success"]:
+            raise HTTPException(status_code=502, detail=response["message"],
+                                headers={"Server-Timing": request_trace.server_timing()})
+        grounding = await run_in_threadpool(api.citation_index.cite, request.source, response["response"])
+        return {"source": request.source, "success": True, "response": response["response"],
+                "message": response["message"], "via": "ai", "cached": response.get("cached", False),
+                "usage": response.get("usage"), "citations": grounding["citations"],
+                "grounding": grounding["grounding"], "ungrounded": grounding["ungrounded"],
+                "model": response.get("model", getattr(api.ai_client, "model", None)),
+                "tier": response.get("tier"), "escalation_reason": response.get("escalation_reason"),
+                "latency_seconds": round(request_trace.duration, 3)}
+
+    @app.post("/chat/stream", dependencies=[Depends(authorize)])
+    async def chat_stream(request: ChatRequest) -> StreamingResponse:
+        api, metadata, kb_context, fast = await run_in_threadpool(prepare_chat, request)
+
+        def sse(event: str, data: Dict) -> str:
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        async def events() -> AsyncIterator[str]:
+            if fast is not None:
+                yield sse("meta", {"source": request.source, "via": "kb"})
+                yield sse("delta", {"text": fast["response"]})
+                yield sse("done", {"success": True, "message": fast["message"], "usage": None, "cached": False,
+                                   "citations": fast["citations"], "grounding": 1.0, "ungrounded": False})
+                return
+
+            yield sse("meta", {"source": request.source, "via": "ai"})
+            history = [message.model_dump() for message in request.history]
+
+            def stream() -> Iterator[Dict]:
+                # Cache hits skip the provider slot and rate limit
+                if request.use_cache:
+                    yield from api.ai_client.stream_cached_response(
+                        request.question, kb_context, metadata["display_name"], history,
+                        provider_slot=lambda: llm_slot(api))
+                    return
+                with llm_slot(api):
+                    yield from api.ai_client.stream_response(request.question, kb_context,
+                                                             metadata["display_name"], history)
+
+            parts = []
+            events_iterator = stream()
+            try:
+                async for event in iterate_in_threadpool(events_iterator):
+                    kind = event.pop("type")
+                    if kind == "delta":
+                        parts.append(event["text"])
+                    elif event["success"]:
+                        grounding = await run_in_threadpool(api.citation_index.cite, request.source,
+                                                            "".join(parts))
+                        event.update(citations=grounding["citations"], grounding=grounding["grounding"],
+                                     ungrounded=grounding["ungrounded"])
+                    yield sse(kind, event)
+            finally:
+                # Release the provider slot even when the client disconnects mid-stream
+                with CancelScope(shield=True):
+                    await run_in_threadpool(events_iterator.close)
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,34 @@
+"""
+Utility modules for SIEM Onboarding Assistant.
+
+Names are resolved lazily, so ``import utils.kb_loader`` (or the app) does
+not pay for the AI client layer or any provider SDK until they are used.
+"""
+
+import importlib
+
+# Public name -> module that defines it
+_EXPORTS = {
+    "KBLoader": "kb_loader",
+    "BaseAIClient": "ai_client",
+    "AIClientFactory": "ai_client",
+    "ClaudeClient": "ai_client",
+    "GroqClient": "ai_client",
+    "HuggingFaceClient": "ai_client",
+    "OllamaClient": "ai_client"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,8 +0,0 @@
-"""
-Utility modules for SIEM Onboarding Assistant.
-"""
-
-from .kb_loader import KBLoader
-from .claude_client import ClaudeClient
-
-__all__ = ['KBLoader', 'ClaudeClient']
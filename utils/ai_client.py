@@ -1,11 +1,21 @@
 """
 AI Client - Multi-backend support
-Supports Claude (paid), Groq (free), and HuggingFace (free) for chat functionality.
+Supports Claude (paid), Groq (free), HuggingFace (free) and Ollama (local) for
+chat functionality. Each backend lives in ``utils.providers`` and is imported,
+with its SDK, the first time a client for it is created.
 """
 
-import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional
+
+from .kb_loader import KBLoader
+from .providers import find_provider, get_client_class
+from .telemetry import cache_event, span
+from .usage_ledger import classify_outcome
 
 # ============================================
 # Abstract Base Class for AI Clients
@@ -32,8 +42,75 @@ class BaseAIClient(ABC):
         
         return truncated + "\n\n[... KB content truncated for length ...]"
     
+    # System prompts are shared by every client instance, keyed by source name
+    # and KB content, so all sessions reuse the same prompt for a source.
+    MAX_PROMPT_CACHE_ENTRIES = 64
+    _prompt_cache = OrderedDict()
+    _prompt_cache_lock = threading.Lock()
+    # False for clients whose prompts are one-off (the cascade's small model
+    # answering from per-question KB excerpts): they are rendered every time
+    # and kept out of both this cache and the provider's prompt cache
+    cache_prompts = True
+    
+    @classmethod
+    def invalidate_prompts(cls, source_names: Iterable[str]) -> None:
+        """Drop cached system prompts for the given source display names."""
+        names = set(source_names)
+        with cls._prompt_cache_lock:
+            for key in [key for key in cls._prompt_cache if key[0] in names]:
+                del cls._prompt_cache[key]
+    
+    @classmethod
+    def invalidate_prompts_on_change(cls, kb_loader: KBLoader) -> None:
+        """
+        Drop cached system prompts of sources whose KB files change.
+        
+        Prompts are keyed by display name, and by the time change listeners
+        run the loader has already re-read the catalog. Each slug's name is
+        therefore recorded up front and updated after every change, so a
+        renamed or removed source's prompts are dropped under its old name.
+        """
+        names = {slug: metadata["display_name"] for slug, metadata in kb_loader.get_available_sources().items()}
+        
+        def on_change(slugs) -> None:
+            stale = {names.pop(slug) for slug in slugs if slug in names}
+            for slug in slugs:
+                metadata = kb_loader.get_source_metadata(slug)
+                if metadata:
+                    names[slug] = metadata["display_name"]
+                    stale.add(metadata["display_name"])
+            cls.invalidate_prompts(stale)
+        
+        kb_loader.add_change_listener(on_change)
+    
     def _build_system_prompt(self, source_name: str, kb_content: str) -> str:
-        """Build the system prompt for the AI."""
+        """Build the system prompt for the AI, reusing a cached copy when possible."""
+        if not self.cache_prompts:
+            with span("prompt.build"):
+                return self._render_system_prompt(source_name, kb_content)
+        
+        # hash() of a str is memoized on the object, so repeated lookups with
+        # the loader's cached KB string are O(1)
+        key = (source_name, hash(kb_content), len(kb_content))
+        cls = BaseAIClient
+        with cls._prompt_cache_lock:
+            cached = cls._prompt_cache.get(key)
+            if cached is not None and cached[0] == kb_content:
+                cls._prompt_cache.move_to_end(key)
+                cache_event("prompt", True)
+                return cached[1]
+        
+        cache_event("prompt", False)
+        with span("prompt.build"):
+            prompt = self._render_system_prompt(source_name, kb_content)
+        with cls._prompt_cache_lock:
+            cls._prompt_cache[key] = (kb_content, prompt)
+            while len(cls._prompt_cache) > cls.MAX_PROMPT_CACHE_ENTRIES:
+                cls._prompt_cache.popitem(last=False)
+        return prompt
+    
+    def _render_system_prompt(self, source_name: str, kb_content: str) -> str:
+        """Render the system prompt template for the AI."""
         truncated_kb = self._truncate_kb_content(kb_content)
         
         return f"""You are a senior SIEM/Splunk integration specialist assistant. Your role is to help Security Engineers onboard log sources into Splunk.
@@ -70,295 +147,149 @@ The following is the official KB documentation for this log source. Base your an
         """Get a response from the AI for the user's question."""
         pass
     
-    @abstractmethod
-    def get_provider_name(self) -> str:
-        """Return the name of the AI provider."""
-        pass
-
-
-# ============================================
-# Claude Client (Anthropic - Paid)
-# ============================================
-
-class ClaudeClient(BaseAIClient):
-    """Client for Anthropic's Claude API."""
-    
-    def __init__(self, api_key: str):
-        try:
-            import anthropic
-            self.client = anthropic.Anthropic(api_key=api_key)
-            self.model = "claude-sonnet-4-20250514"
-            self.available = True
-        except ImportError:
-            self.available = False
-    
-    def get_provider_name(self) -> str:
-        return "Claude (Anthropic)"
+    # Seconds a warm-up keeps the provider warm (prompt cache lifetime, model
+    # keep-alive); None for providers with nothing to warm up
+    WARM_UP_TTL = None
     
-    def _format_chat_history(self, history: List[Dict]) -> List[Dict]:
-        return [{"role": msg["role"], "content": msg["content"]} for msg in history]
+    def warm_up(self, source_name: str, kb_content: str) -> Dict:
+        """
+        Prepare the provider for questions about a source, e.g. by writing
+        the system prompt to its prompt cache or loading the model.
+        
+        Returns:
+            Dictionary with 'success' and 'message' keys
+        """
+        return {"success": True, "message": "Nothing to warm up"}
     
-    def get_response(self, question: str, kb_content: str, source_name: str,
-                     chat_history: Optional[List[Dict]] = None) -> Dict:
-        try:
-            import anthropic
-            
-            system_prompt = self._build_system_prompt(source_name, kb_content)
-            messages = []
-            
-            if chat_history:
-                messages.extend(self._format_chat_history(chat_history))
-            
-            messages.append({"role": "user", "content": question})
-            
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                system=system_prompt,
-                messages=messages
-            )
-            
-            return {
-                "success": True,
-                "response": response.content[0].text,
-                "message": "Response generated successfully"
-            }
-            
-        except anthropic.AuthenticationError:
-            return {"success": False, "response": "", "message": "Authentication failed. Please check your API key."}
-        except anthropic.RateLimitError:
-            return {"success": False, "response": "", "message": "Rate limit exceeded. Please wait and try again."}
-        except anthropic.APIConnectionError:
-            return {"success": False, "response": "", "message": "Failed to connect to Claude API."}
-        except Exception as e:
-            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
-
-
-# ============================================
-# Groq Client (Free Tier - Llama, Mixtral)
-# ============================================
-
-class GroqClient(BaseAIClient):
-    """Client for Groq's free inference API with open-source models."""
+    # Optional persistent cache of first-turn answers (see utils.response_cache),
+    # shared by every client; set by the app and the batch runner.
+    response_cache = None
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        # Groq offers these models for free (with rate limits)
-        # llama-3.3-70b-versatile is the most capable free option
-        self.model = "llama-3.3-70b-versatile"
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
-        self.available = True
+    # Optional ledger of every call's tokens, latency and outcome (see
+    # utils.usage_ledger); set like response_cache.
+    usage_ledger = None
     
-    def get_provider_name(self) -> str:
-        return "Llama 3.3 70B (Groq - Free)"
+    def _log_usage(self, source_name: str, success: bool, message: str, usage: Optional[Dict],
+                   latency: float, cached: bool = False) -> None:
+        """Append one call to the usage ledger, if one is configured."""
+        ledger = BaseAIClient.usage_ledger
+        if ledger is not None:
+            ledger.record(getattr(self, "PROVIDER", ""), getattr(self, "model", ""), source_name,
+                          None if cached else usage, latency, classify_outcome(success, message, cached))
     
-    def get_response(self, question: str, kb_content: str, source_name: str,
-                     chat_history: Optional[List[Dict]] = None) -> Dict:
-        try:
-            import requests
-            
-            system_prompt = self._build_system_prompt(source_name, kb_content)
-            
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            if chat_history:
-                for msg in chat_history:
-                    messages.append({"role": msg["role"], "content": msg["content"]})
-            
-            messages.append({"role": "user", "content": question})
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "max_tokens": 2048,
-                "temperature": 0.7
-            }
-            
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "success": True,
-                    "response": data["choices"][0]["message"]["content"],
-                    "message": "Response generated successfully"
-                }
-            elif response.status_code == 401:
-                return {"success": False, "response": "", "message": "Invalid Groq API key."}
-            elif response.status_code == 429:
-                return {"success": False, "response": "", "message": "Rate limit exceeded. Groq free tier has limits."}
-            else:
-                return {"success": False, "response": "", "message": f"Groq API error: {response.status_code}"}
-                
-        except requests.exceptions.Timeout:
-            return {"success": False, "response": "", "message": "Request timed out. Please try again."}
-        except Exception as e:
-            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
-
-
-# ============================================
-# HuggingFace Client (Free Inference API)
-# ============================================
-
-class HuggingFaceClient(BaseAIClient):
-    """Client for HuggingFace's free Inference API."""
-    
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        # Using Mistral or other capable free models
-        self.model = "mistralai/Mixtral-8x7B-Instruct-v0.1"
-        self.base_url = f"https://api-inference.huggingface.co/models/{self.model}"
-        self.available = True
-    
-    def get_provider_name(self) -> str:
-        return "Mixtral 8x7B (HuggingFace - Free)"
-    
-    def get_response(self, question: str, kb_content: str, source_name: str,
-                     chat_history: Optional[List[Dict]] = None) -> Dict:
-        try:
-            import requests
-            
-            system_prompt = self._build_system_prompt(source_name, kb_content)
-            
-            # Build conversation for instruct model
-            prompt = f"<s>[INST] {system_prompt}\n\n"
-            
-            if chat_history:
-                for msg in chat_history:
-                    if msg["role"] == "user":
-                        prompt += f"User: {msg['content']}\n"
-                    else:
-                        prompt += f"Assistant: {msg['content']}\n"
-            
-            prompt += f"User question: {question} [/INST]"
-            
-            # Truncate prompt if too long (HF has input limits)
-            if len(prompt) > 24000:
-                # Keep system prompt and question, truncate KB
-                truncated_kb = self._truncate_kb_content(kb_content, 12000)
-                system_prompt = self._build_system_prompt(source_name, truncated_kb)
-                prompt = f"<s>[INST] {system_prompt}\n\nUser question: {question} [/INST]"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": 1500,
-                    "temperature": 0.7,
-                    "return_full_text": False
-                }
-            }
-            
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=120  # HF can be slower
-            )
+    def get_cached_response(self, question: str, kb_content: str, source_name: str,
+                            chat_history: Optional[List[Dict]] = None,
+                            provider_slot: Optional[Callable[[], ContextManager]] = None) -> Dict:
+        """
+        ``get_response`` backed by the shared response cache.
+        
+        Only questions without chat history are cached, since follow-ups
+        depend on the conversation. The result carries a 'cached' flag.
+        
+        Args:
+            provider_slot: Context manager factory entered around the
+                provider call only (e.g. a concurrency slot or rate-limit
+                token), so cache hits never wait for provider capacity
+        """
+        slot = provider_slot or nullcontext
+        cache = BaseAIClient.response_cache
+        if cache is None or chat_history:
+            with slot():
+                response = self.get_response(question, kb_content, source_name, chat_history)
+            return {**response, "cached": False}
+        
+        key = cache.make_key(getattr(self, "PROVIDER", ""), getattr(self, "model", ""),
+                             source_name, kb_content, question)
+        started = time.perf_counter()
+        with span("cache.lookup"):
+            cached = cache.get(key)
+        cache_event("response", cached is not None)
+        if cached is None:
+            # Concurrent askers of the same question, here or on other
+            # replicas, wait for one provider call instead of each making one
+            def compute() -> Dict:
+                with slot():
+                    return self.get_response(question, kb_content, source_name)
             
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 0:
-                    generated_text = data[0].get("generated_text", "")
-                    return {
-                        "success": True,
-                        "response": generated_text.strip(),
-                        "message": "Response generated successfully"
-                    }
-                return {"success": False, "response": "", "message": "Unexpected response format"}
-            elif response.status_code == 401:
-                return {"success": False, "response": "", "message": "Invalid HuggingFace API key."}
-            elif response.status_code == 503:
-                return {"success": False, "response": "", "message": "Model is loading. Please wait 20-30 seconds and try again."}
-            elif response.status_code == 429:
-                return {"success": False, "response": "", "message": "Rate limit exceeded. Please try again later."}
-            else:
-                return {"success": False, "response": "", "message": f"HuggingFace API error: {response.status_code}"}
-                
-        except requests.exceptions.Timeout:
-            return {"success": False, "response": "", "message": "Request timed out. HuggingFace free tier can be slow."}
-        except Exception as e:
-            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
-
-
-# ============================================
-# Ollama Client (Local - Completely Free)
-# ============================================
-
-class OllamaClient(BaseAIClient):
-    """Client for local Ollama instance (completely free, runs locally)."""
+            response, computed = cache.get_or_compute(key, compute)
+            if computed:
+                return {**response, "cached": False}
+            cached = response
+        self._log_usage(source_name, True, cached["message"], None, time.perf_counter() - started, cached=True)
+        return {**cached, "cached": True}
     
-    def __init__(self, base_url: str = "http://localhost:11434"):
-        self.base_url = base_url
-        self.model = "llama3.2"  # or mistral, codellama, etc.
-        self.available = self._check_availability()
+    def stream_response(self, question: str, kb_content: str, source_name: str,
+                        chat_history: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """
+        Stream a response as events.
+        
+        Yields ``{"type": "delta", "text": ...}`` events followed by a single
+        ``{"type": "done", ...}`` event with 'success', 'message' and 'usage'.
+        Providers without a streaming API send the whole answer as one delta.
+        """
+        response = self.get_response(question, kb_content, source_name, chat_history)
+        if response["success"]:
+            yield {"type": "delta", "text": response["response"]}
+        yield {"type": "done", "success": response["success"], "message": response["message"],
+               "usage": response.get("usage")}
     
-    def _check_availability(self) -> bool:
+    def stream_cached_response(self, question: str, kb_content: str, source_name: str,
+                               chat_history: Optional[List[Dict]] = None,
+                               provider_slot: Optional[Callable[[], ContextManager]] = None) -> Iterator[Dict]:
+        """``stream_response`` backed by the shared response cache (see ``get_cached_response``)."""
+        slot = provider_slot or nullcontext
+        cache = BaseAIClient.response_cache
+        if cache is None or chat_history:
+            with slot():
+                for event in self.stream_response(question, kb_content, source_name, chat_history):
+                    yield {**event, "cached": False} if event["type"] == "done" else event
+            return
+        
+        key = cache.make_key(getattr(self, "PROVIDER", ""), getattr(self, "model", ""),
+                             source_name, kb_content, question)
+        started = time.perf_counter()
+        with span("cache.lookup"):
+            cached = cache.get(key)
+        cache_event("response", cached is not None)
+        if cached is not None:
+            self._log_usage(source_name, True, cached["message"], None, time.perf_counter() - started, cached=True)
+            yield {"type": "delta", "text": cached["response"]}
+            yield {"type": "done", "success": True, "message": cached["message"],
+                   "usage": cached.get("usage"), "cached": True}
+            return
+        
+        token = cache.acquire(key)
+        if token is None:
+            # Another replica is generating this answer; reuse it when it lands
+            cached = cache.wait(key)
+            if cached is not None:
+                self._log_usage(source_name, True, cached["message"], None, time.perf_counter() - started,
+                                cached=True)
+                yield {"type": "delta", "text": cached["response"]}
+                yield {"type": "done", "success": True, "message": cached["message"],
+                       "usage": cached.get("usage"), "cached": True}
+                return
+        
+        parts = []
         try:
-            import requests
-            response = requests.get(f"{self.base_url}/api/tags", timeout=2)
-            return response.status_code == 200
-        except:
-            return False
+            with slot():
+                for event in self.stream_response(question, kb_content, source_name):
+                    if event["type"] == "delta":
+                        parts.append(event["text"])
+                        yield event
+                        continue
+                    if event["success"]:
+                        cache.put(key, {"success": True, "response": "".join(parts), "message": event["message"],
+                                        "usage": event.get("usage")})
+                    yield {**event, "cached": False}
+        finally:
+            if token is not None:
+                cache.release(key, token)
     
+    @abstractmethod
     def get_provider_name(self) -> str:
-        return f"Ollama Local ({self.model})"
-    
-    def get_response(self, question: str, kb_content: str, source_name: str,
-                     chat_history: Optional[List[Dict]] = None) -> Dict:
-        try:
-            import requests
-            
-            system_prompt = self._build_system_prompt(source_name, kb_content)
-            
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            if chat_history:
-                for msg in chat_history:
-                    messages.append({"role": msg["role"], "content": msg["content"]})
-            
-            messages.append({"role": "user", "content": question})
-            
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "stream": False
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=120
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "success": True,
-                    "response": data["message"]["content"],
-                    "message": "Response generated successfully"
-                }
-            else:
-                return {"success": False, "response": "", "message": f"Ollama error: {response.status_code}"}
-                
-        except requests.exceptions.ConnectionError:
-            return {"success": False, "response": "", "message": "Cannot connect to Ollama. Is it running locally?"}
-        except Exception as e:
-            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
+        """Return the name of the AI provider."""
+        pass
 
 
 # ============================================
@@ -368,34 +299,60 @@ class OllamaClient(BaseAIClient):
 class AIClientFactory:
     """Factory for creating AI clients based on available credentials."""
     
+    # requests_per_minute / max_concurrency bound parallel use (e.g. fan-out);
+    # requests_per_day / tokens_per_day are daily quotas for capacity planning
+    # (see utils.usage_ledger). Defaults follow each provider's free or entry tier.
+    # models names the small (fast, cheap) and large (default) model of each
+    # provider for the small-to-large cascade (see utils.cascade).
     PROVIDERS = {
         "groq": {
             "name": "Groq (Llama 3.3 70B) - FREE",
             "description": "Fast inference with Llama 3.3 70B. Free tier available.",
             "key_name": "GROQ_API_KEY",
             "signup_url": "https://console.groq.com/keys",
-            "free": True
+            "free": True,
+            "requests_per_minute": 30,
+            "max_concurrency": 4,
+            "requests_per_day": 1000,
+            "tokens_per_day": 100000,
+            "models": {"small": "llama-3.1-8b-instant", "large": "llama-3.3-70b-versatile"}
         },
         "huggingface": {
             "name": "HuggingFace (Mixtral) - FREE", 
             "description": "Mixtral 8x7B model. Free tier with rate limits.",
             "key_name": "HUGGINGFACE_API_KEY",
             "signup_url": "https://huggingface.co/settings/tokens",
-            "free": True
+            "free": True,
+            "requests_per_minute": 10,
+            "max_concurrency": 2,
+            "requests_per_day": None,
+            "tokens_per_day": None,
+            "models": {"small": "mistralai/Mistral-7B-Instruct-v0.3",
+                       "large": "mistralai/Mixtral-8x7B-Instruct-v0.1"}
         },
         "claude": {
             "name": "Claude (Anthropic) - PAID",
             "description": "Most capable, but requires paid API key.",
             "key_name": "ANTHROPIC_API_KEY",
             "signup_url": "https://console.anthropic.com/",
-            "free": False
+            "free": False,
+            "requests_per_minute": 50,
+            "max_concurrency": 8,
+            "requests_per_day": None,
+            "tokens_per_day": None,
+            "models": {"small": "claude-3-5-haiku-20241022", "large": "claude-sonnet-4-20250514"}
         },
         "ollama": {
             "name": "Ollama (Local) - FREE",
             "description": "Run locally. Requires Ollama installed on your machine.",
             "key_name": None,
             "signup_url": "https://ollama.ai/download",
-            "free": True
+            "free": True,
+            "requests_per_minute": None,
+            "max_concurrency": 1,
+            "requests_per_day": None,
+            "tokens_per_day": None,
+            "models": {"small": "llama3.2:1b", "large": "llama3.2"}
         }
     }
     
@@ -406,17 +363,21 @@ class AIClientFactory:
     
     @classmethod
     def create_client(cls, provider: str, api_key: str = None, **kwargs) -> Optional[BaseAIClient]:
-        """Create an AI client for the specified provider."""
+        """
+        Create an AI client for the specified provider.
         
-        if provider == "claude" and api_key:
-            return ClaudeClient(api_key)
-        elif provider == "groq" and api_key:
-            return GroqClient(api_key)
-        elif provider == "huggingface" and api_key:
-            return HuggingFaceClient(api_key)
-        elif provider == "ollama":
+        ``base_url`` overrides the provider endpoint (e.g. a proxy or the
+        benchmark mock servers); ``model`` overrides the provider's default
+        model (e.g. a tier from the provider's ``models``).
+        """
+        
+        if provider == "ollama":
             base_url = kwargs.get("base_url", "http://localhost:11434")
-            return OllamaClient(base_url)
+            return get_client_class("ollama")(base_url, kwargs.get("model"))
+        elif provider in cls.PROVIDERS and api_key:
+            client_class = get_client_class(provider)
+            if client_class is not None:
+                return client_class(api_key, kwargs.get("base_url"), kwargs.get("model"))
         
         return None
     
@@ -441,3 +402,11 @@ class AIClientFactory:
                     return client
         
         return None
+
+
+def __getattr__(name: str):
+    # Client classes (e.g. ``from utils.ai_client import OllamaClient``) load on demand
+    provider = find_provider(name)
+    if provider is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return get_client_class(provider)
@@ -0,0 +1,310 @@
+"""
+Batch Runner
+Headless bulk question answering over the AI clients, with checkpoint and
+resume. Running it over the standard FAQ pre-warms the response cache.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .ai_client import AIClientFactory, BaseAIClient
+from .cascade import CascadeClient
+from .citations import CitationIndex
+from .fanout import get_rate_limiter
+from .kb_loader import KBLoader
+from .response_cache import ResponseCache
+from .telemetry import span
+from .usage_ledger import UsageLedger
+
+DEFAULT_PARALLELISM = 4
+ALL_SOURCES = "*"
+
+
+def load_secrets(path: str = ".streamlit/secrets.toml") -> Dict[str, str]:
+    """
+    API keys from the environment, falling back to the Streamlit secrets file.
+
+    Returns:
+        Mapping of key name (e.g. GROQ_API_KEY) to value
+    """
+    secrets: Dict[str, str] = {}
+    try:
+        import tomllib
+        with open(path, "rb") as f:
+            secrets.update({key: value for key, value in tomllib.load(f).items() if isinstance(value, str)})
+    except (ImportError, OSError, ValueError):
+        pass
+    for provider_info in AIClientFactory.PROVIDERS.values():
+        key_name = provider_info.get("key_name")
+        if key_name and os.environ.get(key_name):
+            secrets[key_name] = os.environ[key_name]
+    return secrets
+
+
+def job_id(source_slug: str, question: str) -> str:
+    """Stable id of a (source, question) pair, used for resume."""
+    return f"{source_slug}:{hashlib.sha1(question.encode('utf-8')).hexdigest()[:12]}"
+
+
+def read_jobs(path: str, catalog: Dict) -> List[Dict]:
+    """
+    Read (source, question) pairs from a JSONL file.
+
+    Each line is ``{"source": "<slug>", "question": "...", "id": "<optional>"}``;
+    ``"source": "*"`` expands to every catalog source.
+
+    Returns:
+        List of job dicts with 'id', 'source' and 'question'
+
+    Raises:
+        ValueError: On malformed lines or unknown sources
+    """
+    jobs = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                question = record["question"].strip()
+                sources = list(catalog) if record.get("source") == ALL_SOURCES else [record["source"]]
+            except (ValueError, KeyError, AttributeError) as e:
+                raise ValueError(f"{path}:{line_number}: expected {{\"source\", \"question\"}} ({str(e)})")
+            for source_slug in sources:
+                if source_slug not in catalog:
+                    raise ValueError(f"{path}:{line_number}: unknown source '{source_slug}'")
+                identifier = record.get("id") if len(sources) == 1 and record.get("id") else job_id(source_slug, question)
+                if identifier not in seen:
+                    seen.add(identifier)
+                    jobs.append({"id": identifier, "source": source_slug, "question": question})
+    return jobs
+
+
+def completed_ids(path: str) -> set:
+    """Ids already answered successfully in an existing output file (the checkpoint)."""
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted run
+                    continue
+                if record.get("success"):
+                    done.add(record["id"])
+    except OSError:
+        pass
+    return done
+
+
+class BatchRunner:
+    """
+    Answers a list of jobs concurrently and appends results to a JSONL file.
+
+    The output file doubles as the checkpoint: every finished job is
+    written and flushed immediately, and a rerun skips ids that already
+    succeeded. Calls go through ``get_cached_response``, so answers land in
+    the shared response cache, and through the provider's shared rate
+    limiter.
+    """
+
+    def __init__(self, kb_loader: KBLoader, ai_client: BaseAIClient, parallelism: int = DEFAULT_PARALLELISM):
+        """
+        Initialize the runner.
+
+        Args:
+            kb_loader: Loader providing catalog metadata and KB content
+            ai_client: Client that answers the questions
+            parallelism: Concurrent requests (capped by the provider's max_concurrency)
+        """
+        self.kb_loader = kb_loader
+        self.ai_client = ai_client
+        provider = getattr(ai_client, "PROVIDER", None)
+        provider_limit = AIClientFactory.PROVIDERS.get(provider, {}).get("max_concurrency") or parallelism
+        self.parallelism = max(1, min(parallelism, provider_limit))
+        self.rate_limiter = get_rate_limiter(provider)
+        self.citation_index = CitationIndex(kb_loader)
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Finish in-flight jobs and stop submitting new ones."""
+        self._stop.set()
+
+    @contextmanager
+    def _rate_token(self) -> Iterator[None]:
+        """Wait for the provider's rate limit; entered only around provider calls."""
+        if self.rate_limiter is not None:
+            with span("llm.queue", self.ai_client.PROVIDER):
+                self.rate_limiter.acquire()
+        yield
+
+    def _answer(self, job: Dict) -> Dict:
+        source_slug = job["source"]
+        display_name = self.kb_loader.get_source_metadata(source_slug)["display_name"]
+        kb_data = self.kb_loader.load_kb_content(source_slug)
+        kb_context = kb_data["content"] if kb_data["success"] else "No KB content available for this source."
+
+        started = time.perf_counter()
+        # Cache hits do not consume provider quota
+        response = self.ai_client.get_cached_response(job["question"], kb_context, display_name,
+                                                      provider_slot=self._rate_token)
+        grounding = {"citations": [], "ungrounded": False}
+        if response["success"]:
+            grounding = self.citation_index.cite(source_slug, response["response"])
+
+        return {
+            **job,
+            "success": response["success"],
+            "response": response.get("response", ""),
+            "message": response.get("message", ""),
+            "cached": response.get("cached", False),
+            "latency_seconds": round(time.perf_counter() - started, 3),
+            "usage": response.get("usage") or {"input_tokens": None, "output_tokens": None},
+            "citations": grounding["citations"],
+            "ungrounded": grounding["ungrounded"],
+            "provider": getattr(self.ai_client, "PROVIDER", None),
+            "model": response.get("model", getattr(self.ai_client, "model", None)),
+            "tier": response.get("tier"),
+            "escalation_reason": response.get("escalation_reason"),
+            "completed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
+
+    def run(self, jobs: List[Dict], out_path: str, resume: bool = True) -> Iterator[Dict]:
+        """
+        Answer jobs and append each result to ``out_path`` as it completes.
+
+        Args:
+            jobs: Jobs from ``read_jobs``
+            out_path: JSONL output (and checkpoint) file
+            resume: Skip jobs already answered successfully in ``out_path``
+
+        Yields:
+            Each result record, in completion order
+        """
+        done = completed_ids(out_path) if resume else set()
+        queue = [job for job in jobs if job["id"] not in done]
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(out_path, "a" if resume else "w", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="batch") as executor:
+            pending = set()
+            position = 0
+            while position < len(queue) or pending:
+                # Keep a bounded window in flight so a stop request takes effect quickly
+                while position < len(queue) and len(pending) < self.parallelism * 2 and not self._stop.is_set():
+                    pending.add(executor.submit(self._answer, queue[position]))
+                    position += 1
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    yield record
+
+
+def summarize(records: List[Dict]) -> Dict:
+    """
+    Aggregate a run's records.
+
+    Returns:
+        Dictionary with counts, cache hits, token totals and latency percentiles
+    """
+    # Cache hits cost no provider time or tokens
+    fresh = [record for record in records if not record["cached"]]
+    latencies = sorted(record["latency_seconds"] for record in fresh)
+
+    def percentile(fraction: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    return {
+        "total": len(records),
+        "succeeded": sum(1 for record in records if record["success"]),
+        "failed": sum(1 for record in records if not record["success"]),
+        "cache_hits": sum(1 for record in records if record["cached"]),
+        "ungrounded": sum(1 for record in records if record.get("ungrounded")),
+        "escalated": sum(1 for record in records if record.get("tier") == "large"),
+        "input_tokens": sum(record["usage"].get("input_tokens") or 0 for record in fresh),
+        "output_tokens": sum(record["usage"].get("output_tokens") or 0 for record in fresh),
+        "latency_p50": percentile(0.5),
+        "latency_p95": percentile(0.95)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.batch_runner``."""
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of (source, question) pairs in bulk.")
+    parser.add_argument("input", help='JSONL with {"source": "<slug or *>", "question": "..."} per line')
+    parser.add_argument("--out", default="answers.jsonl", help="JSONL output, also used as the resume checkpoint")
+    parser.add_argument("--provider", choices=list(AIClientFactory.PROVIDERS),
+                        help="AI provider (default: first one with credentials)")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Answer with the provider's small model first, escalating to the large one "
+                             "when unsure (needs --provider)")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLELISM, help="Concurrent requests")
+    parser.add_argument("--no-resume", action="store_true", help="Start over instead of skipping answered jobs")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the shared response cache")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+
+    kb_loader = KBLoader(args.kb)
+    try:
+        jobs = read_jobs(args.input, kb_loader.get_available_sources())
+    except (OSError, ValueError) as e:
+        print(f"Error reading jobs: {str(e)}", file=sys.stderr)
+        return 1
+
+    if args.cascade and not args.provider:
+        print("--cascade needs --provider", file=sys.stderr)
+        return 1
+
+    secrets = load_secrets()
+    if args.provider:
+        key_name = AIClientFactory.PROVIDERS[args.provider].get("key_name")
+        api_key = secrets.get(key_name) if key_name else None
+        if args.cascade:
+            ai_client = CascadeClient.for_provider(args.provider, api_key, kb_loader)
+        else:
+            ai_client = AIClientFactory.create_client(args.provider, api_key)
+    else:
+        ai_client = AIClientFactory.get_first_available_client(secrets)
+    if ai_client is None or not getattr(ai_client, "available", True):
+        print("No usable AI provider: set an API key (e.g. GROQ_API_KEY) or start Ollama.", file=sys.stderr)
+        return 1
+
+    if not args.no_cache:
+        BaseAIClient.response_cache = ResponseCache.for_loader(kb_loader)
+    BaseAIClient.usage_ledger = UsageLedger.for_loader(kb_loader)
+
+    runner = BatchRunner(kb_loader, ai_client, args.parallel)
+    signal.signal(signal.SIGINT, lambda signum, frame: runner.stop())
+    print(f"{len(jobs)} jobs via {ai_client.get_provider_name()}, {runner.parallelism} in parallel", file=sys.stderr)
+
+    records = []
+    for record in runner.run(jobs, args.out, resume=not args.no_resume):
+        records.append(record)
+        status = "cached" if record["cached"] else ("ok" if record["success"] else record["message"])
+        print(f"[{len(records)}] {record['id']} {record['latency_seconds']:.2f}s {status}", file=sys.stderr)
+
+    summary = summarize(records)
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
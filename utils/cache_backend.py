@@ -0,0 +1,628 @@
+"""
+Cache Backend
+Two-tier cache shared by app replicas: an in-process LRU in front of a
+shared store (a SQLite file on shared disk, or any Redis-protocol server).
+
+    SIEM_CACHE_URL=sqlite:////mnt/shared/siem-cache.sqlite
+    SIEM_CACHE_URL=redis://:password@cache.internal:6379/0
+"""
+
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .telemetry import cache_event, span
+
+CACHE_URL_ENV = "SIEM_CACHE_URL"
+DEFAULT_LOCAL_ENTRIES = 512
+DEFAULT_LOCAL_TTL = 60.0
+# How long a replica trusts its copy of a namespace's generation counter
+GENERATION_TTL = 5.0
+DEFAULT_LOCK_TTL = 120.0
+ERROR_LOG_INTERVAL = 60.0
+# After a shared-tier failure, skip it for this long instead of timing out on every call
+BACKEND_RETRY_INTERVAL = 5.0
+
+
+class CacheBackendError(Exception):
+    """A shared cache backend failed or answered with an error."""
+
+
+_BACKEND_ERRORS = (CacheBackendError, OSError, sqlite3.Error)
+
+
+class CacheBackend(ABC):
+    """
+    Shared key-value store holding string values with optional expiry.
+
+    Implementations must make ``add`` atomic across processes and hosts,
+    since it is what stampede protection is built on.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Value for a key, or None when missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value, replacing any previous one."""
+
+    @abstractmethod
+    def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent; True when stored."""
+
+    @abstractmethod
+    def delete(self, key: str, expected: Optional[str] = None) -> None:
+        """Delete a key (only if it still holds ``expected``, when given)."""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter, starting from 0."""
+
+    def purge_expired(self) -> int:
+        """Drop expired entries, for stores that do not expire on their own."""
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+# ============================================
+# SQLite (shared disk)
+# ============================================
+
+class SQLiteBackend(CacheBackend):
+    """
+    SQLite file in WAL mode. Every replica (and the batch runner) opening
+    the same file shares entries; SQLite's locking makes ``add`` atomic
+    across processes. Suits replicas on one host or a shared volume with
+    working POSIX locks.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _expires(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                               (key, value, self._expires(ttl)))
+
+    def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ? AND expires < ?", (key, time.time()))
+            cursor = self._conn.execute("INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                                        (key, value, self._expires(ttl)))
+        return cursor.rowcount == 1
+
+    def delete(self, key: str, expected: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            if expected is None:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            else:
+                self._conn.execute("DELETE FROM cache WHERE key = ? AND value = ?", (key, expected))
+
+    def incr(self, key: str) -> int:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO cache (key, value, expires) VALUES (?, '1', NULL) "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1", (key,)
+            )
+            return int(self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()[0])
+
+    def purge_expired(self) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================
+# Redis protocol (RESP2)
+# ============================================
+
+# Delete a lock only while it still holds our token
+_COMPARE_AND_DELETE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal client for Redis and Redis-protocol servers (Valkey, KeyDB,
+    Dragonfly), using only GET, SET (PX/NX), DEL, INCR and EVAL, so
+    no client library is needed. Connections are pooled and reconnect
+    once on failure.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, username: Optional[str] = None,
+                 timeout: float = 2.0, pool_size: int = 8):
+        """
+        Initialize the client; connections open lazily.
+
+        Args:
+            host: Server host
+            port: Server port
+            db: Database number
+            password: Password for AUTH
+            username: ACL user name (Redis 6+)
+            timeout: Socket timeout in seconds
+            pool_size: Idle connections kept open
+        """
+        self.host, self.port, self.db = host, port, db
+        self.username, self.password = username, password
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pool: List[Tuple[socket.socket, Any]] = []
+        self._pool_lock = threading.Lock()
+
+    # -- protocol ------------------------------------------------------
+
+    @staticmethod
+    def _encode(args: Tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    @classmethod
+    def _read_reply(cls, reader) -> Any:
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise CacheBackendError(payload.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by cache server")
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [cls._read_reply(reader) for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply from cache server: {line[:40]!r}")
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = (sock, sock.makefile("rb"))
+        if self.password:
+            auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            self._send(connection, auth)
+        if self.db:
+            self._send(connection, ("SELECT", self.db))
+        return connection
+
+    def _send(self, connection: Tuple[socket.socket, Any], args: Tuple) -> Any:
+        connection[0].sendall(self._encode(args))
+        return self._read_reply(connection[1])
+
+    def command(self, *args) -> Any:
+        """Run one command and return its decoded reply."""
+        for attempt in range(2):
+            with self._pool_lock:
+                connection = self._pool.pop() if self._pool else None
+            try:
+                if connection is None:
+                    connection = self._connect()
+                reply = self._send(connection, args)
+            except CacheBackendError:
+                self._release(connection)
+                raise
+            except OSError as e:
+                if connection is not None:
+                    self._discard(connection)
+                # A pooled connection may have been closed by the server; retry once on a fresh one
+                if attempt:
+                    raise CacheBackendError(f"Cache server {self.host}:{self.port} unreachable: {str(e)}")
+                continue
+            self._release(connection)
+            return reply
+
+    def _release(self, connection: Optional[Tuple[socket.socket, Any]]) -> None:
+        if connection is None:
+            return
+        with self._pool_lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(connection)
+                return
+        self._discard(connection)
+
+    @staticmethod
+    def _discard(connection: Tuple[socket.socket, Any]) -> None:
+        try:
+            connection[1].close()
+            connection[0].close()
+        except OSError:
+            pass
+
+    # -- CacheBackend --------------------------------------------------
+
+    @staticmethod
+    def _ttl_args(ttl: Optional[float]) -> Tuple:
+        return ("PX", max(1, int(ttl * 1000))) if ttl else ()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self.command("SET", key, value, *self._ttl_args(ttl))
+
+    def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        return self.command("SET", key, value, "NX", *self._ttl_args(ttl)) == "OK"
+
+    def delete(self, key: str, expected: Optional[str] = None) -> None:
+        if expected is None:
+            self.command("DEL", key)
+        else:
+            self.command("EVAL", _COMPARE_AND_DELETE, 1, key, expected)
+
+    def incr(self, key: str) -> int:
+        return self.command("INCR", key)
+
+    def close(self) -> None:
+        with self._pool_lock:
+            connections, self._pool = self._pool, []
+        for connection in connections:
+            self._discard(connection)
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """
+    Backend for a ``sqlite:///path`` or ``redis://[user:password@]host[:port][/db]`` URL.
+
+    Raises:
+        ValueError: For other schemes
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        # sqlite:///relative/path or sqlite:////absolute/path, as in SQLAlchemy
+        return SQLiteBackend(unquote(parsed.path[1:] if parsed.path.startswith("/") else parsed.path))
+    if parsed.scheme in ("redis", "valkey"):
+        return RedisBackend(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(parsed.path.strip("/") or 0),
+            username=unquote(parsed.username) if parsed.username else None,
+            password=unquote(parsed.password) if parsed.password else None
+        )
+    raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme or url!r}")
+
+
+def shared_backend(default_path: str) -> CacheBackend:
+    """Backend from ``SIEM_CACHE_URL``, or a SQLite file at ``default_path``."""
+    url = os.environ.get(CACHE_URL_ENV)
+    return backend_from_url(url) if url else SQLiteBackend(default_path)
+
+
+# ============================================
+# Tiers
+# ============================================
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry expiry."""
+
+    def __init__(self, max_entries: int = DEFAULT_LOCAL_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache:
+    """
+    JSON values in an in-process LRU in front of a shared backend.
+
+    Keys are versioned as ``<namespace>:v<version>:g<generation>:<key>``.
+    Bumping ``version`` (a code change to the value format) or calling
+    ``invalidate_all()`` (which increments the namespace's generation in
+    the shared store) makes every replica miss, without deleting anything;
+    old entries simply expire. Each replica re-reads the generation every
+    few seconds, so its local tier can be stale for at most that long.
+
+    ``get_or_compute`` protects against stampedes at two levels: threads
+    of one process asking for the same key wait for the one already
+    computing it, and replicas race for a lock key in the shared store; the losers wait for the winner's value instead of
+    computing it again. If the shared backend fails, the cache degrades to
+    its local tier rather than failing requests.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, version: int = 1,
+                 local_entries: int = DEFAULT_LOCAL_ENTRIES, local_ttl: float = DEFAULT_LOCAL_TTL,
+                 lock_ttl: float = DEFAULT_LOCK_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Shared tier
+            namespace: Key prefix (e.g. 'responses')
+            version: Format version of the stored values
+            local_entries: In-process LRU size
+            local_ttl: Seconds a value stays in the in-process tier
+            lock_ttl: Longest a replica may hold a compute lock
+        """
+        self.backend = backend
+        self.namespace = namespace
+        self.version = version
+        self.local = LRUCache(local_entries)
+        self.local_ttl = local_ttl
+        self.lock_ttl = lock_ttl
+        self._lock = threading.Lock()
+        # Versioned key -> event set when this process's compute of it ends
+        self._in_flight: Dict[str, threading.Event] = {}
+        # Token -> shared lock key it holds, fixed at ``acquire`` so a
+        # generation bump mid-compute does not strand the lock
+        self._lock_keys: Dict[str, str] = {}
+        self._generation: Tuple[float, int] = (0.0, 0)
+        self._last_error = 0.0
+        self._down_until = 0.0
+
+    # -- keys ----------------------------------------------------------
+
+    def _generation_key(self) -> str:
+        return f"{self.namespace}:v{self.version}:generation"
+
+    def _current_generation(self) -> int:
+        checked, generation = self._generation
+        if time.monotonic() - checked < GENERATION_TTL or not self._shared_available():
+            return generation
+        try:
+            generation = int(self.backend.get(self._generation_key()) or 0)
+        except _BACKEND_ERRORS + (ValueError,) as e:
+            self._backend_failed(e)
+        self._generation = (time.monotonic(), generation)
+        return generation
+
+    def versioned_key(self, key: str) -> str:
+        """Full key for ``key`` in the shared store."""
+        return f"{self.namespace}:v{self.version}:g{self._current_generation()}:{key}"
+
+    def invalidate_all(self) -> None:
+        """Make every replica miss on all current entries of this namespace."""
+        try:
+            generation = self.backend.incr(self._generation_key())
+            self._generation = (time.monotonic(), generation)
+        except _BACKEND_ERRORS as e:
+            self._backend_failed(e)
+        self.local.clear()
+
+    def _shared_available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _backend_failed(self, error: Exception) -> None:
+        now = time.monotonic()
+        self._down_until = now + BACKEND_RETRY_INTERVAL
+        if now - self._last_error > ERROR_LOG_INTERVAL:
+            self._last_error = now
+            print(f"Shared cache unavailable, using the local tier only: {str(error)}", file=sys.stderr)
+
+    # -- values --------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value for ``key`` from the local tier, then the shared one."""
+        full_key = self.versioned_key(key)
+        value = self.local.get(full_key)
+        cache_event(f"{self.namespace}.local", value is not None)
+        if value is not None or not self._shared_available():
+            return value
+        try:
+            with span("cache.shared"):
+                raw = self.backend.get(full_key)
+        except _BACKEND_ERRORS as e:
+            self._backend_failed(e)
+            return None
+        cache_event(f"{self.namespace}.shared", raw is not None)
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.local.set(full_key, value, self.local_ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` in both tiers."""
+        full_key = self.versioned_key(key)
+        self.local.set(full_key, value, min(self.local_ttl, ttl) if ttl else self.local_ttl)
+        if not self._shared_available():
+            return
+        try:
+            self.backend.set(full_key, json.dumps(value, separators=(",", ":")), ttl)
+        except _BACKEND_ERRORS as e:
+            self._backend_failed(e)
+
+    def delete(self, key: str) -> None:
+        full_key = self.versioned_key(key)
+        self.local.delete(full_key)
+        if not self._shared_available():
+            return
+        try:
+            self.backend.delete(full_key)
+        except _BACKEND_ERRORS as e:
+            self._backend_failed(e)
+
+    # -- stampede protection ------------------------------------------
+
+    def acquire(self, key: str) -> Optional[str]:
+        """
+        Take the shared compute lock for ``key``.
+
+        Returns:
+            A token to pass to ``release``, or None when another replica
+            holds the lock. When the backend is down every caller gets a
+            token, since there is nothing to coordinate through.
+        """
+        token = uuid.uuid4().hex
+        if not self._shared_available():
+            return token
+        lock_key = f"lock:{self.versioned_key(key)}"
+        try:
+            if not self.backend.add(lock_key, token, self.lock_ttl):
+                return None
+        except _BACKEND_ERRORS as e:
+            self._backend_failed(e)
+            return token
+        with self._lock:
+            self._lock_keys[token] = lock_key
+        return token
+
+    def release(self, key: str, token: str) -> None:
+        with self._lock:
+            lock_key = self._lock_keys.pop(token, None)
+        if lock_key is None or not self._shared_available():
+            return
+        try:
+            self.backend.delete(lock_key, expected=token)
+        except _BACKEND_ERRORS as e:
+            self._backend_failed(e)
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Wait for another replica to finish computing ``key``.
+
+        Returns:
+            The value, or None if the lock went away (failed compute) or
+            ``timeout`` (default: the lock TTL) passed without one
+        """
+        deadline = time.monotonic() + (self.lock_ttl if timeout is None else timeout)
+        lock_key = f"lock:{self.versioned_key(key)}"
+        delay = 0.02
+        with span("cache.wait"):
+            while time.monotonic() < deadline:
+                value = self.get(key)
+                if value is not None or not self._shared_available():
+                    return value
+                try:
+                    if self.backend.get(lock_key) is None:
+                        return self.get(key)
+                except _BACKEND_ERRORS as e:
+                    self._backend_failed(e)
+                    return None
+                # Jittered backoff keeps waiting replicas from polling in lockstep
+                time.sleep(min(delay, max(0.0, deadline - time.monotonic())) * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, 0.5)
+        return None
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None,
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, bool]:
+        """
+        Cached value for ``key``, computing it at most once across replicas.
+
+        Args:
+            key: Cache key (unversioned)
+            compute: Produces the value on a miss
+            ttl: Seconds the value stays in the shared tier
+            cacheable: Predicate deciding whether a computed value is stored
+                (e.g. only successful responses)
+
+        Returns:
+            Tuple of (value, computed), where computed is False for hits
+            and for values another thread or replica produced
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, False
+        full_key = self.versioned_key(key)
+        while True:
+            with self._lock:
+                in_flight = self._in_flight.get(full_key)
+                if in_flight is None:
+                    self._in_flight[full_key] = threading.Event()
+                    break
+            in_flight.wait()
+            value = self.get(key)
+            if value is not None:
+                return value, False
+            # That compute failed or was not cacheable; take over
+
+        try:
+            value = self.get(key)
+            if value is not None:
+                return value, False
+            token = self.acquire(key)
+            if token is None:
+                value = self.wait(key)
+                if value is not None:
+                    return value, False
+                # The other replica failed or is stuck; compute ourselves
+                token = self.acquire(key)
+            try:
+                value = compute()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value, ttl)
+            finally:
+                if token is not None:
+                    self.release(key, token)
+        finally:
+            with self._lock:
+                self._in_flight.pop(full_key).set()
+        return value, True
+
+    def close(self) -> None:
+        self.backend.close()
@@ -0,0 +1,221 @@
+"""
+Model Cascade
+Answers with a provider's small model on the KB sections relevant to the
+question, and escalates to the large model with the full KB only when the
+small answer fails its self-check or is not grounded in the KB.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .ai_client import AIClientFactory, BaseAIClient
+from .citations import CitationIndex
+from .kb_index import KBSearchIndex
+from .kb_loader import KBLoader
+from .telemetry import record_cascade, span
+
+# Sections retrieved for the small model
+DEFAULT_TOP_K = 4
+# Grounded share of the small answer below which the large model answers.
+# Stricter than the citation index's "ungrounded" flag: an answer written from
+# a handful of KB sections should be drawn almost entirely from them
+DEFAULT_MIN_GROUNDING = 0.5
+# Reply the small model gives when the excerpts do not answer the question
+ESCALATE_MARKER = "NEEDS_FULL_KB"
+SELF_CHECK_INSTRUCTION = (
+    "\n\n(The documentation above is an excerpt. If it does not contain what is needed "
+    f"to answer, reply with only {ESCALATE_MARKER}.)"
+)
+
+# Why an answer came from the large model, for display
+ESCALATION_REASONS = {
+    "follow_up": "follow-up question",
+    "no_context": "no matching KB sections",
+    "small_failed": "small model request failed",
+    "self_check": "small model found the KB excerpts insufficient",
+    "low_grounding": "small model's answer did not match the KB"
+}
+
+
+def combine_usage(first: Optional[Dict], second: Optional[Dict]) -> Optional[Dict]:
+    """Token usage of two calls added up (None when neither reported any)."""
+    if not first or not second:
+        return first or second
+    return {key: None if first.get(key) is None and second.get(key) is None
+            else (first.get(key) or 0) + (second.get(key) or 0)
+            for key in dict.fromkeys([*first, *second])}
+
+
+class CascadeClient(BaseAIClient):
+    """
+    Small-to-large model cascade over two clients of one provider.
+
+    First-turn questions go to the small model with the best-matching KB
+    sections (BM25) instead of the whole KB. Its answer is kept when the
+    model did not flag the excerpts as insufficient and at least
+    ``min_grounding`` of it matches the KB (``CitationIndex``), or it is
+    too short to cite at all; otherwise
+    the large model answers with the full KB, as it does for follow-ups,
+    whose meaning depends on the conversation rather than the question alone.
+
+    Both clients log their own calls to the usage ledger, so an escalated
+    question shows up as one call per model.
+    """
+
+    def __init__(self, small: BaseAIClient, large: BaseAIClient, kb_loader: KBLoader,
+                 search_index: Optional[KBSearchIndex] = None, citation_index: Optional[CitationIndex] = None,
+                 top_k: int = DEFAULT_TOP_K, min_grounding: float = DEFAULT_MIN_GROUNDING):
+        """
+        Initialize the cascade.
+
+        Args:
+            small: Client for the small model; its prompts are built from
+                per-question excerpts, so it stops caching them
+            large: Client for the large model
+            kb_loader: Loader for the catalog and KB sections
+            search_index: Index to retrieve sections from (one is built
+                when not given)
+            citation_index: Index to score grounding with (one is built
+                when not given)
+            top_k: Sections given to the small model
+            min_grounding: Minimum grounded share of a small answer
+        """
+        self.small = small
+        self.small.cache_prompts = False
+        self.large = large
+        self.kb_loader = kb_loader
+        self.search_index = search_index if search_index is not None else KBSearchIndex(kb_loader)
+        self.citation_index = citation_index if citation_index is not None else CitationIndex(kb_loader)
+        self.top_k = top_k
+        self.min_grounding = min_grounding
+        self.PROVIDER = large.PROVIDER
+        # Part of response cache keys, so cascade answers are cached apart
+        # from the large model's
+        self.model = f"{small.model}>{large.model}"
+        self.available = getattr(large, "available", True)
+        self.WARM_UP_TTL = large.WARM_UP_TTL
+
+    @classmethod
+    def for_provider(cls, provider: str, api_key: Optional[str], kb_loader: KBLoader,
+                     **kwargs) -> Optional["CascadeClient"]:
+        """
+        Cascade over the small and large models in ``AIClientFactory.PROVIDERS``.
+
+        Args:
+            provider: Provider key (e.g. 'groq')
+            api_key: Provider API key (None for Ollama)
+            kb_loader: Loader for the catalog and KB sections
+            **kwargs: ``base_url`` for both clients; other keyword arguments
+                go to the cascade (search_index, citation_index, top_k,
+                min_grounding)
+
+        Returns:
+            The cascade, or None when the provider has no model tiers or a
+            client cannot be created
+        """
+        tiers = AIClientFactory.PROVIDERS.get(provider, {}).get("models")
+        if not tiers:
+            return None
+        client_kwargs = {"base_url": kwargs.pop("base_url")} if "base_url" in kwargs else {}
+        small = AIClientFactory.create_client(provider, api_key, model=tiers["small"], **client_kwargs)
+        large = AIClientFactory.create_client(provider, api_key, model=tiers["large"], **client_kwargs)
+        if small is None or large is None:
+            return None
+        return cls(small, large, kb_loader, **kwargs)
+
+    def get_provider_name(self) -> str:
+        return f"{self.large.get_provider_name()} · {self.small.model} first"
+
+    def warm_up(self, source_name: str, kb_content: str) -> Dict:
+        """Warm the large model, the only one that sees the full KB prompt."""
+        return self.large.warm_up(source_name, kb_content)
+
+    def _source_slug(self, source_name: str) -> Optional[str]:
+        for slug, metadata in self.kb_loader.get_available_sources().items():
+            if metadata["display_name"] == source_name:
+                return slug
+        return None
+
+    def _excerpts(self, source_slug: str, question: str) -> str:
+        """The KB sections that best match the question, as markdown."""
+        if not self.search_index.is_indexed(source_slug):
+            self.search_index.index_source(source_slug)
+        results = self.search_index.search(question, [source_slug], self.top_k)
+        return "\n\n".join(f"## {result['section_id']}\n{result['content']}" for result in results)
+
+    def _try_small(self, question: str, source_name: str,
+                   chat_history: Optional[List[Dict]]) -> Tuple[Optional[Dict], str, Optional[Dict]]:
+        """
+        Answer with the small model.
+
+        Returns:
+            Tuple of (the accepted response or None, reason, small model
+            usage), where reason says why the answer was kept or escalated
+        """
+        if chat_history:
+            return None, "follow_up", None
+        source_slug = self._source_slug(source_name)
+        excerpts = self._excerpts(source_slug, question) if source_slug else ""
+        if not excerpts:
+            return None, "no_context", None
+
+        response = self.small.get_response(question + SELF_CHECK_INSTRUCTION, excerpts, source_name)
+        usage = response.get("usage")
+        if not response["success"]:
+            return None, "small_failed", usage
+        if ESCALATE_MARKER in response["response"]:
+            return None, "self_check", usage
+        with span("cascade.check", self.PROVIDER):
+            grounding = self.citation_index.cite(source_slug, response["response"])
+        # Answers too short to cite ("514/udp") have nothing to check, as in
+        # cite(); the large model would not make them any more checkable
+        if grounding["success"] and not grounding["sentences"]:
+            return {**response, "grounding": None}, "uncitable", usage
+        if grounding["grounding"] < self.min_grounding:
+            return None, "low_grounding", usage
+        return {**response, "grounding": grounding["grounding"]}, "grounded", usage
+
+    def _tier(self, tier: str, reason: str) -> Dict:
+        """Fields added to a response (or done event) to say which model answered and why."""
+        record_cascade(self.PROVIDER, tier, reason)
+        if tier == "small":
+            return {"model": self.small.model, "tier": "small", "escalation_reason": None}
+        return {"model": self.large.model, "tier": "large", "escalation_reason": reason}
+
+    def get_response(self, question: str, kb_content: str, source_name: str,
+                     chat_history: Optional[List[Dict]] = None) -> Dict:
+        """
+        Answer with the small model when it is confident, else the large one.
+
+        Returns:
+            The answering model's response dictionary plus 'model', 'tier'
+            ('small' or 'large') and 'escalation_reason' (None when the
+            small model answered); 'usage' covers both calls
+        """
+        with span("cascade.small", self.PROVIDER):
+            small_response, reason, small_usage = self._try_small(question, source_name, chat_history)
+        if small_response is not None:
+            return {**small_response, **self._tier("small", reason)}
+        response = self.large.get_response(question, kb_content, source_name, chat_history)
+        return {**response, "usage": combine_usage(small_usage, response.get("usage")),
+                **self._tier("large", reason)}
+
+    def stream_response(self, question: str, kb_content: str, source_name: str,
+                        chat_history: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """
+        Stream a cascade answer. The small model's answer has to be checked
+        before it is shown, so it arrives as one delta; escalated answers
+        stream from the large model. The done event carries 'model', 'tier'
+        and 'escalation_reason'.
+        """
+        with span("cascade.small", self.PROVIDER):
+            small_response, reason, small_usage = self._try_small(question, source_name, chat_history)
+        if small_response is not None:
+            yield {"type": "delta", "text": small_response["response"]}
+            yield {"type": "done", "success": True, "message": small_response["message"],
+                   "usage": small_response.get("usage"), **self._tier("small", reason)}
+            return
+        for event in self.large.stream_response(question, kb_content, source_name, chat_history):
+            if event["type"] == "done":
+                event = {**event, "usage": combine_usage(small_usage, event.get("usage")),
+                         **self._tier("large", reason)}
+            yield event
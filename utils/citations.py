@@ -0,0 +1,246 @@
+"""
+Answer Citations
+Links the sentences of an AI answer back to the KB sections they came from,
+with a rolling-hash n-gram index built once per KB version, and flags
+answers that the KB does not support.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .kb_loader import KBLoader
+from .telemetry import span
+
+# Bigrams of content words: longer n-grams miss paraphrased sentences, and
+# the coverage threshold keeps shared vocabulary from counting as support
+DEFAULT_NGRAM = 2
+# Share of a sentence's n-grams that must occur in one KB section for the
+# sentence to count as grounded there
+DEFAULT_MIN_COVERAGE = 0.35
+# Share of an answer's citable words that must be grounded; below it the
+# answer is flagged as ungrounded
+DEFAULT_GROUNDING_THRESHOLD = 0.3
+
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_LINE_MARKUP_RE = re.compile(r"^\s*(?:#{1,6}\s+|[-*+]\s+|\d+[.)]\s+|>\s*)*")
+_FENCE_RE = re.compile(r"^\s*```")
+
+# Words too common to anchor a match; dropping them lets n-grams survive
+# light rephrasing ("a premium license is required" / "requires the Premium license")
+STOP_WORDS = frozenset("""
+a an and are as at be been by can do does for from has have if in into is it its may must of on or
+should so that the their then there these this to was were which will with you your
+""".split())
+
+
+def content_words(text: str) -> List[str]:
+    """Lowercase words of a text, without stop words."""
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def ngram_hashes(words: List[str], n: int) -> List[int]:
+    """
+    Rabin-Karp hashes of every run of ``n`` consecutive words, each computed
+    from the previous one in constant time.
+    """
+    if len(words) < n:
+        return []
+    ids = [hash(word) % _MOD for word in words]
+    power = pow(_BASE, n - 1, _MOD)
+    value = 0
+    for word_id in ids[:n]:
+        value = (value * _BASE + word_id) % _MOD
+    hashes = [value]
+    for i in range(n, len(ids)):
+        value = ((value - ids[i - n] * power) * _BASE + ids[i]) % _MOD
+        hashes.append(value)
+    return hashes
+
+
+def split_sentences(answer: str) -> List[str]:
+    """
+    Split a markdown answer into sentences. Lines are split at sentence
+    punctuation, list and heading markers are dropped, and each line of a
+    code block is kept as one unit (configuration copied from the KB).
+    """
+    sentences = []
+    in_code = False
+    for line in answer.split('\n'):
+        if _FENCE_RE.match(line):
+            in_code = not in_code
+            continue
+        if in_code:
+            if line.strip():
+                sentences.append(line.strip())
+            continue
+        text = _LINE_MARKUP_RE.sub("", line).strip()
+        sentences.extend(part for part in _SENTENCE_END_RE.split(text) if part)
+    return sentences
+
+
+class _SourceIndex:
+    """N-gram postings of one KB version: hash -> indices of the sections containing it."""
+
+    def __init__(self, content: str, sections: List[Dict], n: int):
+        self.content = content
+        self.sections = [{"section": section["id"], "anchor": section["anchor"]} for section in sections]
+        postings: Dict[int, List[int]] = {}
+        for position, section in enumerate(sections):
+            for value in set(ngram_hashes(content_words(section["title"] + "\n" + section["content"]), n)):
+                postings.setdefault(value, []).append(position)
+        self.postings: Dict[int, Tuple[int, ...]] = {value: tuple(found) for value, found in postings.items()}
+
+
+class CitationIndex:
+    """
+    Maps answer sentences to KB sections.
+
+    Each KB version is indexed once: every section's content words are
+    hashed into overlapping n-grams with a rolling hash, and each hash
+    points at the sections it occurs in. Citing an answer hashes its
+    sentences the same way and looks the n-grams up, so the cost grows with
+    the length of the answer, not of the KB (a few milliseconds for long
+    answers). Indices are rebuilt when the KB content changes and dropped
+    on the loader's change notifications.
+    """
+
+    def __init__(self, kb_loader: KBLoader, n: int = DEFAULT_NGRAM,
+                 min_coverage: float = DEFAULT_MIN_COVERAGE,
+                 grounding_threshold: float = DEFAULT_GROUNDING_THRESHOLD):
+        """
+        Initialize the index.
+
+        Args:
+            kb_loader: Loader to read KB sections from; the index subscribes
+                to its change notifications
+            n: Words per n-gram
+            min_coverage: Share of a sentence's n-grams one section must
+                contain for the sentence to be cited
+            grounding_threshold: Minimum grounded share of an answer's
+                citable words before it is flagged as ungrounded
+        """
+        self.kb_loader = kb_loader
+        self.n = n
+        self.min_coverage = min_coverage
+        self.grounding_threshold = grounding_threshold
+        self._sources: Dict[str, _SourceIndex] = {}
+        self._lock = threading.Lock()
+        kb_loader.add_change_listener(self._on_kb_changed)
+
+    def _on_kb_changed(self, source_slugs) -> None:
+        with self._lock:
+            for slug in source_slugs:
+                self._sources.pop(slug, None)
+
+    def _source_index(self, source_slug: str) -> Optional[_SourceIndex]:
+        kb_data = self.kb_loader.load_kb_content(source_slug)
+        if not kb_data["success"]:
+            return None
+        content = kb_data["content"]
+        with self._lock:
+            index = self._sources.get(source_slug)
+        # The loader hands out the same string until the file changes, so
+        # the identity check is the common case
+        if index is not None and (index.content is content or index.content == content):
+            return index
+        with span("citations.index", source=source_slug):
+            index = _SourceIndex(content, self.kb_loader.get_kb_section_blocks(source_slug), self.n)
+        with self._lock:
+            self._sources[source_slug] = index
+        return index
+
+    def prepare(self, source_slug: str) -> bool:
+        """Index a source ahead of its first answer; False if it has no KB."""
+        return self._source_index(source_slug) is not None
+
+    def cite(self, source_slug: str, answer: str) -> Dict:
+        """
+        Find the KB sections an answer is drawn from.
+
+        Sentences with fewer than ``n`` content words (greetings, headings)
+        are neither cited nor counted against grounding.
+
+        Args:
+            source_slug: Source whose KB the answer was generated from
+            answer: Answer text (markdown)
+
+        Returns:
+            Dictionary with 'success', 'citations' (list of {'section',
+            'anchor', 'sentences'} in order of first use), 'sentences' (list
+            of {'text', 'section', 'coverage'}; section is None when
+            ungrounded), 'grounding' (grounded share of citable words),
+            'ungrounded' and 'message' keys
+        """
+        index = self._source_index(source_slug)
+        if index is None:
+            return {"success": False, "citations": [], "sentences": [], "grounding": 0.0, "ungrounded": True,
+                    "message": f"No KB content for {source_slug}"}
+
+        with span("citations.cite", source=source_slug):
+            cited: Dict[int, int] = {}
+            sentences = []
+            citable_words = grounded_words = 0
+            for sentence in split_sentences(answer):
+                words = content_words(sentence)
+                hashes = set(ngram_hashes(words, self.n))
+                if not hashes:
+                    continue
+                votes: Dict[int, float] = {}
+                hits: Dict[int, int] = {}
+                for value in hashes:
+                    found = index.postings.get(value)
+                    if found is None:
+                        continue
+                    # An n-gram shared by many sections says little about which one
+                    for position in found:
+                        votes[position] = votes.get(position, 0.0) + 1.0 / len(found)
+                        hits[position] = hits.get(position, 0) + 1
+                best, coverage = None, 0.0
+                if votes:
+                    best = max(votes, key=votes.get)
+                    coverage = hits[best] / len(hashes)
+                    if coverage < self.min_coverage:
+                        best = None
+                citable_words += len(words)
+                if best is not None:
+                    grounded_words += len(words)
+                    cited[best] = cited.get(best, 0) + 1
+                sentences.append({
+                    "text": sentence,
+                    "section": index.sections[best]["section"] if best is not None else None,
+                    "coverage": round(coverage, 3)
+                })
+
+        grounding = grounded_words / citable_words if citable_words else 0.0
+        citations = [{**index.sections[position], "sentences": count} for position, count in cited.items()]
+        ungrounded = bool(citable_words) and grounding < self.grounding_threshold
+        return {
+            "success": True,
+            "citations": citations,
+            "sentences": sentences,
+            "grounding": round(grounding, 3),
+            "ungrounded": ungrounded,
+            "message": (f"{len(citations)} sections cited, {grounding:.0%} of the answer grounded"
+                        + (" (ungrounded)" if ungrounded else ""))
+        }
+
+
+def format_sources(citations: List[Dict], link_base: str = "") -> str:
+    """
+    Markdown line linking the cited sections, in the style of fast-path
+    answers (``*Source: [Section](#anchor)*``).
+
+    Args:
+        citations: Citations from ``CitationIndex.cite`` or ``FastAnswerEngine``
+        link_base: Prefix for the anchors, e.g. a static site page URL
+            (links point into the current page when empty)
+    """
+    if not citations:
+        return ""
+    links = ", ".join(f"[{citation['section']}]({link_base}#{citation['anchor']})" for citation in citations)
+    return f"*Source: {links}*"
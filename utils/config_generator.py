@@ -0,0 +1,368 @@
+"""
+Splunk Config Generator
+Compiles deterministic inputs/props/outputs.conf bundles from KB metadata.
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import threading
+import zipfile
+from pathlib import Path
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+from .kb_loader import KBLoader
+from .kb_tables import KBTableStore
+
+# Deployment role -> files deployed there. Parse-time props (line breaking,
+# timestamps) only take effect on the first full Splunk instance the data
+# reaches: the heavy forwarder when the data passes one (syslog/API
+# collectors, or a UF sending to an HF), otherwise the indexers. Indexers
+# ignore them for data that arrives already parsed, so a bundle puts
+# props.conf on exactly one role.
+ROLE_FILES = {
+    "forwarder": ("inputs.conf", "outputs.conf"),
+    "heavy_forwarder": ("inputs.conf", "outputs.conf", "props.conf"),
+    "indexer": ("inputs.conf", "props.conf")
+}
+DEFAULT_INDEXER_PORT = 9997
+DEFAULT_SYSLOG_PORT = 514
+
+# Sourcetypes Splunk ships with. Every source on the instance shares their
+# props, so bundles never emit stanzas for them.
+BUILTIN_SOURCETYPES = frozenset((
+    "syslog", "linux_secure", "linux_messages_syslog", "linux_bootlog", "access_combined",
+    "access_combined_wcookie", "access_common", "apache_error", "cisco_syslog", "snort",
+    "postfix_syslog", "sendmail_syslog", "windows_snare_syslog", "WinEventLog", "XmlWinEventLog",
+    "iis", "json", "_json", "csv", "tsv", "psv", "log4j", "mysqld", "mysqld_error"
+))
+
+
+def is_builtin_sourcetype(sourcetype: str) -> bool:
+    """Whether a sourcetype ships with Splunk (including ``WinEventLog:<channel>``)."""
+    return sourcetype in BUILTIN_SOURCETYPES or sourcetype.split(":", 1)[0] in ("WinEventLog", "XmlWinEventLog")
+
+
+def is_heavy_forwarder(role: str) -> bool:
+    """Whether a KB connectivity role is a heavy forwarder ("Splunk HF", "Splunk HF/Syslog Server"),
+    leaving out the either-or "Splunk HF/Indexer"."""
+    text = role.lower()
+    return bool(re.search(r"\bhf\b|heavy forwarder", text)) and "indexer" not in text
+
+
+def is_universal_forwarder(role: str) -> bool:
+    """Whether a KB connectivity role is a universal forwarder ("Windows Server (UF)")."""
+    text = role.lower()
+    return "(uf)" in text or "universal forwarder" in text
+
+# Templates are compiled once at import and reused for every bundle
+TEMPLATES = {name: Template(text) for name, text in {
+    "header": "# ${file} (${role}) for ${display_name}\n# Generated from kb/${slug}.md - do not edit by hand, regenerate instead.\n",
+    "network_input": "[${transport}://${port}]\nindex = ${index}\nsourcetype = ${sourcetype}\nconnection_host = ip\n${extra}",
+    "hec_input": "[http://${slug}]\nindex = ${index}\nsourcetype = ${sourcetype}\ntoken = <HEC_TOKEN>\ndisabled = 0\n",
+    "receiver_input": "# Receiving port for the forwarders\n[splunktcp://${port}]\ndisabled = 0\n",
+    "wineventlog_input": "[WinEventLog://${channel}]\ndisabled = 0\nindex = ${index}\n",
+    "monitor_input": "[monitor://${path}]\nindex = ${index}\nsourcetype = ${sourcetype}\ndisabled = 0\n",
+    "modular_input": (
+        "# Modular input provided by ${addon}; replace the placeholders with the\n"
+        "# values from the add-on setup page.\n"
+        "[<modular_input>://${slug}_${name}]\nindex = ${index}\nsourcetype = ${sourcetype}\ninterval = 300\ndisabled = 0\n"
+    ),
+    "props_network": "[${sourcetype}]\nSHOULD_LINEMERGE = false\n",
+    "props_api": "[${sourcetype}]\nSHOULD_LINEMERGE = false\nKV_MODE = json\n",
+    "props_addon": "# Parsing for ${sourcetype} is provided by ${addon}.\n",
+    "props_builtin": (
+        "# ${sourcetype} is a built-in Splunk sourcetype shared with other sources; its\n"
+        "# props are left unchanged. The index is set by the inputs.\n"
+    ),
+    "outputs": (
+        "[tcpout]\ndefaultGroup = ${slug}_${group}\n\n"
+        "[tcpout:${slug}_${group}]\nserver = <${host}_1>:${port}, <${host}_2>:${port}\nuseACK = true\n"
+    )
+}.items()}
+
+
+def _render(template_name: str, /, **values) -> str:
+    return TEMPLATES[template_name].substitute(**values)
+
+
+class ConfigGenerator:
+    """
+    Builds Splunk configuration bundles for catalog sources.
+
+    Inputs are derived from the KB's connectivity table (syslog/NSS ports,
+    HEC endpoints, forwarder receivers), its collection method
+    (``**Log Source Type:**``), log file table and sourcetypes. The same KB
+    always yields byte-identical output. Bundles are cached per source and
+    dropped when the KB watcher reports an edit.
+    """
+
+    def __init__(self, kb_loader: KBLoader, table_store: Optional[KBTableStore] = None):
+        """
+        Initialize the generator.
+
+        Args:
+            kb_loader: Loader providing catalog metadata and KB content
+            table_store: Parsed KB tables (built and loaded on demand if omitted)
+        """
+        self.kb_loader = kb_loader
+        self.table_store = table_store or KBTableStore(kb_loader)
+        self._cache: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        kb_loader.add_change_listener(self._on_kb_changed)
+
+    def _on_kb_changed(self, source_slugs) -> None:
+        with self._lock:
+            for source_slug in source_slugs:
+                self._cache.pop(source_slug, None)
+
+    @staticmethod
+    def collection_methods(log_source_type: str) -> List[str]:
+        """Map the KB's 'Log Source Type' text to collection methods."""
+        text = log_source_type.lower()
+        methods = []
+        if "syslog" in text:
+            methods.append("syslog")
+        if "agent" in text or "universal forwarder" in text or re.search(r"\buf\b", text):
+            methods.append("agent")
+        if "nss" in text:
+            methods.append("nss")
+        if "api" in text or "opsec" in text:
+            methods.append("api")
+        return methods or ["syslog"]
+
+    @staticmethod
+    def _match_sourcetype(path: str, sourcetypes: List[str]) -> str:
+        """Pick the sourcetype whose suffix appears in a log file name."""
+        basename = path.rsplit("/", 1)[-1]
+        for sourcetype in sourcetypes:
+            suffix = re.split(r"[_:]", sourcetype)[-1]
+            if suffix and suffix in basename:
+                return sourcetype
+        return sourcetypes[0]
+
+    def _build_inputs(self, slug: str, metadata: Dict, methods: List[str],
+                      connectivity: List[Dict], addon: str) -> Tuple[List[str], List[str]]:
+        index = metadata.get("index") or slug
+        sourcetypes = metadata.get("sourcetypes") or [slug]
+        stanzas = []
+        network_sourcetypes = []
+
+        seen = set()
+        for row in connectivity:
+            src = row["src"].lower()
+            if src.startswith("splunk") or row["port"] == 8089:
+                continue
+            key = (row["transport"], row["port"], row["protocol"].upper() == "HTTPS")
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if is_universal_forwarder(src):
+                # Forwarder-to-indexer traffic: the receiving port goes in the indexer's inputs
+                continue
+            if row["protocol"].upper() == "HTTPS":
+                stanzas.append(_render("hec_input", slug=slug, index=index, sourcetype=sourcetypes[0]))
+                network_sourcetypes.append(sourcetypes[0])
+            else:
+                extra = "no_appending_timestamp = true\n" if row["transport"] == "udp" else ""
+                stanzas.append(_render(
+                    "network_input", transport=row["transport"], port=row["port"],
+                    index=index, sourcetype=sourcetypes[0], extra=extra
+                ))
+                network_sourcetypes.append(sourcetypes[0])
+
+        if "syslog" in methods and not network_sourcetypes and "agent" not in methods:
+            stanzas.append(_render(
+                "network_input", transport="udp", port=DEFAULT_SYSLOG_PORT, index=index,
+                sourcetype=sourcetypes[0], extra="no_appending_timestamp = true\n"
+            ))
+            network_sourcetypes.append(sourcetypes[0])
+
+        if "agent" in methods:
+            windows_channels = [st.split(":", 1)[1] for st in sourcetypes if st.lower().startswith("wineventlog:")]
+            for channel in windows_channels:
+                stanzas.append(_render("wineventlog_input", channel=channel, index=index))
+            if not windows_channels:
+                paths = [
+                    row["log_type"] for row in self.table_store.query("log_types", source=slug)
+                    if row["log_type"].startswith("/")
+                ]
+                for path in paths:
+                    stanzas.append(_render(
+                        "monitor_input", path=path, index=index,
+                        sourcetype=self._match_sourcetype(path, sourcetypes)
+                    ))
+
+        if "api" in methods:
+            for sourcetype in sourcetypes:
+                if sourcetype in network_sourcetypes:
+                    continue
+                name = re.sub(r"[^a-z0-9]+", "_", sourcetype.lower()).strip("_")
+                stanzas.append(_render(
+                    "modular_input", addon=addon, slug=slug, name=name,
+                    index=index, sourcetype=sourcetype
+                ))
+
+        return stanzas, network_sourcetypes
+
+    def _build_bundle(self, slug: str) -> Dict:
+        metadata = self.kb_loader.get_source_metadata(slug)
+        if metadata is None:
+            return {"success": False, "files": {}, "message": f"Unknown source: {slug}"}
+
+        self.table_store.ensure_source(slug)
+        header_fields = self.kb_loader.get_kb_header_fields(slug)
+        methods = self.collection_methods(header_fields.get("Log Source Type", ""))
+        connectivity = self.table_store.query("connectivity", source=slug)
+        addons = [
+            row["name"] for row in self.table_store.query("components", source=slug)
+            if row["component"].lower() in ("add-on", "app", "ta")
+        ]
+        addon = addons[0] if addons else "the vendor add-on"
+        sourcetypes = metadata.get("sourcetypes") or [slug]
+
+        input_stanzas, network_sourcetypes = self._build_inputs(slug, metadata, methods, connectivity, addon)
+
+        props = []
+        for sourcetype in sourcetypes:
+            if is_builtin_sourcetype(sourcetype):
+                props.append(_render("props_builtin", sourcetype=sourcetype))
+            elif sourcetype in network_sourcetypes:
+                props.append(_render("props_network", sourcetype=sourcetype))
+            elif "api" in methods:
+                props.append(_render("props_api", sourcetype=sourcetype))
+            else:
+                props.append(_render("props_addon", sourcetype=sourcetype, addon=addon))
+
+        indexer_ports = [row["port"] for row in connectivity if "indexer" in row["dst"].lower()]
+        indexer_port = indexer_ports[0] if indexer_ports else DEFAULT_INDEXER_PORT
+        to_indexers = [_render("outputs", slug=slug, group="indexers", host="INDEXER", port=indexer_port)]
+        indexer_receiver = [_render("receiver_input", port=indexer_port)]
+
+        # Where the data is first parsed decides which role gets props.conf
+        uf_to_hf = [row["port"] for row in connectivity
+                    if is_universal_forwarder(row["src"]) and is_heavy_forwarder(row["dst"])]
+        collected_on_hf = any(
+            not is_universal_forwarder(row["src"]) and (is_heavy_forwarder(row["src"]) or is_heavy_forwarder(row["dst"]))
+            for row in connectivity
+        )
+        if collected_on_hf:
+            stanzas_by_file = {
+                ("heavy_forwarder", "inputs.conf"): input_stanzas,
+                ("heavy_forwarder", "outputs.conf"): to_indexers,
+                ("heavy_forwarder", "props.conf"): props,
+                ("indexer", "inputs.conf"): indexer_receiver
+            }
+        elif uf_to_hf:
+            stanzas_by_file = {
+                ("forwarder", "inputs.conf"): input_stanzas,
+                ("forwarder", "outputs.conf"): [_render("outputs", slug=slug, group="heavy_forwarders",
+                                                        host="HEAVY_FORWARDER", port=uf_to_hf[0])],
+                ("heavy_forwarder", "inputs.conf"): [_render("receiver_input", port=uf_to_hf[0])],
+                ("heavy_forwarder", "outputs.conf"): to_indexers,
+                ("heavy_forwarder", "props.conf"): props,
+                ("indexer", "inputs.conf"): indexer_receiver
+            }
+        else:
+            stanzas_by_file = {
+                ("forwarder", "inputs.conf"): input_stanzas,
+                ("forwarder", "outputs.conf"): to_indexers,
+                ("indexer", "inputs.conf"): indexer_receiver,
+                ("indexer", "props.conf"): props
+            }
+        files = {}
+        for role, file_names in ROLE_FILES.items():
+            for file_name in file_names:
+                if (role, file_name) not in stanzas_by_file:
+                    continue
+                header = _render("header", file=file_name, role=role, display_name=metadata["display_name"],
+                                 slug=slug)
+                files[f"{role}/{file_name}"] = header + "\n" + "\n".join(stanzas_by_file[(role, file_name)])
+
+        return {
+            "success": True,
+            "files": files,
+            "methods": methods,
+            "message": "Configuration bundle generated"
+        }
+
+    def generate(self, source_slug: str) -> Dict:
+        """
+        Generate (or return the cached) configuration bundle for a source.
+
+        Args:
+            source_slug: The slug identifier for the log source
+
+        Returns:
+            Dictionary with 'success', 'files' ('<role>/<file name>' ->
+            text, roles from ``ROLE_FILES``), 'methods' and 'message' keys
+        """
+        with self._lock:
+            cached = self._cache.get(source_slug)
+        if cached is not None:
+            return cached
+        bundle = self._build_bundle(source_slug)
+        if bundle["success"]:
+            with self._lock:
+                self._cache[source_slug] = bundle
+        return bundle
+
+    def write_bundle(self, source_slug: str, out_dir: str) -> List[Path]:
+        """Write a source's bundle to ``out_dir/<slug>/<role>/`` and return the paths."""
+        bundle = self.generate(source_slug)
+        if not bundle["success"]:
+            raise ValueError(bundle["message"])
+        target = Path(out_dir) / source_slug
+        paths = []
+        for file_name, text in bundle["files"].items():
+            path = target / file_name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def bundle_zip(self, source_slug: str) -> bytes:
+        """Return a source's bundle as zip archive bytes (for downloads), one app per role."""
+        bundle = self.generate(source_slug)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for file_name, text in bundle["files"].items():
+                role, name = file_name.split("/", 1)
+                info = zipfile.ZipInfo(f"{source_slug}_{role}/local/{name}", date_time=(1980, 1, 1, 0, 0, 0))
+                archive.writestr(info, text)
+        return buffer.getvalue()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.config_generator``."""
+    parser = argparse.ArgumentParser(description="Generate Splunk .conf bundles from the KB.")
+    parser.add_argument("sources", nargs="*", help="Source slugs (default: every catalog source)")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    parser.add_argument("--out", help="Write bundles to this directory instead of stdout")
+    args = parser.parse_args(argv)
+
+    kb_loader = KBLoader(args.kb)
+    generator = ConfigGenerator(kb_loader)
+    sources = args.sources or list(kb_loader.get_available_sources())
+
+    for source_slug in sources:
+        bundle = generator.generate(source_slug)
+        if not bundle["success"]:
+            print(bundle["message"], file=sys.stderr)
+            return 1
+        if args.out:
+            for path in generator.write_bundle(source_slug, args.out):
+                print(os.fspath(path))
+        else:
+            for file_name, text in bundle["files"].items():
+                print(f"===== {source_slug}/{file_name} =====")
+                print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""
+Connectivity Checker
+Probes the network flows listed in each KB's connectivity table against a
+host inventory, concurrently and with bounded parallelism.
+"""
+
+import argparse
+import asyncio
+import json
+import queue
+import re
+import ssl
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .kb_loader import KBLoader
+from .kb_tables import KBTableStore
+
+DEFAULT_CONCURRENCY = 200
+# Parallel probes against a single host, so a large sweep does not look like a scan
+DEFAULT_PER_HOST_LIMIT = 4
+DEFAULT_TIMEOUT = 3.0
+TLS_PORTS = {443, 6514, 8088}
+
+STATUS_ICONS = {
+    "open": "✅",
+    "tls_ok": "🔒",
+    "closed": "❌",
+    "timeout": "⏱️",
+    "tls_error": "⚠️",
+    "dns_error": "❓",
+    "error": "❌",
+    "skipped": "➖",
+    "unresolved": "·"
+}
+
+_ROLE_ALIASES = (
+    (re.compile(r"\bhf\b"), "heavy forwarder"),
+    (re.compile(r"\buf\b"), "universal forwarder"),
+    (re.compile(r"\bmgmt\b"), "management"),
+)
+_HOSTNAME_RE = re.compile(r"^[a-z0-9][a-z0-9\-.]*\.[a-z]{2,}$", re.IGNORECASE)
+
+
+def normalize_role(role: str) -> str:
+    """Canonical form of a KB role name ("Splunk HF" -> "heavy forwarder")."""
+    text = re.sub(r"\(.*?\)", " ", role.lower())
+    text = re.sub(r"\bsplunk\b", " ", text)
+    for pattern, replacement in _ROLE_ALIASES:
+        text = pattern.sub(replacement, text)
+    return " ".join(text.split())
+
+
+def parse_inventory(text: str) -> Dict[str, List[Dict]]:
+    """
+    Parse a host inventory.
+
+    Accepts JSON (``{"Splunk Indexer": ["idx1", {"host": "idx2", "timeout": 5}]}``)
+    or one ``Role: host1, host2`` line per role.
+
+    Returns:
+        Mapping of normalized role to a list of {'host', 'timeout'} entries
+    """
+    text = text.strip()
+    if not text:
+        return {}
+    if text.startswith("{"):
+        raw = json.loads(text)
+    else:
+        raw = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            role, separator, hosts = line.partition(":") if ":" in line else line.partition("=")
+            if not separator:
+                raise ValueError(f"Inventory line is not 'Role: host, host': {line}")
+            raw[role.strip()] = [host.strip() for host in hosts.split(",") if host.strip()]
+
+    inventory: Dict[str, List[Dict]] = {}
+    for role, hosts in raw.items():
+        if isinstance(hosts, (str, dict)):
+            hosts = [hosts]
+        entries = inventory.setdefault(normalize_role(role), [])
+        for host in hosts:
+            entry = {"host": host, "timeout": None} if isinstance(host, str) else {
+                "host": host["host"], "timeout": host.get("timeout")
+            }
+            entries.append(entry)
+    return inventory
+
+
+class ConnectivityChecker:
+    """
+    Plans and runs TCP connect and TLS handshake probes for KB flows.
+
+    Each connectivity row's destination role is resolved through the
+    inventory (literal hostnames in the KB, such as SaaS API endpoints, are
+    probed as-is). Identical host/port probes required by several sources
+    run once. A global semaphore bounds concurrency and a per-host
+    semaphore keeps any single host from being flooded. UDP flows cannot
+    be confirmed by a connect and are reported as skipped.
+    """
+
+    def __init__(self, table_store: KBTableStore, inventory: Optional[Dict[str, List[Dict]]] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize the checker.
+
+        Args:
+            table_store: Table store providing each source's connectivity rows
+            inventory: Parsed inventory (see ``parse_inventory``)
+            concurrency: Maximum probes in flight
+            per_host_limit: Maximum probes in flight against one host
+            timeout: Default seconds per probe; inventory entries may override it
+        """
+        self.table_store = table_store
+        self.inventory = inventory or {}
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def _resolve(self, role: str) -> List[Dict]:
+        """Hosts for a KB role; "A/B" roles match either part."""
+        candidates = [role] + [part for part in role.split("/") if part != role]
+        hosts = []
+        for candidate in candidates:
+            key = normalize_role(candidate)
+            # "Indexer" in "Splunk HF/Indexer" should match an inventory "Splunk Indexer"
+            hosts.extend(self.inventory.get(key, []))
+        if not hosts and _HOSTNAME_RE.match(role.strip()):
+            hosts = [{"host": role.strip(), "timeout": None}]
+        unique = {}
+        for entry in hosts:
+            unique.setdefault(entry["host"], entry)
+        return list(unique.values())
+
+    @staticmethod
+    def _probe_kind(row: Dict) -> str:
+        if row["transport"] == "udp":
+            return "udp"
+        if row["protocol"].upper() in ("HTTPS", "TLS") or row["port"] in TLS_PORTS:
+            return "tls"
+        return "tcp"
+
+    def _matches_vantage(self, row: Dict, vantage: Optional[str]) -> bool:
+        if not vantage:
+            return True
+        wanted = normalize_role(vantage)
+        return any(normalize_role(part) == wanted for part in [row["src"]] + row["src"].split("/"))
+
+    def plan(self, source_slugs: Iterable[str], vantage: Optional[str] = None) -> List[Dict]:
+        """
+        Expand the connectivity rows of some sources into probes.
+
+        Args:
+            source_slugs: Sources whose flows should be checked
+            vantage: Only keep flows whose source role matches this one
+                (the role of the machine running the checks)
+
+        Returns:
+            List of probe dicts with 'host', 'port', 'kind', 'timeout',
+            'dst', 'src', 'protocol' and 'sources'; roles without hosts
+            yield probes with host None
+        """
+        probes: Dict[tuple, Dict] = {}
+        for source_slug in source_slugs:
+            self.table_store.ensure_source(source_slug)
+            for row in self.table_store.query("connectivity", source=source_slug):
+                if not self._matches_vantage(row, vantage):
+                    continue
+                kind = self._probe_kind(row)
+                hosts = self._resolve(row["dst"]) or [{"host": None, "timeout": None}]
+                for entry in hosts:
+                    key = (entry["host"] or row["dst"], row["port"], kind)
+                    probe = probes.get(key)
+                    if probe is None:
+                        probe = probes[key] = {
+                            "host": entry["host"],
+                            "port": row["port"],
+                            "kind": kind,
+                            "timeout": entry["timeout"] or self.timeout,
+                            "dst": row["dst"],
+                            "src": row["src"],
+                            "protocol": row["protocol"],
+                            "purpose": row["purpose"],
+                            "sources": []
+                        }
+                    if source_slug not in probe["sources"]:
+                        probe["sources"].append(source_slug)
+        return list(probes.values())
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _tls_context() -> ssl.SSLContext:
+        return ssl.create_default_context()
+
+    async def _probe(self, probe: Dict, tls_context: ssl.SSLContext) -> Dict:
+        result = {**probe, "status": "", "latency_ms": None, "detail": ""}
+        if probe["host"] is None:
+            result.update(status="unresolved", detail=f"No inventory hosts for '{probe['dst']}'")
+            return result
+        if probe["kind"] == "udp":
+            result.update(status="skipped", detail="UDP is connectionless; verify with utils.syslog_receiver")
+            return result
+
+        started = time.perf_counter()
+        writer = None
+        try:
+            if probe["kind"] == "tls":
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(probe["host"], probe["port"], ssl=tls_context,
+                                            server_hostname=probe["host"]),
+                    probe["timeout"]
+                )
+                ssl_object = writer.get_extra_info("ssl_object")
+                result.update(status="tls_ok", detail=ssl_object.version() if ssl_object else "")
+            else:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(probe["host"], probe["port"]), probe["timeout"]
+                )
+                result["status"] = "open"
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        except asyncio.TimeoutError:
+            result.update(status="timeout", detail=f"No answer within {probe['timeout']}s")
+        except ssl.SSLError as e:
+            result.update(status="tls_error", detail=getattr(e, "reason", None) or str(e))
+        except ConnectionRefusedError:
+            result.update(status="closed", detail="Connection refused")
+        except OSError as e:
+            # getaddrinfo failures surface as socket.gaierror, a subclass of OSError
+            status = "dns_error" if e.__class__.__name__ == "gaierror" else "error"
+            result.update(status=status, detail=e.strerror or str(e))
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await asyncio.wait_for(writer.wait_closed(), 1.0)
+                except (OSError, asyncio.TimeoutError, ssl.SSLError):
+                    pass
+        return result
+
+    async def iter_results(self, probes: List[Dict]):
+        """
+        Run probes concurrently and yield each result as it completes.
+
+        Args:
+            probes: Probes from ``plan``
+
+        Yields:
+            Probe dicts extended with 'status', 'latency_ms' and 'detail'
+        """
+        limit = asyncio.Semaphore(self.concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        tls_context = self._tls_context()
+
+        async def bounded(probe: Dict) -> Dict:
+            host_limit = host_limits.setdefault(probe["host"] or "", asyncio.Semaphore(self.per_host_limit))
+            async with limit, host_limit:
+                return await self._probe(probe, tls_context)
+
+        tasks = [asyncio.ensure_future(bounded(probe)) for probe in probes]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(self, probes: List[Dict]) -> List[Dict]:
+        """Run every probe and return the results in completion order."""
+        return [result async for result in self.iter_results(probes)]
+
+    def stream(self, probes: List[Dict]) -> Iterator[Dict]:
+        """
+        Synchronous view of ``iter_results`` for callers without an event
+        loop (e.g. Streamlit): probes run on a background thread and results
+        are handed over through a queue.
+        """
+        results: "queue.Queue" = queue.Queue()
+        done = object()
+
+        def worker():
+            async def pump():
+                async for result in self.iter_results(probes):
+                    results.put(result)
+            try:
+                asyncio.run(pump())
+            finally:
+                results.put(done)
+
+        threading.Thread(target=worker, name="connectivity-checker", daemon=True).start()
+        while True:
+            item = results.get()
+            if item is done:
+                return
+            yield item
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """
+    Count results per status.
+
+    Returns:
+        Dictionary with 'total', 'passed', 'failed' and 'by_status' keys
+    """
+    by_status: Dict[str, int] = {}
+    for result in results:
+        by_status[result["status"]] = by_status.get(result["status"], 0) + 1
+    passed = by_status.get("open", 0) + by_status.get("tls_ok", 0)
+    failed = sum(count for status, count in by_status.items()
+                 if status not in ("open", "tls_ok", "skipped", "unresolved"))
+    return {"total": len(results), "passed": passed, "failed": failed, "by_status": by_status}
+
+
+def results_matrix(results: List[Dict]) -> List[Dict]:
+    """
+    Pivot results into one row per target and one column per port.
+
+    Returns:
+        List of row dicts: 'Target', 'Role', then "<port>/<kind>" cells
+        holding a status icon and latency or reason
+    """
+    rows: Dict[str, Dict] = {}
+    columns = sorted({f"{result['port']}/{result['kind']}" for result in results},
+                     key=lambda column: (int(column.split("/")[0]), column))
+    for result in sorted(results, key=lambda item: (item["dst"], item["host"] or "")):
+        target = result["host"] or result["dst"]
+        row = rows.setdefault(target, {"Target": target, "Role": result["dst"], **{column: "" for column in columns}})
+        icon = STATUS_ICONS.get(result["status"], "?")
+        if result["latency_ms"] is not None:
+            cell = f"{icon} {result['latency_ms']:.0f} ms"
+        else:
+            cell = f"{icon} {result['status']}"
+        row[f"{result['port']}/{result['kind']}"] = cell
+    return list(rows.values())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.connectivity_checker``."""
+    parser = argparse.ArgumentParser(description="Check the network flows required by KB sources.")
+    parser.add_argument("sources", nargs="*", help="Source slugs (default: every catalog source)")
+    parser.add_argument("--inventory", required=True, help="Inventory file (JSON or 'Role: host, host' lines)")
+    parser.add_argument("--as", dest="vantage", help="Role of this machine, e.g. 'Splunk HF'")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum probes in flight")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT, help="Maximum probes per host")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per probe")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.inventory, encoding="utf-8") as f:
+            inventory = parse_inventory(f.read())
+    except (OSError, ValueError) as e:
+        print(f"Error reading inventory: {str(e)}", file=sys.stderr)
+        return 1
+
+    kb_loader = KBLoader(args.kb)
+    checker = ConnectivityChecker(
+        KBTableStore(kb_loader), inventory, concurrency=args.concurrency,
+        per_host_limit=args.per_host, timeout=args.timeout
+    )
+    probes = checker.plan(args.sources or list(kb_loader.get_available_sources()), args.vantage)
+
+    results = []
+    for result in checker.stream(probes):
+        results.append(result)
+        latency = f"{result['latency_ms']:.0f}ms" if result["latency_ms"] is not None else result["detail"]
+        print(f"{STATUS_ICONS.get(result['status'], '?')} {result['status']:<10} "
+              f"{result['host'] or result['dst']}:{result['port']}/{result['kind']} "
+              f"({', '.join(result['sources'])}) {latency}")
+
+    summary = summarize(results)
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
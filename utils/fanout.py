@@ -0,0 +1,197 @@
+"""
+Multi-Source Fan-Out
+Asks one question about many log sources in parallel, within the AI
+provider's rate limits, and yields each source's answer as it completes.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .ai_client import AIClientFactory, BaseAIClient
+from .fast_answer import FastAnswerEngine
+from .kb_loader import KBLoader
+from .telemetry import record_retries, span
+
+DEFAULT_MAX_WORKERS = 8
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_BACKOFF = 5.0
+BRIEF_INSTRUCTION = (
+    "Answer in at most three sentences so the answer fits in a comparison table "
+    "next to other log sources. Question: "
+)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Holds up to ``burst`` tokens and refills at ``requests_per_minute``;
+    ``acquire`` blocks until a token is available.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(requests_per_minute // 6)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting for a refill if needed.
+
+        Args:
+            timeout: Give up after this many seconds (None waits indefinitely)
+
+        Returns:
+            True when a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_seconds = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait_seconds > deadline:
+                return False
+            time.sleep(wait_seconds)
+
+
+# One limiter per provider, shared by every session and fan-out run in the process
+_limiters: Dict[str, Optional[RateLimiter]] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: Optional[str]) -> Optional[RateLimiter]:
+    """Process-wide limiter for a provider (None when it has no request limit)."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            rpm = AIClientFactory.PROVIDERS.get(provider, {}).get("requests_per_minute")
+            _limiters[provider] = RateLimiter(rpm) if rpm else None
+        return _limiters[provider]
+
+
+class FanOutRunner:
+    """
+    Answers one question for many sources concurrently.
+
+    Each source first goes through the fast-answer engine (KB table
+    lookups, no LLM call). The remaining sources are sent to the AI client
+    on a thread pool sized by the provider's ``max_concurrency``. Every
+    provider call takes a token from the provider's shared rate limiter;
+    answers from the response cache do not. KB content and system prompts
+    come from the loader and prompt caches, so repeated comparisons only
+    pay for the model calls.
+    """
+
+    def __init__(self, kb_loader: KBLoader, ai_client: Optional[BaseAIClient],
+                 fast_answer_engine: Optional[FastAnswerEngine] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the runner.
+
+        Args:
+            kb_loader: Loader providing catalog metadata and KB content
+            ai_client: Client used for questions the KB tables cannot answer
+            fast_answer_engine: Optional engine tried before the LLM
+            max_workers: Upper bound on parallel LLM calls
+        """
+        self.kb_loader = kb_loader
+        self.ai_client = ai_client
+        self.fast_answer_engine = fast_answer_engine
+        provider = getattr(ai_client, "PROVIDER", None)
+        provider_limit = AIClientFactory.PROVIDERS.get(provider, {}).get("max_concurrency") or max_workers
+        self.max_workers = max(1, min(max_workers, provider_limit))
+        self.rate_limiter = get_rate_limiter(provider)
+
+    @contextmanager
+    def _rate_token(self) -> Iterator[None]:
+        """Wait for the provider's rate limit; entered only around provider calls."""
+        if self.rate_limiter is not None:
+            with span("llm.queue", self.ai_client.PROVIDER):
+                self.rate_limiter.acquire()
+        yield
+
+    def _ask(self, source_slug: str, question: str, brief: bool) -> Dict:
+        started = time.perf_counter()
+        metadata = self.kb_loader.get_source_metadata(source_slug) or {}
+        result = {
+            "source": source_slug,
+            "display_name": metadata.get("display_name", source_slug),
+            "success": False,
+            "response": "",
+            "message": "",
+            "fast_path": False
+        }
+
+        response = {"success": False}
+        if self.fast_answer_engine is not None:
+            response = self.fast_answer_engine.answer(source_slug, question)
+            result["fast_path"] = response["success"]
+
+        if not response["success"]:
+            if self.ai_client is None:
+                response = {"success": False, "response": "", "message": "No AI provider configured"}
+            else:
+                kb_data = self.kb_loader.load_kb_content(source_slug)
+                kb_context = kb_data["content"] if kb_data["success"] else "No KB content available for this source."
+                prompt = BRIEF_INSTRUCTION + question if brief else question
+                for attempt in range(RATE_LIMIT_RETRIES + 1):
+                    if attempt:
+                        record_retries(self.ai_client.PROVIDER)
+                    response = self.ai_client.get_cached_response(
+                        question=prompt,
+                        kb_content=kb_context,
+                        source_name=result["display_name"],
+                        provider_slot=self._rate_token
+                    )
+                    # Providers report 429s as messages; back off and retry within our budget
+                    if response["success"] or "rate limit" not in response["message"].lower():
+                        break
+                    if attempt < RATE_LIMIT_RETRIES:
+                        time.sleep(RATE_LIMIT_BACKOFF * (attempt + 1))
+
+        result.update(
+            success=response["success"],
+            response=response.get("response", ""),
+            message=response.get("message", ""),
+            elapsed_seconds=round(time.perf_counter() - started, 2)
+        )
+        return result
+
+    def run(self, question: str, source_slugs: List[str], brief: bool = True) -> Iterator[Dict]:
+        """
+        Ask ``question`` about every source and yield results as they finish.
+
+        Closing the iterator early cancels the sources that have not started.
+
+        Args:
+            question: The user's question
+            source_slugs: Sources to compare
+            brief: Ask the LLM for short answers suited to a table
+
+        Yields:
+            Dicts with 'source', 'display_name', 'success', 'response',
+            'message', 'fast_path' and 'elapsed_seconds'
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fanout")
+        try:
+            pending = {executor.submit(self._ask, slug, question, brief) for slug in source_slugs}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run_all(self, question: str, source_slugs: List[str], brief: bool = True) -> List[Dict]:
+        """Blocking variant of ``run``; results are returned in ``source_slugs`` order."""
+        results = {result["source"]: result for result in self.run(question, source_slugs, brief)}
+        return [results[slug] for slug in source_slugs]
@@ -0,0 +1,229 @@
+"""
+Fast-Path Answers
+Answers lookup questions (ports, sourcetypes, indexes, add-ons, log types)
+straight from the parsed KB tables, before any LLM is called.
+"""
+
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .kb_tables import KBTableStore
+
+# Intent -> pattern that signals it
+INTENT_PATTERNS = {
+    "ports": re.compile(r"\bports?\b|\bfirewall rules?\b|\bconnectivity\b|\bnetwork requirements?\b"),
+    "sourcetype": re.compile(r"\bsource\s?types?\b"),
+    "index": re.compile(r"\bindex(?:es)?\b"),
+    "addon": re.compile(r"\badd-?ons?\b|\btechnology add-?on\b|\bparser\b|\bsplunkbase\b|\bta\b"),
+    "log_types": re.compile(r"\b(?:log|event|content) types?\b|\b(?:which|what) logs\b|\bpriority\b|\blog files?\b")
+}
+
+# Phrasing typical of a lookup ("what port ...", "which sourcetype ...")
+LOOKUP_RE = re.compile(r"^\s*(?:what|which|list|show|give me|tell me)\b")
+# A lookup asks for the intent noun itself, so the noun must come within
+# this many words of the start ("what is the primary index", not "what is
+# the data retention for the index")
+LOOKUP_WINDOW = 6
+# Phrasing that asks for reasoning, procedure or advice, better left to the LLM
+COMPLEX_RE = re.compile(
+    r"\b(?:how|why|what happens|what if|troubleshoot\w*|configure|set ?up|install\w*|explain|difference|"
+    r"compare|errors?|issues?|not working|best practices?|steps?|versions?|should)\b"
+)
+# Words that say nothing about which table rows answer the question
+FILLER_WORDS = frozenset("""
+a about all an and any are as at be between by can do does for from get go goes give have i in into is it
+its list me my need needed needs of on open opened or our please require required requires send sends sent
+show source sources splunk tell that the them there these this those to use used uses we what which with
+you your log logs event events data
+""".split())
+# Role abbreviations used in questions and in the connectivity tables
+ROLE_ALIASES = (
+    (re.compile(r"\bheavy forwarders?\b"), "hf"),
+    (re.compile(r"\buniversal forwarders?\b"), "uf")
+)
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str, skip: FrozenSet[str] = frozenset()) -> FrozenSet[str]:
+    """
+    Lowercased words of ``text`` with role aliases folded and a plural "s"
+    dropped, leaving out the words in ``skip``.
+    """
+    text = text.lower()
+    for pattern, alias in ROLE_ALIASES:
+        text = pattern.sub(alias, text)
+    return frozenset(
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in WORD_RE.findall(text) if word not in skip
+    )
+
+
+def _narrow(rows: List[Dict], words: FrozenSet[str]) -> List[Dict]:
+    """Rows whose cells mention every one of ``words``."""
+    if not words:
+        return rows
+    return [
+        row for row in rows
+        if words <= _words(" ".join(str(value) for key, value in row.items()
+                                    if key not in ("source", "section", "anchor")))
+    ]
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.75
+
+
+class FastAnswerEngine:
+    """
+    Intent classifier and answer engine over ``KBTableStore``.
+
+    ``answer`` returns the same dictionary shape as
+    ``BaseAIClient.get_response``, plus 'confidence', 'intent' and
+    'citations'. Callers only use the result when 'success' is True;
+    otherwise they fall back to the LLM.
+    """
+
+    def __init__(self, table_store: KBTableStore, threshold: float = DEFAULT_CONFIDENCE_THRESHOLD):
+        """
+        Initialize the engine.
+
+        Args:
+            table_store: Loaded table store to answer from
+            threshold: Minimum confidence required to answer without the LLM
+        """
+        self.table_store = table_store
+        self.threshold = threshold
+
+    def classify(self, question: str) -> Tuple[Optional[str], float]:
+        """
+        Classify a question into a lookup intent.
+
+        Returns:
+            (intent, confidence); intent is None when nothing matched
+        """
+        text = question.lower()
+        matched = [intent for intent, pattern in INTENT_PATTERNS.items() if pattern.search(text)]
+        if not matched:
+            return None, 0.0
+
+        head = " ".join(text.split()[:LOOKUP_WINDOW])
+        direct = LOOKUP_RE.match(text) and any(INTENT_PATTERNS[intent].search(head) for intent in matched)
+        confidence = 0.9 if direct else 0.6
+        if COMPLEX_RE.search(text):
+            confidence -= 0.4
+        if len(matched) > 1:
+            confidence -= 0.2 * (len(matched) - 1)
+        if len(text.split()) > 25:
+            confidence -= 0.2
+        return matched[0], round(max(confidence, 0.0), 2)
+
+    @staticmethod
+    def _cite(rows: List[Dict]) -> List[Dict]:
+        citations = []
+        for row in rows:
+            citation = {"section": row["section"], "anchor": row["anchor"]}
+            if citation not in citations:
+                citations.append(citation)
+        return citations
+
+    def _content_words(self, source_slug: str, question: str) -> FrozenSet[str]:
+        """
+        Words of the question that narrow the lookup (a log type, a role,
+        a transport): what is left after the lookup phrasing, intent nouns,
+        filler and the source's own name are removed.
+        """
+        text = LOOKUP_RE.sub(" ", question.lower())
+        for pattern in INTENT_PATTERNS.values():
+            text = pattern.sub(" ", text)
+        metadata = self.table_store.kb_loader.get_source_metadata(source_slug) or {}
+        source_words = _words(" ".join([source_slug.replace("_", " "), metadata.get("display_name", ""),
+                                        metadata.get("vendor", "")]))
+        return _words(text, FILLER_WORDS) - source_words
+
+    def _answer_ports(self, source_slug: str, words: FrozenSet[str]) -> Tuple[str, List[Dict]]:
+        # Roles named in the question ("between the HF and the indexers") keep only their flows
+        rows = _narrow(self.table_store.query("connectivity", source=source_slug), words)
+        lines = [
+            f"- **{row['transport'].upper()} {row['port']}** ({row['protocol']}): "
+            f"{row['src']} → {row['dst']} — {row['purpose']}"
+            for row in rows
+        ]
+        return "Required network flows:\n\n" + "\n".join(lines), rows
+
+    def _answer_sourcetype(self, source_slug: str, words: FrozenSet[str]) -> Tuple[str, List[Dict]]:
+        rows = _narrow([row for row in self.table_store.query("mappings", source=source_slug) if row["sourcetype"]],
+                       words)
+        names = ", ".join(f"`{row['sourcetype']}`" for row in rows)
+        label = "Sourcetypes" if len(rows) > 1 else "Sourcetype"
+        return f"**{label}:** {names}", rows
+
+    def _answer_index(self, source_slug: str, words: FrozenSet[str]) -> Tuple[str, List[Dict]]:
+        rows = _narrow(self.table_store.query("mappings", source=source_slug), words)
+        per_log = _narrow([row for row in self.table_store.query("log_types", source=source_slug) if row["index"]],
+                          words)
+        parts = []
+        if rows:
+            parts.append(f"**Primary Index:** `{rows[0]['index']}`")
+        if per_log:
+            parts.append("\n".join(f"- {row['log_type']}: `{row['index']}`" for row in per_log))
+        return "\n\n".join(parts), rows[:1] + per_log
+
+    def _answer_addon(self, source_slug: str, words: FrozenSet[str]) -> Tuple[str, List[Dict]]:
+        rows = _narrow([
+            row for row in self.table_store.query("components", source=source_slug)
+            if row["component"].lower() in ("add-on", "app", "ta")
+        ], words)
+        lines = [f"- **{row['name']}** — {row['purpose']}" for row in rows]
+        return "Required add-ons:\n\n" + "\n".join(lines), rows
+
+    def _answer_log_types(self, source_slug: str, words: FrozenSet[str]) -> Tuple[str, List[Dict]]:
+        # "high priority" narrows by the priority column like any other word
+        rows = _narrow(self.table_store.query("log_types", source=source_slug), words)
+        lines = [
+            f"- **{row['log_type']}** ({row['priority']})" + (f": {row['description']}" if row["description"] else "")
+            for row in rows
+        ]
+        return "Recommended log types:\n\n" + "\n".join(lines), rows
+
+    def answer(self, source_slug: str, question: str) -> Dict:
+        """
+        Try to answer a question deterministically from the KB tables.
+
+        Args:
+            source_slug: The slug identifier for the selected log source
+            question: The user's question
+
+        Returns:
+            Dictionary with 'success', 'response', 'message', 'confidence',
+            'intent' and 'citations' keys
+        """
+        intent, confidence = self.classify(question)
+        result = {
+            "success": False,
+            "response": "",
+            "message": "",
+            "confidence": confidence,
+            "intent": intent,
+            "citations": []
+        }
+
+        if intent is None or confidence < self.threshold:
+            result["message"] = "Question is not a confident KB lookup"
+            return result
+
+        # Words the tables do not know (e.g. "Sysmon") mean the question is
+        # about something narrower than the table; the LLM answers those
+        words = self._content_words(source_slug, question)
+        text, rows = getattr(self, f"_answer_{intent}")(source_slug, words)
+        if not rows:
+            result["message"] = f"No KB data found for intent '{intent}'" + (
+                f" matching {', '.join(sorted(words))}" if words else "")
+            return result
+
+        citations = self._cite(rows)
+        sources = ", ".join(f"[{citation['section']}](#{citation['anchor']})" for citation in citations)
+        result.update({
+            "success": True,
+            "response": f"{text}\n\n*Source: {sources}*",
+            "message": "Answered from the knowledge base",
+            "citations": citations
+        })
+        return result
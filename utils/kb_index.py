@@ -0,0 +1,239 @@
+"""
+KB Search Index
+BM25 index over KB sections with incremental, hash-based re-indexing.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .kb_loader import KBLoader
+
+# Compound tokens keep Splunk identifiers such as "pan:firewall" or
+# "inputs.conf" searchable as a unit; their parts are indexed as well.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[:._\-][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+DocKey = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into compound tokens plus their parts."""
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(_PART_RE.findall(token))
+    return tokens
+
+
+def section_hash(section: Dict) -> str:
+    """Content hash of a section, covering its title and body."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(section["title"].encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(section["content"].encode("utf-8"))
+    return digest.hexdigest()
+
+
+class KBSearchIndex:
+    """
+    BM25 search index over the sections of every KB.
+
+    Each indexed section remembers its content hash. When a KB changes only
+    the sections whose hash differs are re-tokenized; document frequencies,
+    the document count and the total length are adjusted in place, so the
+    cost of a re-index is proportional to the size of the edit.
+    """
+
+    def __init__(self, kb_loader: Optional[KBLoader] = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the index.
+
+        Args:
+            kb_loader: Loader to read sections from; when given, the index
+                subscribes to its change notifications
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.kb_loader = kb_loader
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: Dict[DocKey, Dict] = {}
+        self._source_hashes: Dict[str, Dict[str, str]] = {}
+        self._postings: Dict[str, Dict[DocKey, int]] = {}
+        self._total_length = 0
+
+        if kb_loader is not None:
+            kb_loader.add_change_listener(self._on_kb_changed)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _add_doc(self, key: DocKey, section: Dict, digest: str) -> None:
+        tf = Counter(tokenize(section["title"] + "\n" + section["content"]))
+        length = sum(tf.values())
+        self._docs[key] = {
+            "hash": digest,
+            "title": section["title"],
+            "anchor": section["anchor"],
+            "content": section["content"],
+            "length": length,
+            "tf": tf
+        }
+        self._total_length += length
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[key] = count
+
+    def _remove_doc(self, key: DocKey) -> None:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        self._total_length -= doc["length"]
+        for term in doc["tf"]:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+
+    def update_source(self, source_slug: str, sections: List[Dict]) -> Dict:
+        """
+        Bring a source's sections up to date, touching only what changed.
+
+        Args:
+            source_slug: The slug identifier for the log source
+            sections: Section blocks as returned by ``KBLoader.get_kb_section_blocks``
+
+        Returns:
+            Dictionary with 'added', 'modified', 'removed' and 'unchanged' counts
+        """
+        new_hashes = {section["id"]: section_hash(section) for section in sections}
+        by_id = {section["id"]: section for section in sections}
+
+        with self._lock:
+            old_hashes = self._source_hashes.get(source_slug, {})
+            stats = {"added": 0, "modified": 0, "removed": 0, "unchanged": 0}
+
+            for section_id in old_hashes.keys() - new_hashes.keys():
+                self._remove_doc((source_slug, section_id))
+                stats["removed"] += 1
+
+            for section_id, digest in new_hashes.items():
+                old_digest = old_hashes.get(section_id)
+                if old_digest == digest:
+                    stats["unchanged"] += 1
+                    continue
+                key = (source_slug, section_id)
+                if old_digest is not None:
+                    self._remove_doc(key)
+                    stats["modified"] += 1
+                else:
+                    stats["added"] += 1
+                self._add_doc(key, by_id[section_id], digest)
+
+            if new_hashes:
+                self._source_hashes[source_slug] = new_hashes
+            else:
+                self._source_hashes.pop(source_slug, None)
+
+        return stats
+
+    def remove_source(self, source_slug: str) -> None:
+        """Remove every section of a source from the index."""
+        self.update_source(source_slug, [])
+
+    def index_source(self, source_slug: str) -> Dict:
+        """(Re-)index a source from the attached loader."""
+        if self.kb_loader is None:
+            raise ValueError("index_source requires a KBLoader")
+        return self.update_source(source_slug, self.kb_loader.get_kb_section_blocks(source_slug))
+
+    def index_all(self) -> None:
+        """Index every source in the loader's catalog that is not indexed yet."""
+        if self.kb_loader is None:
+            raise ValueError("index_all requires a KBLoader")
+        for source_slug in self.kb_loader.get_available_sources():
+            if source_slug not in self._source_hashes:
+                self.index_source(source_slug)
+
+    def _on_kb_changed(self, source_slugs) -> None:
+        for source_slug in source_slugs:
+            if source_slug in self._source_hashes or self.kb_loader.source_exists(source_slug):
+                self.index_source(source_slug)
+
+    def is_indexed(self, source_slug: str) -> bool:
+        return source_slug in self._source_hashes
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed sections containing ``term``."""
+        return len(self._postings.get(term, ()))
+
+    @property
+    def num_sections(self) -> int:
+        return len(self._docs)
+
+    def search(
+        self,
+        query: str,
+        source_slugs: Optional[List[str]] = None,
+        top_k: int = 5
+    ) -> List[Dict]:
+        """
+        Rank KB sections against a free-text query with BM25.
+
+        Args:
+            query: Free-text query
+            source_slugs: Restrict results to these sources (all when None)
+            top_k: Maximum number of results
+
+        Returns:
+            List of dictionaries with 'source', 'section_id', 'title',
+            'anchor', 'score' and 'content' keys, best first
+        """
+        terms = set(tokenize(query))
+        allowed = set(source_slugs) if source_slugs is not None else None
+
+        with self._lock:
+            num_docs = len(self._docs)
+            if not num_docs or not terms:
+                return []
+            avg_length = self._total_length / num_docs
+            scores: Dict[DocKey, float] = {}
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+                for key, tf in postings.items():
+                    if allowed is not None and key[0] not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._docs[key]["length"] / avg_length)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            results = []
+            for (source_slug, section_id), score in ranked:
+                doc = self._docs[(source_slug, section_id)]
+                results.append({
+                    "source": source_slug,
+                    "section_id": section_id,
+                    "title": doc["title"],
+                    "anchor": doc["anchor"],
+                    "score": round(score, 4),
+                    "content": doc["content"]
+                })
+        return results
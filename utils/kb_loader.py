@@ -4,83 +4,236 @@ Handles loading and parsing of markdown KB files and references.
 """
 
 import os
+import re
 import json
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .telemetry import cache_event, span
 
 class KBLoader:
     """Loads and manages Knowledge Base content for log sources."""
     
-    def __init__(self, kb_path: str = "kb"):
+    # Bump when the manifest layout changes so stale caches are discarded
+    MANIFEST_VERSION = 1
+    
+    _HEADER_FIELD_RE = re.compile(r"^\*\*([^*:]+):\*\*[ \t]*(.+?)[ \t]*$", re.MULTILINE)
+    
+    def __init__(self, kb_path: str = "kb", cache_path: Optional[str] = None):
         """
         Initialize the KB Loader.
         
         Args:
             kb_path: Path to the knowledge base directory
+            cache_path: Directory for generated cache files
+                (defaults to ``.cache`` next to the KB directory)
         """
         self.kb_path = Path(kb_path)
         self.references_file = self.kb_path / "references.json"
+        self.cache_path = Path(cache_path) if cache_path else self.kb_path.parent / ".cache"
+        self.manifest_file = self.cache_path / "catalog_manifest.json"
+        self._lock = threading.RLock()
+        self._content_cache: Dict[str, str] = {}
+        self._references_cache: Optional[Dict] = None
+        self._change_listeners: List[Callable[[Set[str]], None]] = []
         self._sources_catalog = self._load_sources_catalog()
     
     def _load_sources_catalog(self) -> Dict:
         """
         Load the catalog of available log sources.
+        
+        The catalog is discovered from the front-matter of the markdown
+        files in the KB directory. Results are kept in a manifest cache that
+        is only rescanned when the KB directory's mtime changes, and even
+        then only files whose own mtime changed are re-parsed.
+        
         Returns a dictionary mapping source slugs to their metadata.
         """
-        # Define the catalog of supported log sources
-        catalog = {
-            "palo_alto": {
-                "display_name": "Palo Alto Firewall",
-                "category": "Firewall",
-                "vendor": "Palo Alto Networks"
-            },
-            "windows_events": {
-                "display_name": "Windows Events",
-                "category": "Operating System",
-                "vendor": "Microsoft"
-            },
-            "linux": {
-                "display_name": "Linux (Syslog)",
-                "category": "Operating System",
-                "vendor": "Various"
-            },
-            "azure_ad": {
-                "display_name": "Azure AD (Microsoft Entra ID)",
-                "category": "Identity & Access",
-                "vendor": "Microsoft"
-            },
-            "cisco_asa": {
-                "display_name": "Cisco ASA",
-                "category": "Firewall",
-                "vendor": "Cisco"
-            },
-            "checkpoint": {
-                "display_name": "Check Point Firewall",
-                "category": "Firewall",
-                "vendor": "Check Point"
-            },
-            "crowdstrike_edr": {
-                "display_name": "CrowdStrike EDR",
-                "category": "Endpoint Detection & Response",
-                "vendor": "CrowdStrike"
-            },
-            "o365": {
-                "display_name": "Office 365 (Microsoft 365)",
-                "category": "Cloud Services",
-                "vendor": "Microsoft"
-            },
-            "proofpoint": {
-                "display_name": "Proofpoint",
-                "category": "Email Security",
-                "vendor": "Proofpoint"
-            },
-            "zscaler_proxy": {
-                "display_name": "Zscaler Proxy",
-                "category": "Secure Web Gateway",
-                "vendor": "Zscaler"
-            }
+        try:
+            dir_mtime = self.kb_path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        
+        manifest = self._read_manifest()
+        if manifest.get("dir_mtime_ns") != dir_mtime:
+            manifest = self._scan_sources(manifest, dir_mtime)
+            self._write_manifest(manifest)
+        
+        entries = manifest.get("sources", {})
+        ordered = sorted(
+            entries.items(),
+            key=lambda item: (
+                item[1]["metadata"].get("order", float("inf")),
+                item[1]["metadata"]["display_name"].lower()
+            )
+        )
+        return {slug: entry["metadata"] for slug, entry in ordered}
+    
+    def _read_manifest(self) -> Dict:
+        """Read the catalog manifest cache, returning an empty one if unusable."""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") == self.MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"version": self.MANIFEST_VERSION, "sources": {}}
+    
+    def _write_manifest(self, manifest: Dict) -> None:
+        """Persist the catalog manifest; a read-only cache dir is not an error."""
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.manifest_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_file, self.manifest_file)
+        except OSError:
+            pass
+    
+    def _scan_sources(self, manifest: Dict, dir_mtime: int) -> Dict:
+        """
+        Rescan the KB directory, reusing manifest entries for unchanged files.
+        
+        Args:
+            manifest: The previous manifest (may be empty)
+            dir_mtime: Current mtime of the KB directory in nanoseconds
+            
+        Returns:
+            Fresh manifest dictionary
+        """
+        previous = manifest.get("sources", {})
+        sources = {}
+        
+        with os.scandir(self.kb_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                slug = entry.name[:-3]
+                mtime = entry.stat().st_mtime_ns
+                
+                cached = previous.get(slug)
+                if cached and cached.get("mtime_ns") == mtime:
+                    sources[slug] = cached
+                    continue
+                
+                metadata = self._read_front_matter_metadata(slug, Path(entry.path))
+                if metadata is not None:
+                    sources[slug] = {"mtime_ns": mtime, "metadata": metadata}
+        
+        return {
+            "version": self.MANIFEST_VERSION,
+            "dir_mtime_ns": dir_mtime,
+            "sources": sources
         }
-        return catalog
+    
+    def _read_front_matter_metadata(self, slug: str, kb_file: Path) -> Optional[Dict]:
+        """
+        Read only the front-matter block of a KB file and build its metadata.
+        
+        Files without front-matter are not listed in the catalog.
+        """
+        fields = {}
+        try:
+            with open(kb_file, 'r', encoding='utf-8') as f:
+                if f.readline().strip() != "---":
+                    return None
+                for line in f:
+                    line = line.strip()
+                    if line == "---":
+                        break
+                    key, sep, value = line.partition(":")
+                    if sep and key.strip():
+                        fields[key.strip()] = value.strip()
+                else:
+                    return None
+        except (OSError, UnicodeDecodeError):
+            return None
+        
+        metadata = {
+            "display_name": fields.get("display_name") or slug.replace("_", " ").title(),
+            "category": fields.get("category", "Uncategorized"),
+            "vendor": fields.get("vendor", "Unknown"),
+            "index": fields.get("index", ""),
+            "sourcetypes": [st.strip() for st in fields.get("sourcetype", "").split(",") if st.strip()]
+        }
+        if fields.get("order", "").isdigit():
+            metadata["order"] = int(fields["order"])
+        return metadata
+    
+    @staticmethod
+    def _strip_front_matter(content: str) -> str:
+        """Return the KB body with any leading front-matter block removed."""
+        if not content.startswith("---"):
+            return content
+        end = content.find("\n---", 3)
+        if end == -1:
+            return content
+        return content[end + 4:].lstrip("\n")
+    
+    def add_change_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """
+        Register a callback invoked with the set of changed source slugs.
+        
+        Indices and caches built on top of the loader use this to drop only
+        the entries that belong to edited KB files.
+        """
+        with self._lock:
+            self._change_listeners.append(callback)
+    
+    def invalidate(self, source_slugs: Iterable[str] = (), references: bool = False) -> None:
+        """
+        Drop cached data for the given sources and notify change listeners.
+        
+        Catalog entries for the sources are re-read from their front-matter,
+        so added, edited and removed KB files are reflected without a rescan
+        of the whole directory.
+        
+        Args:
+            source_slugs: Slugs whose KB files were added, modified or removed
+            references: Whether ``references.json`` changed
+        """
+        changed = set(source_slugs)
+        with self._lock:
+            if references:
+                self._references_cache = None
+            if changed:
+                manifest = self._read_manifest()
+                entries = manifest.setdefault("sources", {})
+                for slug in changed:
+                    self._content_cache.pop(slug, None)
+                    kb_file = self.kb_path / f"{slug}.md"
+                    metadata = self._read_front_matter_metadata(slug, kb_file)
+                    if metadata is None:
+                        entries.pop(slug, None)
+                    else:
+                        entries[slug] = {"mtime_ns": kb_file.stat().st_mtime_ns, "metadata": metadata}
+                try:
+                    manifest["dir_mtime_ns"] = self.kb_path.stat().st_mtime_ns
+                except OSError:
+                    pass
+                self._write_manifest(manifest)
+                self._sources_catalog = self._load_sources_catalog()
+            listeners = list(self._change_listeners)
+        
+        if changed:
+            for callback in listeners:
+                try:
+                    callback(changed)
+                except Exception:
+                    # A failing listener must not stop the others from invalidating
+                    pass
+    
+    def refresh_catalog(self) -> Dict:
+        """
+        Re-read the catalog, rescanning the KB directory if it changed.
+        
+        Returns:
+            Dictionary of source slugs to their metadata
+        """
+        self._sources_catalog = self._load_sources_catalog()
+        return self._sources_catalog
     
     def get_available_sources(self) -> Dict:
         """
@@ -101,12 +254,23 @@ class KBLoader:
         Returns:
             Dictionary with 'success', 'content', and 'message' keys
         """
+        cached = self._content_cache.get(source_slug)
+        cache_event("kb", cached is not None)
+        if cached is not None:
+            return {
+                "success": True,
+                "content": cached,
+                "message": "KB content loaded successfully"
+            }
+        
         kb_file = self.kb_path / f"{source_slug}.md"
         
         try:
             if kb_file.exists():
-                with open(kb_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                with span("kb.load", source=source_slug), open(kb_file, 'r', encoding='utf-8') as f:
+                    content = self._strip_front_matter(f.read())
+                with self._lock:
+                    self._content_cache[source_slug] = content
                 return {
                     "success": True,
                     "content": content,
@@ -136,9 +300,12 @@ class KBLoader:
             Dictionary with 'success', 'data', and 'message' keys
         """
         try:
-            if self.references_file.exists():
-                with open(self.references_file, 'r', encoding='utf-8') as f:
-                    all_references = json.load(f)
+            if self._references_cache is not None or self.references_file.exists():
+                all_references = self._references_cache
+                if all_references is None:
+                    with open(self.references_file, 'r', encoding='utf-8') as f:
+                        all_references = json.load(f)
+                    self._references_cache = all_references
                 
                 if source_slug in all_references:
                     return {
@@ -230,3 +397,89 @@ class KBLoader:
                 sections.append(line[4:].strip())
         
         return sections
+    
+    def get_kb_header_fields(self, source_slug: str) -> Dict[str, str]:
+        """
+        Extract the ``**Field:** value`` lines from a KB's Overview section
+        (e.g. 'Log Source Type', 'Primary Index', 'Sourcetype').
+        
+        Args:
+            source_slug: The slug identifier for the log source
+            
+        Returns:
+            Dictionary of field name to value with markdown code ticks removed
+        """
+        fields = {}
+        for block in self.get_kb_section_blocks(source_slug):
+            if block["level"] == 2 and block["title"].lower() == "overview":
+                for match in self._HEADER_FIELD_RE.finditer(block["content"]):
+                    fields[match.group(1).strip()] = match.group(2).replace("`", "").strip()
+                break
+        return fields
+    
+    @staticmethod
+    def heading_anchor(title: str) -> str:
+        """
+        Build the markdown anchor for a heading, matching the links the
+        rendered Integration Guide exposes (e.g. ``#network-connectivity-requirements``).
+        """
+        anchor = re.sub(r"[^\w\s-]", "", title.lower())
+        return re.sub(r"[\s-]+", "-", anchor).strip("-")
+    
+    def get_kb_section_blocks(self, source_slug: str) -> List[Dict]:
+        """
+        Split a KB file into its level-2 and level-3 sections.
+        
+        Headings inside fenced code blocks are ignored. Section ids are built
+        from the heading path plus an occurrence counter, so they stay stable
+        when unrelated sections are edited.
+        
+        Args:
+            source_slug: The slug identifier for the log source
+            
+        Returns:
+            List of dictionaries with 'id', 'title', 'level', 'anchor' and
+            'content' keys, in document order
+        """
+        kb_data = self.load_kb_content(source_slug)
+        if not kb_data["success"]:
+            return []
+        
+        blocks = []
+        seen: Dict[str, int] = {}
+        parent = ""
+        current = None
+        in_code = False
+        
+        for line in kb_data["content"].split('\n'):
+            if line.lstrip().startswith("```"):
+                in_code = not in_code
+            
+            level = 0
+            if not in_code:
+                if line.startswith('## '):
+                    level = 2
+                elif line.startswith('### '):
+                    level = 3
+            
+            if level:
+                title = line[level + 1:].strip()
+                if level == 2:
+                    parent = title
+                path = title if level == 2 else f"{parent} / {title}"
+                seen[path] = seen.get(path, 0) + 1
+                section_id = path if seen[path] == 1 else f"{path} #{seen[path]}"
+                current = {
+                    "id": section_id,
+                    "title": title,
+                    "level": level,
+                    "anchor": self.heading_anchor(title),
+                    "lines": []
+                }
+                blocks.append(current)
+            elif current is not None:
+                current["lines"].append(line)
+        
+        for block in blocks:
+            block["content"] = '\n'.join(block.pop("lines")).strip()
+        return blocks
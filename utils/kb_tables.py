@@ -0,0 +1,357 @@
+"""
+KB Table Store
+Extracts markdown tables from every KB into typed, indexed columnar tables.
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .kb_loader import KBLoader
+
+_TABLE_ROW_RE = re.compile(r"^\s*\|(.*)\|\s*$")
+_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+_PORT_RE = re.compile(r"\b(\d{1,5})\b")
+_MARKUP_RE = re.compile(r"[*`]")
+
+
+def _clean_cell(cell: str) -> str:
+    return _MARKUP_RE.sub("", cell).strip()
+
+
+def parse_markdown_tables(content: str) -> List[Dict]:
+    """
+    Parse the pipe tables in a block of markdown.
+
+    Args:
+        content: Markdown text
+
+    Returns:
+        List of dictionaries with 'headers' (list of str) and 'rows'
+        (list of dicts keyed by header)
+    """
+    tables = []
+    lines = content.split('\n')
+    i = 0
+    while i < len(lines) - 1:
+        header_match = _TABLE_ROW_RE.match(lines[i])
+        if header_match and _SEPARATOR_RE.match(lines[i + 1]):
+            headers = [_clean_cell(cell) for cell in header_match.group(1).split('|')]
+            rows = []
+            i += 2
+            while i < len(lines):
+                row_match = _TABLE_ROW_RE.match(lines[i])
+                if not row_match:
+                    break
+                cells = [_clean_cell(cell) for cell in row_match.group(1).split('|')]
+                cells += [""] * (len(headers) - len(cells))
+                rows.append(dict(zip(headers, cells)))
+                i += 1
+            tables.append({"headers": headers, "rows": rows})
+        else:
+            i += 1
+    return tables
+
+
+class ColumnarTable:
+    """
+    A typed, append-only columnar table with hash indexes.
+
+    Values are coerced to the column type on insert. String index keys are
+    case-folded so lookups are case-insensitive.
+    """
+
+    def __init__(self, name: str, schema: Dict[str, type], indexed: Iterable[str] = ()):
+        """
+        Initialize the table.
+
+        Args:
+            name: Table name
+            schema: Ordered mapping of column name to type (str, int)
+            indexed: Columns to maintain hash indexes for
+        """
+        self.name = name
+        self.schema = dict(schema)
+        self.columns: Dict[str, List[Any]] = {column: [] for column in schema}
+        self.indexed = list(indexed)
+        self._indexes: Dict[str, Dict[Any, Set[int]]] = {column: {} for column in self.indexed}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    @staticmethod
+    def _index_key(value: Any) -> Any:
+        return value.casefold() if isinstance(value, str) else value
+
+    def _coerce(self, column: str, value: Any) -> Any:
+        if value is None:
+            return None
+        column_type = self.schema[column]
+        try:
+            return column_type(value)
+        except (TypeError, ValueError):
+            return None
+
+    def append(self, row: Dict) -> int:
+        """Insert a row and return its row id."""
+        row_id = len(self)
+        for column in self.schema:
+            value = self._coerce(column, row.get(column))
+            self.columns[column].append(value)
+            if column in self._indexes:
+                self._indexes[column].setdefault(self._index_key(value), set()).add(row_id)
+        return row_id
+
+    def delete_where(self, column: str, value: Any) -> int:
+        """Delete every row whose ``column`` equals ``value``; returns rows removed."""
+        key = self._index_key(value)
+        values = self.columns[column]
+        keep = [i for i, current in enumerate(values) if self._index_key(current) != key]
+        removed = len(values) - len(keep)
+        if removed:
+            for name, data in self.columns.items():
+                self.columns[name] = [data[i] for i in keep]
+            self._rebuild_indexes()
+        return removed
+
+    def _rebuild_indexes(self) -> None:
+        for column in self.indexed:
+            index: Dict[Any, Set[int]] = {}
+            for row_id, value in enumerate(self.columns[column]):
+                index.setdefault(self._index_key(value), set()).add(row_id)
+            self._indexes[column] = index
+
+    def row(self, row_id: int) -> Dict:
+        return {column: data[row_id] for column, data in self.columns.items()}
+
+    def select(self, **filters) -> List[Dict]:
+        """
+        Return rows matching every equality filter.
+
+        Indexed columns are resolved through their hash index (smallest
+        candidate set first); remaining filters are checked per candidate.
+        """
+        candidates: Optional[Set[int]] = None
+        scan_filters = {}
+
+        indexed_filters = sorted(
+            (column for column in filters if column in self._indexes),
+            key=lambda column: len(self._indexes[column].get(self._index_key(filters[column]), ()))
+        )
+        for column in indexed_filters:
+            row_ids = self._indexes[column].get(self._index_key(filters[column]), set())
+            candidates = set(row_ids) if candidates is None else candidates & row_ids
+            if not candidates:
+                return []
+        for column, value in filters.items():
+            if column not in self._indexes:
+                if column not in self.columns:
+                    raise KeyError(f"Unknown column '{column}' in table '{self.name}'")
+                scan_filters[column] = self._index_key(value)
+
+        row_ids = sorted(candidates) if candidates is not None else range(len(self))
+        results = []
+        for row_id in row_ids:
+            if all(self._index_key(self.columns[column][row_id]) == value
+                   for column, value in scan_filters.items()):
+                results.append(self.row(row_id))
+        return results
+
+
+class KBTableStore:
+    """
+    Queryable store of the structured tables found in every KB.
+
+    Tables:
+        connectivity: source, src, dst, port, transport, protocol, purpose
+        log_types:    source, log_type, priority, description, index
+        components:   source, component, name, purpose
+        mappings:     source, index, sourcetype
+
+    Every row also carries the 'section' and 'anchor' of the KB section it
+    came from, so answers built from it can cite their origin.
+    """
+
+    SCHEMAS = {
+        "connectivity": (
+            {"source": str, "src": str, "dst": str, "port": int, "transport": str,
+             "protocol": str, "purpose": str, "section": str, "anchor": str},
+            ("source", "port", "transport", "protocol")
+        ),
+        "log_types": (
+            {"source": str, "log_type": str, "priority": str, "description": str,
+             "index": str, "section": str, "anchor": str},
+            ("source", "priority", "log_type")
+        ),
+        "components": (
+            {"source": str, "component": str, "name": str, "purpose": str,
+             "section": str, "anchor": str},
+            ("source", "component")
+        ),
+        "mappings": (
+            {"source": str, "index": str, "sourcetype": str, "section": str, "anchor": str},
+            ("source", "index", "sourcetype")
+        )
+    }
+
+    # First-column headers that identify a "log types" table
+    LOG_TYPE_HEADERS = ("log type", "event type", "log file", "content type", "event log")
+
+    def __init__(self, kb_loader: Optional[KBLoader] = None):
+        """
+        Initialize the store.
+
+        Args:
+            kb_loader: Loader to extract tables from; when given, the store
+                subscribes to its change notifications
+        """
+        self.kb_loader = kb_loader
+        self._lock = threading.RLock()
+        self._loaded: Set[str] = set()
+        self.tables: Dict[str, ColumnarTable] = {
+            name: ColumnarTable(name, schema, indexed)
+            for name, (schema, indexed) in self.SCHEMAS.items()
+        }
+        if kb_loader is not None:
+            kb_loader.add_change_listener(self._on_kb_changed)
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _transports(port_text: str, protocol: str) -> List[str]:
+        text = f"{port_text} {protocol}".upper()
+        transports = [name.lower() for name in ("TCP", "UDP") if name in text]
+        if not transports:
+            # Application protocols in the KBs: HTTPS runs over TCP, syslog defaults to UDP
+            transports = ["udp"] if "SYSLOG" in text else ["tcp"]
+        return transports
+
+    def _connectivity_rows(self, source_slug: str, table: Dict, section: Dict) -> List[Dict]:
+        rows = []
+        for row in table["rows"]:
+            port_match = _PORT_RE.search(row.get("Port", ""))
+            if not port_match:
+                continue
+            protocol = row.get("Protocol", "")
+            for transport in self._transports(row.get("Port", ""), protocol):
+                rows.append({
+                    "source": source_slug,
+                    "src": row.get("Source", ""),
+                    "dst": row.get("Destination", ""),
+                    "port": int(port_match.group(1)),
+                    "transport": transport,
+                    "protocol": protocol or transport.upper(),
+                    "purpose": row.get("Purpose", ""),
+                    "section": section["id"],
+                    "anchor": section["anchor"]
+                })
+        return rows
+
+    def _extract_source(self, source_slug: str) -> Dict[str, List[Dict]]:
+        extracted: Dict[str, List[Dict]] = {name: [] for name in self.tables}
+
+        for section in self.kb_loader.get_kb_section_blocks(source_slug):
+            for table in parse_markdown_tables(section["content"]):
+                headers = [header.lower() for header in table["headers"]]
+                cite = {"section": section["id"], "anchor": section["anchor"]}
+
+                if {"source", "destination", "port"} <= set(headers):
+                    extracted["connectivity"].extend(self._connectivity_rows(source_slug, table, section))
+                elif "priority" in headers and headers[0] in self.LOG_TYPE_HEADERS:
+                    first = table["headers"][0]
+                    for row in table["rows"]:
+                        extracted["log_types"].append({
+                            "source": source_slug,
+                            "log_type": row[first],
+                            "priority": row.get("Priority", "").split()[0].title() if row.get("Priority") else "",
+                            "description": row.get("Description", ""),
+                            "index": row.get("Index", ""),
+                            **cite
+                        })
+                elif headers[:2] == ["component", "name"]:
+                    for row in table["rows"]:
+                        extracted["components"].append({
+                            "source": source_slug,
+                            "component": row.get("Component", ""),
+                            "name": row.get("Name", ""),
+                            "purpose": row.get("Purpose", ""),
+                            **cite
+                        })
+
+        metadata = self.kb_loader.get_source_metadata(source_slug) or {}
+        if metadata.get("index"):
+            for sourcetype in metadata.get("sourcetypes") or [""]:
+                extracted["mappings"].append({
+                    "source": source_slug,
+                    "index": metadata["index"],
+                    "sourcetype": sourcetype,
+                    "section": "Overview",
+                    "anchor": "overview"
+                })
+        return extracted
+
+    def load_source(self, source_slug: str) -> None:
+        """(Re-)extract the tables of one source, replacing its previous rows."""
+        if self.kb_loader is None:
+            raise ValueError("load_source requires a KBLoader")
+        extracted = self._extract_source(source_slug)
+        with self._lock:
+            for name, table in self.tables.items():
+                table.delete_where("source", source_slug)
+                for row in extracted[name]:
+                    table.append(row)
+            self._loaded.add(source_slug)
+
+    def ensure_source(self, source_slug: str) -> None:
+        """Extract a source's tables unless they are already loaded."""
+        if source_slug not in self._loaded:
+            self.load_source(source_slug)
+
+    def remove_source(self, source_slug: str) -> None:
+        with self._lock:
+            for table in self.tables.values():
+                table.delete_where("source", source_slug)
+            self._loaded.discard(source_slug)
+
+    def load_all(self) -> "KBTableStore":
+        """Extract every catalog source that has not been loaded yet."""
+        if self.kb_loader is None:
+            raise ValueError("load_all requires a KBLoader")
+        for source_slug in self.kb_loader.get_available_sources():
+            if source_slug not in self._loaded:
+                self.load_source(source_slug)
+        return self
+
+    def _on_kb_changed(self, source_slugs) -> None:
+        for source_slug in source_slugs:
+            if self.kb_loader.source_exists(source_slug):
+                self.load_source(source_slug)
+            else:
+                self.remove_source(source_slug)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, table: str, **filters) -> List[Dict]:
+        """
+        Equality query against one table, e.g.
+        ``store.query("connectivity", transport="udp", port=514)``.
+        """
+        if table not in self.tables:
+            raise KeyError(f"Unknown table '{table}'")
+        with self._lock:
+            return self.tables[table].select(**filters)
+
+    def sources_using_port(self, port: int, transport: Optional[str] = None) -> List[str]:
+        """Slugs of sources with a connectivity requirement on ``port``."""
+        filters = {"port": port}
+        if transport:
+            filters["transport"] = transport
+        return sorted({row["source"] for row in self.query("connectivity", **filters)})
+
+    def log_types_by_priority(self, priority: str) -> List[Dict]:
+        """All log types of the given priority (e.g. "High") across sources."""
+        return self.query("log_types", priority=priority)
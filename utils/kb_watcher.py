@@ -0,0 +1,218 @@
+"""
+KB Watcher
+Detects edits under the KB directory and hot-reloads them without a restart.
+"""
+
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .kb_loader import KBLoader
+
+
+class _InotifyBackend:
+    """Linux inotify backend, accessed through ctypes (no extra dependency)."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, path: Path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        wd = libc.inotify_add_watch(self.fd, str(path).encode(), self.WATCH_MASK)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+
+    def read(self, timeout: float) -> Set[str]:
+        """Wait up to ``timeout`` seconds and return the names of changed files."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset + header_size <= len(buffer):
+            _, _, _, name_len = self.EVENT_HEADER.unpack_from(buffer, offset)
+            raw_name = buffer[offset + header_size:offset + header_size + name_len]
+            name = raw_name.rstrip(b"\0").decode("utf-8", "replace")
+            if name:
+                names.add(name)
+            offset += header_size + name_len
+        return names
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class _PollingBackend:
+    """Portable fallback that diffs directory snapshots of file mtimes and sizes."""
+
+    def __init__(self, path: Path, interval: float, stop_event: threading.Event):
+        self.path = path
+        self.interval = interval
+        self.stop_event = stop_event
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return snapshot
+
+    def read(self, timeout: float) -> Set[str]:
+        self.stop_event.wait(min(timeout, self.interval))
+        current = self._take_snapshot()
+        previous, self._snapshot = self._snapshot, current
+        return {
+            name for name in previous.keys() | current.keys()
+            if previous.get(name) != current.get(name)
+        }
+
+    def close(self) -> None:
+        pass
+
+
+class KBWatcher:
+    """
+    Watches the KB directory and invalidates affected caches incrementally.
+
+    Changes are collected and debounced, so a burst of saves (an editor
+    writing a temp file and renaming it, or a git pull touching many files)
+    results in a single ``KBLoader.invalidate`` call listing every source
+    that changed. The loader then notifies its listeners, which drop only
+    the index and prompt entries for those sources.
+    """
+
+    def __init__(
+        self,
+        kb_loader: KBLoader,
+        debounce_seconds: float = 0.5,
+        poll_interval: float = 1.0,
+        use_inotify: bool = True
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            kb_loader: Loader whose caches should be kept in sync
+            debounce_seconds: Quiet period before a batch of changes is applied
+            poll_interval: Scan interval for the polling fallback
+            use_inotify: Try the inotify backend before falling back to polling
+        """
+        self.kb_loader = kb_loader
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.backend_name: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backend = None
+
+    def _create_backend(self):
+        if self.use_inotify:
+            try:
+                backend = _InotifyBackend(self.kb_loader.kb_path)
+                self.backend_name = "inotify"
+                return backend
+            except (OSError, AttributeError):
+                pass
+        self.backend_name = "polling"
+        return _PollingBackend(self.kb_loader.kb_path, self.poll_interval, self._stop_event)
+
+    def start(self) -> "KBWatcher":
+        """Start watching in a daemon thread. Calling it twice is a no-op."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._backend = self._create_backend()
+        self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching and release the backend."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=max(self.poll_interval, self.debounce_seconds) + 1)
+        if self._backend:
+            self._backend.close()
+        self._thread = None
+        self._backend = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self) -> None:
+        pending: Set[str] = set()
+        last_event = 0.0
+
+        while not self._stop_event.is_set():
+            timeout = self.debounce_seconds if pending else self.poll_interval
+            try:
+                names = self._backend.read(timeout)
+            except OSError:
+                names = set()
+
+            if names:
+                pending.update(names)
+                last_event = time.monotonic()
+                continue
+
+            if pending and time.monotonic() - last_event >= self.debounce_seconds:
+                self.apply_changes(pending)
+                pending = set()
+
+    def apply_changes(self, file_names: Set[str]) -> List[str]:
+        """
+        Translate changed file names into a KB invalidation.
+
+        Args:
+            file_names: Names of files (relative to the KB directory) that changed
+
+        Returns:
+            Sorted list of source slugs that were invalidated
+        """
+        slugs = {name[:-3] for name in file_names if name.endswith(".md")}
+        references = self.kb_loader.references_file.name in file_names
+        if slugs or references:
+            self.kb_loader.invalidate(slugs, references=references)
+        return sorted(slugs)
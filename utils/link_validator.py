@@ -0,0 +1,360 @@
+"""
+Reference Link Validator
+Checks the URLs in ``kb/references.json`` concurrently, with per-domain rate
+limits, conditional requests and a persistent result cache.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .kb_loader import KBLoader
+
+if TYPE_CHECKING:
+    # Imported when a check runs: requests dominates this module's import
+    # time, and the app only reads cached results on startup
+    import requests
+
+CACHE_VERSION = 1
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 10.0
+# Minimum seconds between two requests to the same domain
+DEFAULT_DOMAIN_INTERVAL = 0.5
+# Cached results younger than this are trusted without a request
+DEFAULT_MAX_AGE = 24 * 3600
+USER_AGENT = "SIEM-Onboarding-Assistant link checker (+https://github.com/narsree1/Splunk-SIEM-Builder-MVP-)"
+
+_YOUTUBE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "youtu.be"}
+
+# Statuses, from the References tab's point of view
+OK_STATUSES = {"ok"}
+BROKEN_STATUSES = {"broken", "invalid"}
+
+
+def collect_links(references: Dict, source_slugs: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Flatten ``references.json`` into link entries.
+
+    Args:
+        references: Parsed references file (source -> category -> links)
+        source_slugs: Only collect these sources (default: all)
+
+    Returns:
+        List of dicts with 'source', 'category', 'title' and 'url'
+    """
+    wanted = set(source_slugs) if source_slugs is not None else None
+    links = []
+    for source_slug, categories in references.items():
+        if wanted is not None and source_slug not in wanted:
+            continue
+        for category, entries in categories.items():
+            for entry in entries:
+                if entry.get("url"):
+                    links.append({"source": source_slug, "category": category,
+                                  "title": entry.get("title", ""), "url": entry["url"]})
+    return links
+
+
+def static_check(url: str) -> Optional[str]:
+    """
+    Reject URLs that cannot be valid without a request.
+
+    YouTube answers 200 for any ``watch?v=`` URL, so malformed video IDs
+    (placeholders such as ``watch?v=splunk-guide``) are caught here.
+
+    Returns:
+        A reason string when the URL is invalid, otherwise None
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return "Not an http(s) URL"
+    host = parsed.hostname or ""
+    if host in _YOUTUBE_HOSTS:
+        if host == "youtu.be":
+            video_id = parsed.path.lstrip("/")
+        elif parsed.path == "/watch":
+            video_id = (parse_qs(parsed.query).get("v") or [""])[0]
+        else:
+            # Channels, playlists and embeds are checked over HTTP
+            return None
+        if not _YOUTUBE_ID_RE.match(video_id):
+            return f"Malformed YouTube video id '{video_id}'"
+    return None
+
+
+class LinkValidator:
+    """
+    Concurrent, cached validator for reference links.
+
+    Requests go through one pooled ``requests.Session`` driven from asyncio
+    via a bounded thread pool. A per-domain gate spaces requests to the same
+    host. Results (status, ETag, Last-Modified) are persisted in
+    ``.cache/link_status.json``; entries younger than ``max_age`` are reused
+    as-is, and stale ones are revalidated with ``If-None-Match`` /
+    ``If-Modified-Since`` so unchanged pages cost a 304.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT, domain_interval: float = DEFAULT_DOMAIN_INTERVAL,
+                 max_age: float = DEFAULT_MAX_AGE):
+        """
+        Initialize the validator.
+
+        Args:
+            cache_file: JSON file for persisted results (None keeps them in memory)
+            concurrency: Maximum requests in flight
+            timeout: Seconds per request
+            domain_interval: Minimum seconds between requests to one domain
+            max_age: Seconds a cached result stays fresh
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.domain_interval = domain_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict] = self._load_cache()
+
+    @classmethod
+    def for_loader(cls, kb_loader: KBLoader, **kwargs) -> "LinkValidator":
+        """Validator whose cache lives in the loader's cache directory."""
+        return cls(cache_file=str(kb_loader.cache_path / "link_status.json"), **kwargs)
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if self.cache_file is None:
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                return cache.get("links", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_cache(self) -> None:
+        """Persist results; a read-only cache dir is not an error."""
+        if self.cache_file is None:
+            return
+        with self._lock:
+            payload = {"version": CACHE_VERSION, "links": dict(self._results)}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=1, sort_keys=True)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+    def get_status(self, url: str) -> Optional[Dict]:
+        """Last known result for a URL, or None if it was never checked."""
+        with self._lock:
+            return self._results.get(url)
+
+    def is_fresh(self, url: str, now: Optional[float] = None) -> bool:
+        """Whether a cached result can be reused; transient errors never are."""
+        result = self.get_status(url)
+        return (result is not None and result["status"] != "error"
+                and (now or time.time()) - result["checked_at"] < self.max_age)
+
+    # ------------------------------------------------------------------
+    # Checking
+    # ------------------------------------------------------------------
+
+    def _session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    @staticmethod
+    def _classify(status_code: int) -> str:
+        if status_code < 400:
+            return "ok"
+        if status_code in (404, 410):
+            return "broken"
+        if status_code in (401, 403, 429):
+            # Often bot protection rather than a dead page
+            return "blocked"
+        return "error"
+
+    def _fetch(self, session: "requests.Session", url: str, previous: Optional[Dict]) -> Dict:
+        """Blocking HEAD (falling back to GET) with conditional headers."""
+        from requests.exceptions import RequestException
+
+        headers = {}
+        if previous and previous.get("status") == "ok":
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        result = {"url": url, "status": "error", "http_status": None, "final_url": url,
+                  "etag": None, "last_modified": None, "detail": "", "checked_at": time.time()}
+        try:
+            response = session.head(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+            if response.status_code in (403, 405, 501):
+                # Plenty of servers reject HEAD; a streamed GET avoids downloading the body
+                response = session.get(url, headers=headers, timeout=self.timeout,
+                                       allow_redirects=True, stream=True)
+                response.close()
+        except RequestException as e:
+            result["detail"] = f"{e.__class__.__name__}: {str(e)[:200]}"
+            return result
+
+        if response.status_code == 304 and previous:
+            result.update(status="ok", http_status=304, final_url=previous.get("final_url", url),
+                          etag=previous.get("etag"), last_modified=previous.get("last_modified"),
+                          detail="Not modified")
+            return result
+
+        result.update(
+            status=self._classify(response.status_code),
+            http_status=response.status_code,
+            final_url=response.url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            detail=response.reason or ""
+        )
+        return result
+
+    async def _check(self, session: "requests.Session", executor: ThreadPoolExecutor, url: str,
+                     limit: asyncio.Semaphore, domain_gates: Dict[str, List]) -> Dict:
+        reason = static_check(url)
+        if reason:
+            return {"url": url, "status": "invalid", "http_status": None, "final_url": url, "etag": None,
+                    "last_modified": None, "detail": reason, "checked_at": time.time()}
+
+        domain = urlparse(url).hostname or ""
+        gate = domain_gates.setdefault(domain, [asyncio.Lock(), 0.0])
+        # Wait for the domain's turn before taking a slot, so links queued
+        # behind a slow domain do not hold slots other domains could use
+        async with gate[0]:
+            wait = gate[1] + self.domain_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            gate[1] = time.monotonic()
+        async with limit:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self._fetch, session, url, self.get_status(url))
+
+    async def validate_async(self, urls: Iterable[str], force: bool = False) -> Dict[str, Dict]:
+        """
+        Check URLs concurrently, reusing fresh cached results.
+
+        Args:
+            urls: URLs to validate (duplicates are checked once)
+            force: Recheck even fresh entries (still conditionally)
+
+        Returns:
+            Mapping of URL to its result dict ('status', 'http_status',
+            'final_url', 'detail', 'checked_at', ...)
+        """
+        unique = list(dict.fromkeys(urls))
+        now = time.time()
+        pending = [url for url in unique if force or not self.is_fresh(url, now)]
+
+        if pending:
+            limit = asyncio.Semaphore(self.concurrency)
+            domain_gates: Dict[str, List] = {}
+            session = self._session()
+            executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="link-validator")
+            try:
+                results = await asyncio.gather(*(
+                    self._check(session, executor, url, limit, domain_gates) for url in pending
+                ))
+            finally:
+                executor.shutdown(wait=False)
+                session.close()
+            with self._lock:
+                for result in results:
+                    self._results[result["url"]] = result
+            self._save_cache()
+
+        with self._lock:
+            return {url: self._results[url] for url in unique}
+
+    def validate(self, urls: Iterable[str], force: bool = False) -> Dict[str, Dict]:
+        """Synchronous wrapper around ``validate_async``."""
+        return asyncio.run(self.validate_async(urls, force))
+
+    def validate_references(self, kb_loader: KBLoader, source_slugs: Optional[Iterable[str]] = None,
+                            force: bool = False) -> Dict:
+        """
+        Validate the reference links of some (default: all) sources.
+
+        Returns:
+            Dictionary with 'success', 'links' (link entries extended with
+            their result), 'broken' (count) and 'message' keys
+        """
+        sources = list(source_slugs) if source_slugs is not None else list(kb_loader.get_available_sources())
+        references = {}
+        for source_slug in sources:
+            loaded = kb_loader.get_references(source_slug)
+            if loaded["success"]:
+                references[source_slug] = loaded["data"]
+
+        links = collect_links(references)
+        results = self.validate([link["url"] for link in links], force)
+        for link in links:
+            link.update({key: value for key, value in results[link["url"]].items() if key != "url"})
+        broken = sum(1 for link in links if link["status"] in BROKEN_STATUSES)
+        return {
+            "success": True,
+            "links": links,
+            "broken": broken,
+            "message": f"Checked {len(links)} links, {broken} broken"
+        }
+
+
+def format_checked_at(timestamp: float) -> str:
+    """HTTP-date rendering of a check time, for display."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.link_validator``."""
+    parser = argparse.ArgumentParser(description="Validate the reference links in kb/references.json.")
+    parser.add_argument("sources", nargs="*", help="Source slugs (default: every catalog source)")
+    parser.add_argument("--force", action="store_true", help="Recheck links even if the cached result is fresh")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per request")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE, help="Seconds a cached result stays fresh")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+
+    kb_loader = KBLoader(args.kb)
+    validator = LinkValidator.for_loader(kb_loader, concurrency=args.concurrency,
+                                         timeout=args.timeout, max_age=args.max_age)
+    report = validator.validate_references(kb_loader, args.sources or None, force=args.force)
+    for link in report["links"]:
+        if link["status"] not in OK_STATUSES:
+            code = link["http_status"] or "-"
+            print(f"{link['status']:<8} {code:<4} {link['source']:<16} {link['url']}  {link['detail']}")
+    print(report["message"], file=sys.stderr)
+    return 1 if report["broken"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+Sample Log Analyzer
+Streams raw log samples, detects the catalog source and sourcetype, extracts
+key fields and reports per-format parse rates.
+"""
+
+import argparse
+import json
+import mmap
+import re
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from .kb_loader import KBLoader
+
+CHUNK_SIZE = 4 * 1024 * 1024
+BATCH_LINES = 10000
+MAX_SAMPLES = 5
+MAX_TRACKED_VALUES = 50
+
+_CP_KV_RE = re.compile(r'(\w+):"([^"]*)"')
+_LINUX_SECURE_PROCESSES = {"sshd", "sudo", "su", "login", "passwd", "useradd", "usermod", "groupadd", "polkitd"}
+
+
+class LogFormat:
+    """
+    A recognisable log format belonging to one catalog source.
+
+    ``marker`` is a cheap pattern used to route a line to this format in a
+    single combined regex pass; ``pattern`` is the full regex run only on
+    routed lines to extract named fields. The ratio of the two is the
+    format's parse rate.
+    """
+
+    def __init__(self, name: str, source: str, marker: str, pattern: str,
+                 sourcetype: Union[str, Callable[[Dict], str]], tracked: tuple = (),
+                 postprocess: Optional[Callable[[Dict], Dict]] = None):
+        self.name = name
+        self.source = source
+        self.marker = marker
+        self.marker_re = re.compile(marker) if marker else None
+        self.pattern = re.compile(pattern)
+        # A fixed sourcetype lets callers skip building the field dict
+        self.static_sourcetype = sourcetype if isinstance(sourcetype, str) else None
+        self.sourcetype = (lambda fields: sourcetype) if isinstance(sourcetype, str) else sourcetype
+        self.tracked = tracked
+        self.postprocess = postprocess
+
+
+def _checkpoint_fields(fields: Dict) -> Dict:
+    body = fields.pop("body", "")
+    fields.update({key: value for key, value in _CP_KV_RE.findall(body)
+                   if key in ("action", "origin", "src", "dst", "proto", "service", "product", "ifdir")})
+    return fields
+
+
+def _windows_sourcetype(fields: Dict) -> str:
+    channel = fields.get("Channel")
+    if not channel:
+        provider = fields.get("provider", "")
+        channel = "Security" if "Security-Auditing" in provider else "System"
+    return f"WinEventLog:{channel}"
+
+
+def _linux_sourcetype(fields: Dict) -> str:
+    process = fields.get("process", "").rsplit("/", 1)[-1]
+    return "linux_secure" if process in _LINUX_SECURE_PROCESSES else "syslog"
+
+
+# Ordered: specific vendor formats first; generic syslog is only tried when
+# none of them matched.
+LOG_FORMATS = [
+    LogFormat(
+        "pan_csv", "palo_alto",
+        r",(?:TRAFFIC|THREAT|SYSTEM|CONFIG|URL|AUTH|GLOBALPROTECT|USERID|HIPMATCH|CORRELATION|DECRYPTION|TUNNEL),",
+        r",(?P<receive_time>\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}),(?P<serial>\w+),(?P<log_type>[A-Z]+),"
+        r"(?P<subtype>[^,]*),[^,]*,(?P<generated_time>[\d/: ]*),(?P<src_ip>[^,]*),(?P<dest_ip>[^,]*),",
+        "pan:firewall",
+        tracked=("log_type", "subtype")
+    ),
+    LogFormat(
+        "cisco_asa", "cisco_asa",
+        r"%(?:ASA|FTD|PIX|FWSM)-\d-\d{6}",
+        r"%(?P<product>ASA|FTD|PIX|FWSM)-(?P<severity>\d)-(?P<message_id>\d{6}):?\s*(?P<message>.*)",
+        "cisco:asa",
+        tracked=("message_id", "severity")
+    ),
+    LogFormat(
+        "checkpoint_syslog", "checkpoint",
+        r"CheckPoint \d+ - \[",
+        r"CheckPoint \d+ - \[(?P<body>.*)\]",
+        "cp_log",
+        tracked=("action", "product"),
+        postprocess=_checkpoint_fields
+    ),
+    LogFormat(
+        "checkpoint_cef", "checkpoint",
+        r"CEF:\d+\|Check Point\|",
+        r"CEF:\d+\|Check Point\|(?P<product>[^|]*)\|[^|]*\|(?P<signature>[^|]*)\|(?P<name>[^|]*)\|(?P<severity>[^|]*)\|",
+        "cp_log",
+        tracked=("product", "name")
+    ),
+    LogFormat(
+        "windows_xml", "windows_events",
+        r"<EventID[ >]",
+        r"<EventID[^>]*>(?P<EventID>\d+)</EventID>.*?<Channel>(?P<Channel>[^<]+)</Channel>"
+        r".*?<Computer>(?P<Computer>[^<]+)</Computer>",
+        _windows_sourcetype,
+        tracked=("EventID", "Channel")
+    ),
+    LogFormat(
+        "windows_snare", "windows_events",
+        r"MSWinEventLog\t",
+        r"MSWinEventLog\t(?P<criticality>\d+)\t(?P<Channel>\w+)\t(?P<record>\d+)\t(?P<time>[^\t]+)\t"
+        r"(?P<EventID>\d+)\t(?P<provider>[^\t]+)\t",
+        _windows_sourcetype,
+        tracked=("EventID", "Channel")
+    ),
+    LogFormat(
+        "windows_csv", "windows_events",
+        r"^(?:Information|Warning|Error|Critical|Verbose|Audit Success|Audit Failure),",
+        r"^(?P<Level>[A-Za-z ]+),(?P<time>[^,]+),(?P<provider>[^,]+),(?P<EventID>\d+),(?P<task>[^,]*)",
+        _windows_sourcetype,
+        tracked=("EventID", "Level")
+    ),
+    LogFormat(
+        "linux_audit", "linux",
+        r"^type=\w+ msg=audit\(",
+        r"^type=(?P<audit_type>\w+) msg=audit\((?P<epoch>[\d.]+):(?P<serial>\d+)\):",
+        "linux_audit",
+        tracked=("audit_type",)
+    ),
+]
+
+GENERIC_SYSLOG = LogFormat(
+    "linux_syslog", "linux",
+    r"",
+    r"^(?:<\d+>)?(?P<timestamp>[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}) (?P<host>\S+) "
+    r"(?P<process>[\w\-./()]+)(?:\[(?P<pid>\d+)\])?: (?P<message>.*)",
+    _linux_sourcetype,
+    tracked=("process",)
+)
+
+# One pass over each line picks the candidate format through lastgroup
+_ROUTER = re.compile("|".join(f"(?P<f{i}>{fmt.marker})" for i, fmt in enumerate(LOG_FORMATS)))
+
+
+def route_line(line: str, last: Optional[LogFormat] = None) -> Optional[LogFormat]:
+    """
+    Pick the vendor format a line belongs to.
+
+    Args:
+        line: Decoded log line
+        last: Format of the previous line; it is tried first because samples
+            and live streams are mostly homogeneous
+
+    Returns:
+        The matching ``LogFormat``, or None when only generic syslog applies
+    """
+    if last is not None and last.marker_re.search(line):
+        return last
+    routed = _ROUTER.search(line)
+    return LOG_FORMATS[int(routed.lastgroup[1:])] if routed else None
+
+
+def _iter_line_batches(data, batch_lines: int = BATCH_LINES) -> Iterator[List[bytes]]:
+    """
+    Yield batches of lines from a bytes-like object (typically an mmap).
+
+    Only one chunk plus one partial line is held at a time, so memory use is
+    independent of the input size.
+    """
+    size = len(data)
+    position = 0
+    carry = b""
+    batch: List[bytes] = []
+    while position < size:
+        chunk = carry + data[position:position + CHUNK_SIZE]
+        position += CHUNK_SIZE
+        lines = chunk.split(b"\n")
+        carry = lines.pop() if position < size else b""
+        if position >= size and lines and not lines[-1]:
+            lines.pop()
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= batch_lines:
+                yield batch
+                batch = []
+    if carry:
+        batch.append(carry)
+    if batch:
+        yield batch
+
+
+class LogAnalyzer:
+    """
+    Streams a log sample and reports which catalog source it belongs to.
+
+    Files are memory-mapped and processed in batches of lines. Each line is
+    routed to a candidate format by one combined regex, then parsed by that
+    format's precompiled field regex. Only counters and a handful of samples
+    are retained, so memory stays constant for multi-GB inputs.
+    """
+
+    def __init__(self, kb_loader: Optional[KBLoader] = None):
+        """
+        Initialize the analyzer.
+
+        Args:
+            kb_loader: Loader used to validate detections against the catalog
+        """
+        self.kb_loader = kb_loader
+
+    def _new_stats(self) -> Dict:
+        return {
+            "lines": 0,
+            "bytes": 0,
+            "unmatched": 0,
+            "formats": {},
+            "sourcetypes": Counter(),
+            "sources": Counter(),
+            "unmatched_samples": []
+        }
+
+    def _format_stats(self, stats: Dict, fmt: LogFormat) -> Dict:
+        entry = stats["formats"].get(fmt.name)
+        if entry is None:
+            entry = stats["formats"][fmt.name] = {
+                "source": fmt.source,
+                "routed": 0,
+                "parsed": 0,
+                "field_sets": Counter(),
+                "sourcetypes": Counter(),
+                "values": {field: Counter() for field in fmt.tracked},
+                "samples": []
+            }
+        return entry
+
+    def _process_batch(self, lines: List[bytes], stats: Dict) -> None:
+        last = None
+        for raw in lines:
+            stats["lines"] += 1
+            stats["bytes"] += len(raw) + 1
+            line = raw.decode("utf-8", "replace").rstrip("\r")
+            if not line.strip():
+                continue
+
+            last = route_line(line, last)
+            fmt = last or GENERIC_SYSLOG
+            match = fmt.pattern.search(line)
+
+            if match is None and fmt is GENERIC_SYSLOG:
+                stats["unmatched"] += 1
+                if len(stats["unmatched_samples"]) < MAX_SAMPLES:
+                    stats["unmatched_samples"].append(line[:500])
+                continue
+
+            entry = self._format_stats(stats, fmt)
+            entry["routed"] += 1
+            if match is None:
+                continue
+
+            fields = match.groupdict()
+            if fmt.postprocess:
+                fields = fmt.postprocess(fields)
+            entry["parsed"] += 1
+            # Count whole field sets; they are expanded per field once at the end
+            entry["field_sets"][tuple(key for key, value in fields.items() if value)] += 1
+            for field in fmt.tracked:
+                value = fields.get(field)
+                counter = entry["values"][field]
+                if value and (value in counter or len(counter) < MAX_TRACKED_VALUES):
+                    counter[value] += 1
+            sourcetype = fmt.sourcetype(fields)
+            stats["sourcetypes"][sourcetype] += 1
+            entry["sourcetypes"][sourcetype] += 1
+            if len(entry["samples"]) < MAX_SAMPLES:
+                entry["samples"].append({key: value for key, value in fields.items() if value})
+
+    def _finalize(self, stats: Dict, started: float, expected_source: Optional[str]) -> Dict:
+        formats = {}
+        for name, entry in stats["formats"].items():
+            field_counts = Counter()
+            for field_set, count in entry["field_sets"].items():
+                for field in field_set:
+                    field_counts[field] += count
+            stats["sources"][entry["source"]] += entry["parsed"]
+            formats[name] = {
+                "source": entry["source"],
+                "lines": entry["routed"],
+                "parsed": entry["parsed"],
+                "parse_rate": round(entry["parsed"] / entry["routed"], 4) if entry["routed"] else 0.0,
+                "fields": dict(field_counts),
+                "sourcetypes": dict(entry["sourcetypes"]),
+                "top_values": {field: dict(counter.most_common(10)) for field, counter in entry["values"].items()},
+                "samples": entry["samples"]
+            }
+
+        nonblank = sum(entry["routed"] for entry in stats["formats"].values()) + stats["unmatched"]
+        parsed = sum(entry["parsed"] for entry in stats["formats"].values())
+        detected_source = stats["sources"].most_common(1)[0][0] if stats["sources"] else None
+        # Taken from the detected source's own lines, so a mixed sample never
+        # pairs one source with another source's sourcetype
+        source_sourcetypes = Counter()
+        for entry in stats["formats"].values():
+            if entry["source"] == detected_source:
+                source_sourcetypes.update(entry["sourcetypes"])
+        detected_sourcetype = source_sourcetypes.most_common(1)[0][0] if source_sourcetypes else None
+
+        result = {
+            "success": True,
+            "lines": stats["lines"],
+            "bytes": stats["bytes"],
+            "parsed": parsed,
+            "unmatched": stats["unmatched"],
+            "parse_rate": round(parsed / nonblank, 4) if nonblank else 0.0,
+            "detected_source": detected_source,
+            "detected_sourcetype": detected_sourcetype,
+            "sources": dict(stats["sources"]),
+            "sourcetypes": dict(stats["sourcetypes"]),
+            "formats": formats,
+            "unmatched_samples": stats["unmatched_samples"],
+            "elapsed_seconds": round(time.perf_counter() - started, 4),
+            "message": "Sample analyzed" if parsed else "No known log format detected"
+        }
+
+        if expected_source and self.kb_loader is not None:
+            metadata = self.kb_loader.get_source_metadata(expected_source) or {}
+            expected_sourcetypes = metadata.get("sourcetypes", [])
+            result["expected_source"] = expected_source
+            result["matches_kb"] = (
+                detected_source == expected_source
+                and (not expected_sourcetypes or detected_sourcetype in expected_sourcetypes)
+            )
+            result["unexpected_sourcetypes"] = sorted(
+                sourcetype for sourcetype in stats["sourcetypes"]
+                if expected_sourcetypes and sourcetype not in expected_sourcetypes
+            )
+        return result
+
+    def analyze_bytes(self, data, expected_source: Optional[str] = None) -> Dict:
+        """
+        Analyze an in-memory sample (bytes, bytearray or mmap).
+
+        Args:
+            data: Raw log bytes
+            expected_source: Catalog slug the sample is supposed to come from
+
+        Returns:
+            Dictionary with detection results, parse rates and per-format details
+        """
+        started = time.perf_counter()
+        stats = self._new_stats()
+        for batch in _iter_line_batches(data):
+            self._process_batch(batch, stats)
+        return self._finalize(stats, started, expected_source)
+
+    def analyze_file(self, path: str, expected_source: Optional[str] = None) -> Dict:
+        """
+        Analyze a log file of any size through a read-only memory map.
+
+        Args:
+            path: Path to the log file
+            expected_source: Catalog slug the sample is supposed to come from
+
+        Returns:
+            Same dictionary as ``analyze_bytes`` ('success' False on I/O errors)
+        """
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, 2)
+                if f.tell() == 0:
+                    return self.analyze_bytes(b"", expected_source)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self.analyze_bytes(mapped, expected_source)
+        except OSError as e:
+            return {"success": False, "message": f"Error reading log sample: {str(e)}"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.log_analyzer``."""
+    parser = argparse.ArgumentParser(description="Detect the source and sourcetype of a raw log sample.")
+    parser.add_argument("path", help="Log file to analyze")
+    parser.add_argument("--expect", help="Catalog slug the sample should match")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+
+    result = LogAnalyzer(KBLoader(args.kb)).analyze_file(args.path, args.expect)
+    print(json.dumps(result, indent=2, default=str))
+    if not result["success"]:
+        return 1
+    return 0 if result.get("matches_kb", True) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
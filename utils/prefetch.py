@@ -0,0 +1,195 @@
+"""
+Source Prefetcher
+Speculatively prepares everything the first question about a source needs
+as soon as the source is selected: KB content, search and citation indices,
+the system prompt and, where the provider supports it, a warm provider
+(prompt cache, loaded model).
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .ai_client import BaseAIClient
+from .kb_loader import KBLoader
+from .telemetry import span
+
+DEFAULT_WORKERS = 2
+# Warm-ups are repeated once this share of the provider's TTL has passed, so
+# the cache is still warm when the question arrives
+REFRESH_FRACTION = 0.8
+
+
+class PrefetchTask:
+    """
+    Handle on one source's prefetch. ``cancel`` stops it before its next
+    stage; a stage already running (e.g. a warm-up request) finishes, but
+    nothing after it starts.
+    """
+
+    def __init__(self, source_slug: str):
+        self.source_slug = source_slug
+        self.stages: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self._cancelled = threading.Event()
+        self._future: Optional[Future] = None
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the task to finish; returns False on timeout."""
+        if self._future is None:
+            return True
+        try:
+            self._future.result(timeout)
+        except Exception:
+            pass
+        return self._future.done()
+
+    def describe(self) -> str:
+        """One-line summary of the stages run, e.g. ``kb 1ms · prompt 2ms · warm_up 640ms``."""
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.stages.items()]
+        if self.cancelled:
+            parts.append("cancelled")
+        if self.error:
+            parts.append(f"error: {self.error}")
+        return " · ".join(parts)
+
+
+class Prefetcher:
+    """
+    Runs prefetch tasks on a small thread pool shared by every session.
+
+    Each stage is cheap to repeat: the KB loader, indices and prompt cache
+    return immediately when warm, and provider warm-ups are skipped while an
+    earlier one for the same provider, model and prompt is still within the
+    provider's ``WARM_UP_TTL``.
+    """
+
+    def __init__(self, kb_loader: KBLoader, preparers: Iterable[Callable[[str], object]] = (),
+                 max_workers: int = DEFAULT_WORKERS):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            kb_loader: Loader for the catalog and KB content
+            preparers: Per-source index builders, called in order with the
+                source slug (e.g. ``KBSearchIndex.index_source``,
+                ``CitationIndex.prepare``)
+            max_workers: Concurrent prefetch tasks
+        """
+        self.kb_loader = kb_loader
+        self.preparers = list(preparers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._warmed: Dict[Tuple, float] = {}
+        self._warming: Dict[Tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, source_slug: str, ai_client: Optional[BaseAIClient] = None,
+                 previous: Optional[PrefetchTask] = None) -> PrefetchTask:
+        """
+        Start preparing a source in the background.
+
+        Args:
+            source_slug: Source that was just selected
+            ai_client: Client whose prompt and provider to warm up
+            previous: The caller's earlier task, cancelled first
+
+        Returns:
+            Handle to cancel or wait for the prefetch
+        """
+        if previous is not None:
+            previous.cancel()
+        task = PrefetchTask(source_slug)
+        task._future = self._executor.submit(self._run, task, ai_client)
+        return task
+
+    def _stage(self, task: PrefetchTask, name: str, work: Callable[[], object]) -> bool:
+        if task.cancelled:
+            return False
+        started = time.perf_counter()
+        with span(f"prefetch.{name}", source=task.source_slug):
+            work()
+        task.stages[name] = time.perf_counter() - started
+        return True
+
+    def _run(self, task: PrefetchTask, ai_client: Optional[BaseAIClient]) -> PrefetchTask:
+        try:
+            metadata = self.kb_loader.get_source_metadata(task.source_slug)
+            kb_data: Dict = {}
+            if metadata is None or not self._stage(
+                    task, "kb", lambda: kb_data.update(self.kb_loader.load_kb_content(task.source_slug))):
+                return task
+            if not kb_data.get("success"):
+                task.error = kb_data.get("message")
+                return task
+
+            for prepare in self.preparers:
+                name = getattr(prepare, "__qualname__", "index")
+                if not self._stage(task, name, lambda: prepare(task.source_slug)):
+                    return task
+
+            if ai_client is None:
+                return task
+            source_name, content = metadata["display_name"], kb_data["content"]
+            if not self._stage(task, "prompt", lambda: ai_client._build_system_prompt(source_name, content)):
+                return task
+            if ai_client.WARM_UP_TTL:
+                self._stage(task, "warm_up", lambda: self._warm_up(task, ai_client, source_name, content))
+        except Exception as e:
+            task.error = str(e)
+        return task
+
+    @staticmethod
+    def _warm_key(ai_client: BaseAIClient, source_name: str, kb_content: str) -> Tuple:
+        return (getattr(ai_client, "PROVIDER", ""), getattr(ai_client, "model", ""), source_name, hash(kb_content))
+
+    def _warm_up(self, task: PrefetchTask, ai_client: BaseAIClient, source_name: str, kb_content: str) -> None:
+        # One warm-up per provider, model and prompt at a time, across sessions
+        key = self._warm_key(ai_client, source_name, kb_content)
+        while True:
+            with self._lock:
+                warmed_at = self._warmed.get(key)
+                if warmed_at is not None and time.time() - warmed_at < ai_client.WARM_UP_TTL * REFRESH_FRACTION:
+                    return
+                in_flight = self._warming.get(key)
+                if in_flight is None:
+                    self._warming[key] = threading.Event()
+                    break
+            in_flight.wait()
+            if task.cancelled:
+                return
+
+        try:
+            result = ai_client.warm_up(source_name, kb_content)
+            if result["success"]:
+                with self._lock:
+                    self._warmed[key] = time.time()
+            else:
+                task.error = result["message"]
+        finally:
+            with self._lock:
+                self._warming.pop(key).set()
+
+    def mark_used(self, ai_client: BaseAIClient, source_name: str, kb_content: str) -> None:
+        """
+        Record that a real request just used the provider's cache for a
+        source (which refreshes it), so the next prefetch can skip its warm-up.
+        """
+        if ai_client.WARM_UP_TTL:
+            with self._lock:
+                self._warmed[self._warm_key(ai_client, source_name, kb_content)] = time.time()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
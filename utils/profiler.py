@@ -0,0 +1,209 @@
+"""
+Rerun Profiler
+Opt-in timing of Streamlit reruns, broken down by sidebar, tab bodies and
+the telemetry spans inside them (KB loads, provider probes, markdown).
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+
+from . import telemetry
+
+DEFAULT_HISTORY = 50
+PSTATS_TOP = 30
+
+# Enable for every session with SIEM_PROFILE=1
+PROFILE_ENV = "SIEM_PROFILE"
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "0") == "1"
+
+
+_patch_lock = threading.Lock()
+_patched: Dict[str, Callable] = {}
+
+
+def instrument_module_functions(module, names: List[str], prefix: str = "st.") -> None:
+    """
+    Wrap module-level functions (e.g. ``st.markdown``) in telemetry spans.
+
+    Idempotent and process-wide. Outside a profiled rerun the wrappers only
+    feed the span histogram, so the cost stays at a few microseconds per call.
+    """
+    with _patch_lock:
+        for name in names:
+            key = f"{module.__name__}.{name}"
+            if key in _patched:
+                continue
+            original = getattr(module, name)
+            span_name = prefix + name
+
+            def wrapper(*args, __original=original, __span_name=span_name, **kwargs):
+                with telemetry.span(__span_name):
+                    return __original(*args, **kwargs)
+
+            wrapper.__wrapped__ = original
+            wrapper.__doc__ = original.__doc__
+            _patched[key] = original
+            setattr(module, name, wrapper)
+
+
+class RerunProfiler:
+    """
+    Keeps a rolling window of rerun breakdowns for one session.
+
+    Call ``start()`` at the top of the script and ``finish()`` before the
+    admin panel renders. Sections are ordinary telemetry spans, so anything
+    already instrumented (KB loads, prompt builds, provider calls) nests
+    under the tab that triggered it. A rerun that never reaches ``finish()``
+    (``st.rerun()``, ``st.stop()``) is closed by the next ``start()`` and
+    counted as interrupted.
+    """
+
+    def __init__(self, history: int = DEFAULT_HISTORY, dump_dir: str = ".cache/profiles"):
+        """
+        Initialize the profiler.
+
+        Args:
+            history: Number of reruns kept for the rolling summary
+            dump_dir: Directory for cProfile/pstats dumps
+        """
+        self.records: Deque[Dict] = deque(maxlen=history)
+        self.dump_dir = Path(dump_dir)
+        self.interrupted = 0
+        self.last_dump: Optional[Dict] = None
+        self._capture_next = False
+        self._context = None
+        self._trace = None
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def capture_next_rerun(self) -> None:
+        """Run the next rerun under cProfile and dump its stats."""
+        self._capture_next = True
+
+    def start(self) -> None:
+        """Begin timing a rerun."""
+        if self._context is not None:
+            self._close(interrupted=True)
+        self._context = telemetry.trace("rerun")
+        self._trace = self._context.__enter__()
+        if self._capture_next:
+            self._capture_next = False
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                # Another profiler is active on this thread
+                self._cprofile = None
+
+    def section(self, name: str):
+        """Time a block of the script (e.g. a tab body)."""
+        return telemetry.span(name)
+
+    def finish(self) -> Optional[Dict]:
+        """
+        Stop timing the current rerun and store its breakdown.
+
+        Returns:
+            The rerun record, or None when no rerun was started
+        """
+        if self._context is None:
+            return None
+        return self._close(interrupted=False)
+
+    def _close(self, interrupted: bool) -> Optional[Dict]:
+        profile, self._cprofile = self._cprofile, None
+        if profile is not None:
+            profile.disable()
+        context, trace = self._context, self._trace
+        self._context = self._trace = None
+        try:
+            context.__exit__(None, None, None)
+        except ValueError:
+            # The context variable was set in another thread's context (rerun on a new thread)
+            trace.duration = time.perf_counter() - trace.started
+
+        if interrupted:
+            self.interrupted += 1
+            return None
+        record = {"finished": time.time(), "duration": trace.duration, "tree": trace.tree()}
+        self.records.append(record)
+        if profile is not None:
+            self.last_dump = self._dump(profile)
+        return record
+
+    def _dump(self, profile: cProfile.Profile) -> Dict:
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        path = self.dump_dir / time.strftime("rerun-%Y%m%d-%H%M%S.pstats")
+        profile.dump_stats(str(path))
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).strip_dirs().sort_stats("cumulative").print_stats(PSTATS_TOP)
+        return {"path": str(path), "text": text.getvalue()}
+
+    def summary(self) -> List[Dict]:
+        """
+        Rolling per-section summary over the stored reruns.
+
+        Returns:
+            Rows with 'path', 'section', 'depth', 'mean_ms', 'max_ms',
+            'calls_per_rerun' and 'share' (percent of rerun time), in tree
+            order with the most expensive siblings first
+        """
+        if not self.records:
+            return []
+        reruns = len(self.records)
+        mean_rerun = sum(record["duration"] for record in self.records) / reruns
+        totals: Dict[str, List[float]] = {}
+        for record in self.records:
+            for path, (seconds, calls) in record["tree"].items():
+                entry = totals.setdefault(path, [0.0, 0.0, 0])
+                entry[0] += seconds
+                entry[1] = max(entry[1], seconds)
+                entry[2] += calls
+
+        # Depth-first order: each path sorts under its parent by mean time
+        def sort_key(path: str):
+            parts = path.split("/")
+            return [(-totals.get("/".join(parts[:i + 1]), [0.0])[0], parts[i]) for i in range(len(parts))]
+
+        rows = []
+        attributed = sum(seconds for path, (seconds, _, _) in totals.items() if "/" not in path) / reruns
+        if mean_rerun > attributed:
+            # Script code outside any section (page setup, cached resource lookups, headers)
+            unattributed = mean_rerun - attributed
+            totals["(unattributed)"] = [unattributed * reruns, unattributed, reruns]
+        for path in sorted(totals, key=sort_key):
+            seconds, worst, calls = totals[path]
+            mean = seconds / reruns
+            rows.append({
+                "path": path,
+                "section": path.rsplit("/", 1)[-1],
+                "depth": path.count("/"),
+                "mean_ms": round(mean * 1000, 2),
+                "max_ms": round(worst * 1000, 2),
+                "calls_per_rerun": round(calls / reruns, 1),
+                "share": round(100 * mean / mean_rerun, 1) if mean_rerun else 0.0
+            })
+        return rows
+
+    def rerun_stats(self) -> Dict:
+        """Mean, p95 and last rerun duration in milliseconds."""
+        durations = sorted(record["duration"] for record in self.records)
+        if not durations:
+            return {"reruns": 0, "mean_ms": None, "p95_ms": None, "last_ms": None,
+                    "interrupted": self.interrupted}
+        return {
+            "reruns": len(durations),
+            "mean_ms": round(1000 * sum(durations) / len(durations), 1),
+            "p95_ms": round(1000 * durations[min(len(durations) - 1, int(0.95 * len(durations)))], 1),
+            "last_ms": round(1000 * self.records[-1]["duration"], 1),
+            "interrupted": self.interrupted
+        }
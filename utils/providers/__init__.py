@@ -0,0 +1,59 @@
+"""
+Provider Registry
+Maps provider keys to the modules implementing their clients. A backend's
+module, and the SDK it imports (``anthropic``, ``requests``), load on first
+use only, so importing ``utils.ai_client`` stays cheap.
+"""
+
+import importlib
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple, Type
+
+# Provider key -> (module in this package, client class)
+CLIENT_CLASSES: Dict[str, Tuple[str, str]] = {
+    "claude": ("claude", "ClaudeClient"),
+    "groq": ("groq", "GroqClient"),
+    "huggingface": ("huggingface", "HuggingFaceClient"),
+    "ollama": ("ollama", "OllamaClient")
+}
+
+_lock = threading.Lock()
+_loaded: Dict[str, Type] = {}
+
+
+def get_client_class(provider: str) -> Optional[Type]:
+    """
+    Client class for a provider, importing its module on first use.
+
+    Args:
+        provider: Provider key (e.g. 'groq')
+
+    Returns:
+        The client class, or None for an unknown provider
+    """
+    cls = _loaded.get(provider)
+    if cls is not None:
+        return cls
+    if provider not in CLIENT_CLASSES:
+        return None
+    module_name, class_name = CLIENT_CLASSES[provider]
+    with _lock:
+        if provider not in _loaded:
+            module = importlib.import_module(f".{module_name}", __name__)
+            _loaded[provider] = getattr(module, class_name)
+    return _loaded[provider]
+
+
+def find_provider(class_name: str) -> Optional[str]:
+    """Provider key for a client class name (e.g. 'OllamaClient')."""
+    for provider, (_, name) in CLIENT_CLASSES.items():
+        if name == class_name:
+            return provider
+    return None
+
+
+def loaded_providers() -> List[str]:
+    """Providers whose modules have been imported in this process."""
+    return [provider for provider, (module_name, _) in CLIENT_CLASSES.items()
+            if f"{__name__}.{module_name}" in sys.modules]
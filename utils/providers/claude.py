@@ -0,0 +1,141 @@
+"""
+Claude Client
+Anthropic's Claude API (paid). Loaded by the provider registry on first use.
+"""
+
+import time
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+from ..ai_client import BaseAIClient
+from ..telemetry import record_retries, span, traced_response, traced_stream
+
+
+class ClaudeClient(BaseAIClient):
+    """Client for Anthropic's Claude API."""
+    
+    PROVIDER = "claude"
+    # Anthropic keeps an ephemeral prompt cache entry for five minutes,
+    # refreshed every time it is read
+    WARM_UP_TTL = 300
+    
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: Optional[str] = None):
+        self.model = model or "claude-sonnet-4-20250514"
+        # The anthropic SDK is optional; without it the client reports itself unavailable
+        self.available = anthropic is not None
+        if self.available:
+            self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
+    
+    def get_provider_name(self) -> str:
+        return "Claude (Anthropic)"
+    
+    def _format_chat_history(self, history: List[Dict]) -> List[Dict]:
+        return [{"role": msg["role"], "content": msg["content"]} for msg in history]
+    
+    def _system_blocks(self, source_name: str, kb_content: str) -> List[Dict]:
+        """System prompt marked as a prompt cache breakpoint, so the KB is
+        only processed in full once per source every few minutes."""
+        block = {"type": "text", "text": self._build_system_prompt(source_name, kb_content)}
+        if self.cache_prompts:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+    
+    def warm_up(self, source_name: str, kb_content: str) -> Dict:
+        """Write the source's system prompt to Anthropic's prompt cache with a one-token request."""
+        started = time.perf_counter()
+        try:
+            with span("llm.warm_up", self.PROVIDER):
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=1,
+                    system=self._system_blocks(source_name, kb_content),
+                    messages=[{"role": "user", "content": "Ready?"}]
+                )
+            usage = {"input_tokens": response.usage.input_tokens, "output_tokens": response.usage.output_tokens,
+                     "cached_tokens": getattr(response.usage, "cache_read_input_tokens", None)}
+            result = {"success": True, "message": "Prompt cache primed"}
+        except Exception as e:
+            usage, result = None, {"success": False, "message": f"Warm-up failed: {str(e)}"}
+        # Priming costs tokens like any other call
+        self._log_usage(source_name, result["success"], result["message"], usage, time.perf_counter() - started)
+        return result
+    
+    @traced_response
+    def get_response(self, question: str, kb_content: str, source_name: str,
+                     chat_history: Optional[List[Dict]] = None) -> Dict:
+        try:
+            system_prompt = self._system_blocks(source_name, kb_content)
+            messages = []
+            
+            if chat_history:
+                messages.extend(self._format_chat_history(chat_history))
+            
+            messages.append({"role": "user", "content": question})
+            
+            with span("llm.network", self.PROVIDER):
+                raw = self.client.messages.with_raw_response.create(
+                    model=self.model,
+                    max_tokens=2048,
+                    system=system_prompt,
+                    messages=messages
+                )
+            # The SDK retries 429/5xx on its own; surface how often it did
+            record_retries(self.PROVIDER, getattr(raw, "retries_taken", 0))
+            with span("llm.parse", self.PROVIDER):
+                response = raw.parse()
+            
+            return {
+                "success": True,
+                "response": response.content[0].text,
+                "message": "Response generated successfully",
+                "usage": {
+                    "input_tokens": response.usage.input_tokens,
+                    "output_tokens": response.usage.output_tokens,
+                    "cached_tokens": getattr(response.usage, "cache_read_input_tokens", None)
+                }
+            }
+            
+        except anthropic.AuthenticationError:
+            return {"success": False, "response": "", "message": "Authentication failed. Please check your API key."}
+        except anthropic.RateLimitError:
+            return {"success": False, "response": "", "message": "Rate limit exceeded. Please wait and try again."}
+        except anthropic.APIConnectionError:
+            return {"success": False, "response": "", "message": "Failed to connect to Claude API."}
+        except Exception as e:
+            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
+    
+    @traced_stream
+    def stream_response(self, question: str, kb_content: str, source_name: str,
+                        chat_history: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        message = "Response generated successfully"
+        usage = None
+        try:
+            messages = self._format_chat_history(chat_history) if chat_history else []
+            messages.append({"role": "user", "content": question})
+            
+            with self.client.messages.stream(
+                model=self.model,
+                max_tokens=2048,
+                system=self._system_blocks(source_name, kb_content),
+                messages=messages
+            ) as stream:
+                for text in stream.text_stream:
+                    yield {"type": "delta", "text": text}
+                final = stream.get_final_message()
+            usage = {"input_tokens": final.usage.input_tokens, "output_tokens": final.usage.output_tokens,
+                     "cached_tokens": getattr(final.usage, "cache_read_input_tokens", None)}
+            success = True
+            
+        except anthropic.AuthenticationError:
+            success, message = False, "Authentication failed. Please check your API key."
+        except anthropic.RateLimitError:
+            success, message = False, "Rate limit exceeded. Please wait and try again."
+        except anthropic.APIConnectionError:
+            success, message = False, "Failed to connect to Claude API."
+        except Exception as e:
+            success, message = False, f"Error: {str(e)}"
+        yield {"type": "done", "success": success, "message": message, "usage": usage}
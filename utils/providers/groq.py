@@ -0,0 +1,140 @@
+"""
+Groq Client
+Groq's free inference API with open-source models. Loaded by the provider
+registry on first use.
+"""
+
+import json
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from ..ai_client import BaseAIClient
+from ..telemetry import span, traced_response, traced_stream
+
+
+class GroqClient(BaseAIClient):
+    """Client for Groq's free inference API with open-source models."""
+    
+    PROVIDER = "groq"
+    
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: Optional[str] = None):
+        self.api_key = api_key
+        # Groq offers these models for free (with rate limits)
+        # llama-3.3-70b-versatile is the most capable free option
+        self.model = model or "llama-3.3-70b-versatile"
+        self.base_url = base_url or "https://api.groq.com/openai/v1/chat/completions"
+        self.available = True
+    
+    def get_provider_name(self) -> str:
+        return "Llama 3.3 70B (Groq - Free)"
+    
+    def _build_request(self, question: str, kb_content: str, source_name: str,
+                       chat_history: Optional[List[Dict]]) -> Dict:
+        system_prompt = self._build_system_prompt(source_name, kb_content)
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        if chat_history:
+            for msg in chat_history:
+                messages.append({"role": msg["role"], "content": msg["content"]})
+        
+        messages.append({"role": "user", "content": question})
+        
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": 2048,
+            "temperature": 0.7
+        }
+    
+    @staticmethod
+    def _error_message(status_code: int) -> str:
+        if status_code == 401:
+            return "Invalid Groq API key."
+        if status_code == 429:
+            return "Rate limit exceeded. Groq free tier has limits."
+        return f"Groq API error: {status_code}"
+    
+    @traced_response
+    def get_response(self, question: str, kb_content: str, source_name: str,
+                     chat_history: Optional[List[Dict]] = None) -> Dict:
+        try:
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            payload = self._build_request(question, kb_content, source_name, chat_history)
+            with span("llm.network", self.PROVIDER):
+                response = requests.post(
+                    self.base_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=60
+                )
+            
+            if response.status_code == 200:
+                with span("llm.parse", self.PROVIDER):
+                    data = response.json()
+                usage = data.get("usage", {})
+                return {
+                    "success": True,
+                    "response": data["choices"][0]["message"]["content"],
+                    "message": "Response generated successfully",
+                    "usage": {
+                        "input_tokens": usage.get("prompt_tokens"),
+                        "output_tokens": usage.get("completion_tokens"),
+                        "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+                    }
+                }
+            else:
+                return {"success": False, "response": "", "message": self._error_message(response.status_code)}
+                
+        except requests.exceptions.Timeout:
+            return {"success": False, "response": "", "message": "Request timed out. Please try again."}
+        except Exception as e:
+            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
+    
+    @traced_stream
+    def stream_response(self, question: str, kb_content: str, source_name: str,
+                        chat_history: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        success, message, usage = True, "Response generated successfully", None
+        try:
+            payload = self._build_request(question, kb_content, source_name, chat_history)
+            payload.update(stream=True, stream_options={"include_usage": True})
+            
+            with requests.post(
+                self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                json=payload,
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    success, message = False, self._error_message(response.status_code)
+                else:
+                    # OpenAI-style server-sent events, terminated by "data: [DONE]"
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        chunk_usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+                        if chunk_usage:
+                            usage = {"input_tokens": chunk_usage.get("prompt_tokens"),
+                                     "output_tokens": chunk_usage.get("completion_tokens"),
+                                     "cached_tokens": (chunk_usage.get("prompt_tokens_details") or {})
+                                     .get("cached_tokens")}
+                        for choice in chunk.get("choices") or []:
+                            text = choice.get("delta", {}).get("content")
+                            if text:
+                                yield {"type": "delta", "text": text}
+                
+        except requests.exceptions.Timeout:
+            success, message = False, "Request timed out. Please try again."
+        except Exception as e:
+            success, message = False, f"Error: {str(e)}"
+        yield {"type": "done", "success": success, "message": message, "usage": usage}
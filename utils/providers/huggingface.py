@@ -0,0 +1,101 @@
+"""
+HuggingFace Client
+HuggingFace's free Inference API. Loaded by the provider registry on first use.
+"""
+
+from typing import Dict, List, Optional
+
+import requests
+
+from ..ai_client import BaseAIClient
+from ..telemetry import span, traced_response
+
+
+class HuggingFaceClient(BaseAIClient):
+    """Client for HuggingFace's free Inference API."""
+    
+    PROVIDER = "huggingface"
+    
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: Optional[str] = None):
+        self.api_key = api_key
+        # Using Mistral or other capable free models
+        self.model = model or "mistralai/Mixtral-8x7B-Instruct-v0.1"
+        self.base_url = base_url or f"https://api-inference.huggingface.co/models/{self.model}"
+        self.available = True
+    
+    def get_provider_name(self) -> str:
+        return "Mixtral 8x7B (HuggingFace - Free)"
+    
+    @traced_response
+    def get_response(self, question: str, kb_content: str, source_name: str,
+                     chat_history: Optional[List[Dict]] = None) -> Dict:
+        try:
+            system_prompt = self._build_system_prompt(source_name, kb_content)
+            
+            # Build conversation for instruct model
+            prompt = f"<s>[INST] {system_prompt}\n\n"
+            
+            if chat_history:
+                for msg in chat_history:
+                    if msg["role"] == "user":
+                        prompt += f"User: {msg['content']}\n"
+                    else:
+                        prompt += f"Assistant: {msg['content']}\n"
+            
+            prompt += f"User question: {question} [/INST]"
+            
+            # Truncate prompt if too long (HF has input limits)
+            if len(prompt) > 24000:
+                # Keep system prompt and question, truncate KB
+                truncated_kb = self._truncate_kb_content(kb_content, 12000)
+                system_prompt = self._build_system_prompt(source_name, truncated_kb)
+                prompt = f"<s>[INST] {system_prompt}\n\nUser question: {question} [/INST]"
+            
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            payload = {
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": 1500,
+                    "temperature": 0.7,
+                    "return_full_text": False
+                }
+            }
+            
+            with span("llm.network", self.PROVIDER):
+                response = requests.post(
+                    self.base_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=120  # HF can be slower
+                )
+            
+            if response.status_code == 200:
+                with span("llm.parse", self.PROVIDER):
+                    data = response.json()
+                if isinstance(data, list) and len(data) > 0:
+                    generated_text = data[0].get("generated_text", "")
+                    # The Inference API does not report token counts
+                    return {
+                        "success": True,
+                        "response": generated_text.strip(),
+                        "message": "Response generated successfully",
+                        "usage": {"input_tokens": None, "output_tokens": None}
+                    }
+                return {"success": False, "response": "", "message": "Unexpected response format"}
+            elif response.status_code == 401:
+                return {"success": False, "response": "", "message": "Invalid HuggingFace API key."}
+            elif response.status_code == 503:
+                return {"success": False, "response": "", "message": "Model is loading. Please wait 20-30 seconds and try again."}
+            elif response.status_code == 429:
+                return {"success": False, "response": "", "message": "Rate limit exceeded. Please try again later."}
+            else:
+                return {"success": False, "response": "", "message": f"HuggingFace API error: {response.status_code}"}
+                
+        except requests.exceptions.Timeout:
+            return {"success": False, "response": "", "message": "Request timed out. HuggingFace free tier can be slow."}
+        except Exception as e:
+            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
@@ -0,0 +1,147 @@
+"""
+Ollama Client
+Local models served by Ollama (completely free). Loaded by the provider
+registry on first use.
+"""
+
+import json
+import time
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from ..ai_client import BaseAIClient
+from ..telemetry import span, traced_response, traced_stream
+
+
+class OllamaClient(BaseAIClient):
+    """Client for local Ollama instance (completely free, runs locally)."""
+    
+    PROVIDER = "ollama"
+    # How long Ollama keeps the model (and the last prompt's KV cache) loaded
+    # after a request; sent with every request
+    KEEP_ALIVE = "30m"
+    WARM_UP_TTL = 1800
+    
+    def __init__(self, base_url: str = "http://localhost:11434", model: Optional[str] = None):
+        self.base_url = base_url
+        self.model = model or "llama3.2"  # or mistral, codellama, etc.
+        self.available = self._check_availability()
+    
+    def _check_availability(self) -> bool:
+        try:
+            with span("provider.probe", self.PROVIDER):
+                response = requests.get(f"{self.base_url}/api/tags", timeout=2)
+            return response.status_code == 200
+        except:
+            return False
+    
+    def get_provider_name(self) -> str:
+        return f"Ollama Local ({self.model})"
+    
+    def _build_request(self, question: str, kb_content: str, source_name: str,
+                       chat_history: Optional[List[Dict]], stream: bool) -> Dict:
+        system_prompt = self._build_system_prompt(source_name, kb_content)
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        if chat_history:
+            for msg in chat_history:
+                messages.append({"role": msg["role"], "content": msg["content"]})
+        
+        messages.append({"role": "user", "content": question})
+        
+        return {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": self.KEEP_ALIVE
+        }
+    
+    def warm_up(self, source_name: str, kb_content: str) -> Dict:
+        """
+        Load the model and evaluate the source's system prompt with a
+        one-token request; Ollama reuses the evaluated prefix for the next
+        request that starts with the same system prompt.
+        """
+        started = time.perf_counter()
+        payload = self._build_request("Ready?", kb_content, source_name, None, stream=False)
+        payload["options"] = {"num_predict": 1}
+        try:
+            with span("llm.warm_up", self.PROVIDER):
+                response = requests.post(f"{self.base_url}/api/chat", json=payload, timeout=120)
+            if response.status_code == 200:
+                data = response.json()
+                usage = {"input_tokens": data.get("prompt_eval_count"), "output_tokens": data.get("eval_count")}
+                result = {"success": True, "message": "Model loaded and prompt evaluated"}
+            else:
+                usage, result = None, {"success": False, "message": f"Ollama error: {response.status_code}"}
+        except requests.exceptions.RequestException as e:
+            usage, result = None, {"success": False, "message": f"Warm-up failed: {str(e)}"}
+        self._log_usage(source_name, result["success"], result["message"], usage, time.perf_counter() - started)
+        return result
+    
+    @traced_response
+    def get_response(self, question: str, kb_content: str, source_name: str,
+                     chat_history: Optional[List[Dict]] = None) -> Dict:
+        try:
+            payload = self._build_request(question, kb_content, source_name, chat_history, stream=False)
+            with span("llm.network", self.PROVIDER):
+                response = requests.post(
+                    f"{self.base_url}/api/chat",
+                    json=payload,
+                    timeout=120
+                )
+            
+            if response.status_code == 200:
+                with span("llm.parse", self.PROVIDER):
+                    data = response.json()
+                return {
+                    "success": True,
+                    "response": data["message"]["content"],
+                    "message": "Response generated successfully",
+                    "usage": {
+                        "input_tokens": data.get("prompt_eval_count"),
+                        "output_tokens": data.get("eval_count")
+                    }
+                }
+            else:
+                return {"success": False, "response": "", "message": f"Ollama error: {response.status_code}"}
+                
+        except requests.exceptions.ConnectionError:
+            return {"success": False, "response": "", "message": "Cannot connect to Ollama. Is it running locally?"}
+        except Exception as e:
+            return {"success": False, "response": "", "message": f"Error: {str(e)}"}
+    
+    @traced_stream
+    def stream_response(self, question: str, kb_content: str, source_name: str,
+                        chat_history: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        success, message, usage = True, "Response generated successfully", None
+        try:
+            with requests.post(
+                f"{self.base_url}/api/chat",
+                json=self._build_request(question, kb_content, source_name, chat_history, stream=True),
+                timeout=120,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    success, message = False, f"Ollama error: {response.status_code}"
+                else:
+                    # One JSON object per line; the last one has "done": true and the counters
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        text = chunk.get("message", {}).get("content")
+                        if text:
+                            yield {"type": "delta", "text": text}
+                        if chunk.get("done"):
+                            usage = {"input_tokens": chunk.get("prompt_eval_count"),
+                                     "output_tokens": chunk.get("eval_count")}
+                            break
+                
+        except requests.exceptions.ConnectionError:
+            success, message = False, "Cannot connect to Ollama. Is it running locally?"
+        except Exception as e:
+            success, message = False, f"Error: {str(e)}"
+        yield {"type": "done", "success": success, "message": message, "usage": usage}
@@ -0,0 +1,105 @@
+"""
+Response Cache
+Cache of AI answers shared by the app, the API, the batch runner and every
+replica of them (see utils.cache_backend).
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .cache_backend import CacheBackend, SQLiteBackend, TieredCache, shared_backend
+from .kb_loader import KBLoader
+
+DEFAULT_TTL = 7 * 24 * 3600
+# Bump when the stored response format changes
+RESPONSE_FORMAT_VERSION = 1
+
+
+def normalize_question(question: str) -> str:
+    """Case- and whitespace-insensitive form of a question, used in cache keys."""
+    return " ".join(question.casefold().split())
+
+
+class ResponseCache:
+    """
+    Store of successful AI responses.
+
+    Keys combine provider, model, source, a hash of the KB content and the
+    normalized question, so any KB edit or model change misses naturally.
+    Entries sit in a ``TieredCache``: an in-process LRU in front of a shared
+    backend, which is a SQLite file by default and whatever
+    ``SIEM_CACHE_URL`` names otherwise, so an answer computed by one replica
+    (or the nightly batch runner) is a hit for all of them.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL,
+                 backend: Optional[CacheBackend] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file (ignored when ``backend`` is given)
+            ttl: Seconds an entry stays valid
+            backend: Shared cache backend
+        """
+        if backend is None:
+            if path is None:
+                raise ValueError("ResponseCache needs a path or a backend")
+            backend = SQLiteBackend(path)
+        self.ttl = ttl
+        self.cache = TieredCache(backend, "responses", RESPONSE_FORMAT_VERSION)
+
+    @classmethod
+    def for_loader(cls, kb_loader: KBLoader, **kwargs) -> "ResponseCache":
+        """Cache on ``SIEM_CACHE_URL``, or in the loader's cache directory."""
+        return cls(backend=shared_backend(str(kb_loader.cache_path / "shared_cache.sqlite")), **kwargs)
+
+    @staticmethod
+    def make_key(provider: str, model: str, source_name: str, kb_content: str, question: str) -> str:
+        """Cache key for one first-turn question."""
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (provider, model, source_name, hashlib.blake2b(kb_content.encode("utf-8")).hexdigest(),
+                     normalize_question(question)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached response for a key, or None when missing or expired."""
+        return self.cache.get(key)
+
+    def put(self, key: str, response: Dict) -> None:
+        """Store a response under a key, replacing any previous entry."""
+        self.cache.set(key, response, self.ttl)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """
+        Cached response, or the result of ``compute()``, which runs at most
+        once across threads and replicas; only successful responses are stored.
+
+        Returns:
+            Tuple of (response, computed)
+        """
+        return self.cache.get_or_compute(key, compute, self.ttl, cacheable=lambda response: response["success"])
+
+    def acquire(self, key: str) -> Optional[str]:
+        """Compute lock for a key (see ``TieredCache.acquire``)."""
+        return self.cache.acquire(key)
+
+    def release(self, key: str, token: str) -> None:
+        self.cache.release(key, token)
+
+    def wait(self, key: str) -> Optional[Any]:
+        """Response another replica is computing, or None if it gave up."""
+        return self.cache.wait(key)
+
+    def invalidate_all(self) -> None:
+        """Make every replica miss on all cached responses."""
+        self.cache.invalidate_all()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        return self.cache.backend.purge_expired()
+
+    def close(self) -> None:
+        self.cache.close()
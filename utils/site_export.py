@@ -0,0 +1,790 @@
+"""
+Static Site Export
+Renders every catalog source's Integration Guide, section navigation and
+references into a pre-built HTML site with a client-side search index, so a
+plain web server or CDN can serve the read-only views without Streamlit.
+Builds are incremental: a page is only rewritten when the hash of its KB,
+references or link statuses changed.
+
+    python -m utils.site_export --out site
+    python -m http.server --directory site 8080
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .kb_index import tokenize
+from .kb_loader import KBLoader
+from .kb_tables import _SEPARATOR_RE, _TABLE_ROW_RE
+from .link_validator import BROKEN_STATUSES, LinkValidator
+from .telemetry import span
+
+# Bump when the page templates, assets or search index format change: every
+# page is regenerated on the next build
+SITE_FORMAT_VERSION = 1
+MANIFEST_NAME = ".manifest.json"
+SNIPPET_CHARS = 160
+
+# Same labels, icons and empty-state messages as the References tab (no
+# message: the category is left out when empty)
+REFERENCE_CATEGORIES = (
+    ("official_docs", "📄 Official Documentation", "📌", "No official documentation links available yet."),
+    ("youtube", "🎥 YouTube Videos", "▶️", "No YouTube video links available yet."),
+    ("blogs_optional", "📝 Blogs & Community Resources", "📖", None),
+)
+
+_FENCE_RE = re.compile(r"^\s*```\s*([\w+-]*)")
+_HEADING_RE = re.compile(r"^(#{1,6}) (.+?)\s*#*\s*$")
+_HR_RE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+_LIST_ITEM_RE = re.compile(r"^(\s*)(?:[-*+]|(\d+)[.)])\s+(.*)$")
+_QUOTE_RE = re.compile(r"^\s*>\s?(.*)$")
+_CODE_SPAN_RE = re.compile(r"(`+)(.+?)\1")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_BOLD_RE = re.compile(r"\*\*(?!\s)(.+?)(?<!\s)\*\*")
+_ITALIC_RE = re.compile(r"(?<![\w*])\*(?![\s*])(.+?)(?<![\s*])\*(?![\w*])")
+_SAFE_URL_RE = re.compile(r"^(?:https?:|mailto:|#|/|\.)", re.IGNORECASE)
+_MARKUP_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)|[*`#>|]")
+
+# (indent, number for ordered items or None, text)
+ListItem = Tuple[int, Optional[int], str]
+
+
+# ----------------------------------------------------------------------
+# Markdown
+# ----------------------------------------------------------------------
+
+def _format_text(text: str) -> str:
+    text = html.escape(text)
+
+    def link(match: re.Match) -> str:
+        url = html.unescape(match.group(2))
+        if not _SAFE_URL_RE.match(url):
+            return match.group(1)
+        external = ' rel="noopener" target="_blank"' if url.lower().startswith("http") else ""
+        return f'<a href="{html.escape(url)}"{external}>{match.group(1)}</a>'
+
+    text = _LINK_RE.sub(link, text)
+    text = _BOLD_RE.sub(r"<strong>\1</strong>", text)
+    text = _ITALIC_RE.sub(r"<em>\1</em>", text)
+    return text.replace("  \n", "<br>\n")
+
+
+def render_inline(text: str) -> str:
+    """Render inline markdown (code spans, links, bold, italics, hard breaks) to HTML."""
+    parts = []
+    position = 0
+    for match in _CODE_SPAN_RE.finditer(text):
+        parts.append(_format_text(text[position:match.start()]))
+        parts.append(f"<code>{html.escape(match.group(2).strip())}</code>")
+        position = match.end()
+    parts.append(_format_text(text[position:]))
+    return "".join(parts)
+
+
+def plain_text(markdown: str) -> str:
+    """Markdown with its markup stripped and whitespace collapsed, for snippets."""
+    return " ".join(_MARKUP_RE.sub(lambda match: match.group(1) or " ", markdown).split())
+
+
+def _render_list(items: List[ListItem], start: int) -> Tuple[str, int]:
+    indent, first_number, _ = items[start]
+    ordered = first_number is not None
+    entries: List[List[str]] = []
+    i = start
+    while i < len(items) and items[i][0] >= indent:
+        level, number, text = items[i]
+        if level > indent:
+            nested, i = _render_list(items, i)
+            entries[-1].append(nested)
+            continue
+        if (number is not None) != ordered:
+            break
+        entries.append([render_inline(text)])
+        i += 1
+
+    tag = "ol" if ordered else "ul"
+    attrs = f' start="{first_number}"' if ordered and first_number != 1 else ""
+    body = "".join(f"<li>{''.join(entry)}</li>" for entry in entries)
+    return f"<{tag}{attrs}>{body}</{tag}>", i
+
+
+class MarkdownRenderer:
+    """
+    Renderer for the markdown subset the KB files use: ATX headings, paragraphs
+    with hard line breaks, nested ordered and unordered lists, pipe tables,
+    fenced code, block quotes, horizontal rules and inline formatting.
+
+    All text is HTML-escaped; links are limited to http(s), mailto and
+    relative URLs. Heading ids follow ``KBLoader.heading_anchor``, with a
+    numeric suffix for repeats, so deep links match the Streamlit app.
+    """
+
+    def __init__(self):
+        self.headings: List[Dict] = []
+        self._anchors: Counter = Counter()
+
+    def _anchor(self, title: str) -> str:
+        anchor = KBLoader.heading_anchor(title) or "section"
+        self._anchors[anchor] += 1
+        count = self._anchors[anchor]
+        return anchor if count == 1 else f"{anchor}-{count - 1}"
+
+    def render(self, markdown: str) -> str:
+        """
+        Render a markdown document to HTML.
+
+        Args:
+            markdown: Markdown text (front matter already stripped)
+
+        Returns:
+            HTML fragment; ``self.headings`` lists the document's headings
+            as dictionaries with 'level', 'title' and 'anchor' keys
+        """
+        self.headings = []
+        self._anchors = Counter()
+        lines = markdown.split('\n')
+        out: List[str] = []
+        paragraph: List[str] = []
+
+        def flush_paragraph() -> None:
+            if paragraph:
+                out.append(f"<p>{render_inline(chr(10).join(paragraph))}</p>")
+                paragraph.clear()
+
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                flush_paragraph()
+                i += 1
+                continue
+
+            fence = _FENCE_RE.match(line)
+            if fence:
+                flush_paragraph()
+                i = self._code_block(lines, i + 1, fence.group(1), out)
+                continue
+
+            heading = _HEADING_RE.match(line)
+            if heading:
+                flush_paragraph()
+                level, title = len(heading.group(1)), heading.group(2)
+                anchor = self._anchor(title)
+                self.headings.append({"level": level, "title": title, "anchor": anchor})
+                out.append(f'<h{level} id="{anchor}">{render_inline(title)}</h{level}>')
+                i += 1
+                continue
+
+            if _HR_RE.match(line):
+                flush_paragraph()
+                out.append("<hr>")
+                i += 1
+                continue
+
+            if _TABLE_ROW_RE.match(line) and i + 1 < len(lines) and _SEPARATOR_RE.match(lines[i + 1]):
+                flush_paragraph()
+                i = self._table(lines, i, out)
+                continue
+
+            if _LIST_ITEM_RE.match(line) and (not paragraph or not line[0].isspace()):
+                flush_paragraph()
+                i = self._list(lines, i, out)
+                continue
+
+            if _QUOTE_RE.match(line):
+                flush_paragraph()
+                quoted = []
+                while i < len(lines) and _QUOTE_RE.match(lines[i]):
+                    quoted.append(_QUOTE_RE.match(lines[i]).group(1))
+                    i += 1
+                out.append(f"<blockquote>{MarkdownRenderer().render(chr(10).join(quoted))}</blockquote>")
+                continue
+
+            paragraph.append(line.strip() + ("  " if line.endswith("  ") else ""))
+            i += 1
+
+        flush_paragraph()
+        return "\n".join(out)
+
+    @staticmethod
+    def _code_block(lines: List[str], i: int, language: str, out: List[str]) -> int:
+        code = []
+        while i < len(lines) and not _FENCE_RE.match(lines[i]):
+            code.append(lines[i])
+            i += 1
+        attrs = f' class="language-{html.escape(language)}"' if language else ""
+        out.append(f"<pre><code{attrs}>{html.escape(chr(10).join(code))}</code></pre>")
+        # Skip the closing fence (an unclosed block runs to the end of the file)
+        return i + 1
+
+    @staticmethod
+    def _table(lines: List[str], i: int, out: List[str]) -> int:
+        def cells(row: str) -> List[str]:
+            return [cell.strip() for cell in _TABLE_ROW_RE.match(row).group(1).split('|')]
+
+        headers = cells(lines[i])
+        rows = []
+        i += 2
+        while i < len(lines) and _TABLE_ROW_RE.match(lines[i]):
+            rows.append(cells(lines[i]))
+            i += 1
+        head = "".join(f"<th>{render_inline(cell)}</th>" for cell in headers)
+        body = "".join(
+            "<tr>" + "".join(f"<td>{render_inline(cell)}</td>" for cell in row) + "</tr>"
+            for row in rows
+        )
+        out.append(f'<div class="table-wrap"><table><thead><tr>{head}</tr></thead>'
+                   f'<tbody>{body}</tbody></table></div>')
+        return i
+
+    @staticmethod
+    def _list(lines: List[str], i: int, out: List[str]) -> int:
+        items: List[ListItem] = []
+        while i < len(lines):
+            line = lines[i]
+            item = _LIST_ITEM_RE.match(line)
+            if item:
+                number = int(item.group(2)) if item.group(2) else None
+                items.append((len(item.group(1).expandtabs(4)), number, item.group(3)))
+            elif not line.strip():
+                # A blank line ends the list unless another item follows
+                following = next((later for later in lines[i + 1:] if later.strip()), "")
+                if not _LIST_ITEM_RE.match(following):
+                    break
+            elif (_FENCE_RE.match(line) or _HEADING_RE.match(line) or _HR_RE.match(line)
+                  or _TABLE_ROW_RE.match(line)):
+                break
+            else:
+                # Continuation of the previous item's text
+                indent, number, text = items[-1]
+                items[-1] = (indent, number, f"{text}\n{line.strip()}")
+            i += 1
+
+        position = 0
+        while position < len(items):
+            rendered, position = _render_list(items, position)
+            out.append(rendered)
+        return i
+
+
+# ----------------------------------------------------------------------
+# Assets
+# ----------------------------------------------------------------------
+
+STYLESHEET = """\
+:root { --accent: #1E3A5F; --muted: #5A6C7D; --card: #f8f9fa; --border: #e1e4e8; }
+* { box-sizing: border-box; }
+body { margin: 0; font-family: -apple-system, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+       color: #1f2328; line-height: 1.6; }
+a { color: #1976d2; }
+header.site { background: var(--accent); color: white; padding: 0.8rem 1.5rem; }
+header.site a { color: white; text-decoration: none; font-weight: bold; font-size: 1.2rem; }
+.layout { display: flex; max-width: 1280px; margin: 0 auto; }
+nav.toc { width: 280px; flex-shrink: 0; padding: 1.5rem 1rem; position: sticky; top: 0;
+          align-self: flex-start; max-height: 100vh; overflow-y: auto; font-size: 0.9rem; }
+nav.toc ul { list-style: none; padding-left: 0; margin: 0; }
+nav.toc ul ul { padding-left: 1rem; }
+nav.toc li { margin: 0.2rem 0; }
+nav.toc a { color: var(--muted); text-decoration: none; }
+nav.toc a:hover { color: var(--accent); text-decoration: underline; }
+main { flex: 1; min-width: 0; padding: 1.5rem 2rem 4rem; }
+h1, h2, h3, h4 { color: var(--accent); line-height: 1.3; }
+h2 { border-bottom: 1px solid var(--border); padding-bottom: 0.3rem; margin-top: 2rem; }
+code { background: #f5f5f5; padding: 0.1rem 0.3rem; border-radius: 4px; font-size: 0.9em; }
+pre { background: #f5f5f5; padding: 1rem; border-radius: 8px; overflow-x: auto; }
+pre code { padding: 0; background: none; }
+.table-wrap { overflow-x: auto; }
+table { border-collapse: collapse; margin: 1rem 0; }
+th, td { border: 1px solid var(--border); padding: 0.4rem 0.7rem; text-align: left; vertical-align: top; }
+th { background: var(--card); }
+blockquote { border-left: 4px solid var(--border); margin: 1rem 0; padding: 0 1rem; color: var(--muted); }
+.meta { color: var(--muted); margin-bottom: 1.5rem; }
+.meta code { margin-right: 0.2rem; }
+.reference-card { background: var(--card); border-radius: 8px; padding: 1rem; margin-bottom: 0.5rem;
+                  border-left: 4px solid var(--accent); }
+.empty { color: var(--muted); font-style: italic; }
+.catalog { display: grid; grid-template-columns: repeat(auto-fill, minmax(260px, 1fr)); gap: 1rem; }
+.catalog .reference-card a { font-weight: bold; }
+.catalog .reference-card p { margin: 0.3rem 0 0; color: var(--muted); font-size: 0.9rem; }
+.search { position: relative; margin-bottom: 1rem; }
+.search input { width: 100%; padding: 0.5rem 0.7rem; border: 1px solid var(--border); border-radius: 6px;
+                font-size: 0.95rem; }
+#search-results { list-style: none; padding: 0; margin: 0.5rem 0 0; }
+#search-results li { padding: 0.5rem 0; border-bottom: 1px solid var(--border); }
+#search-results a { font-weight: bold; text-decoration: none; }
+#search-results .source { color: var(--muted); font-size: 0.8rem; }
+#search-results p { margin: 0.2rem 0 0; font-size: 0.85rem; color: var(--muted); }
+footer { color: var(--muted); font-size: 0.8rem; margin-top: 3rem; }
+@media (max-width: 800px) { .layout { flex-direction: column; } nav.toc { width: 100%; position: static;
+                            max-height: none; } main { padding: 1rem; } }
+"""
+
+# BM25 over the exported index, mirroring KBSearchIndex (same tokenizer and
+# parameters) so the static site ranks like the app's retrieval
+SEARCH_SCRIPT = """\
+(function () {
+  "use strict";
+  var TOKEN_RE = /[a-z0-9]+(?:[:._\\-][a-z0-9]+)*/g;
+  var PART_RE = /[a-z0-9]+/g;
+  var K1 = 1.5, B = 0.75, TOP_K = 10;
+  var root = document.body.getAttribute("data-root") || "";
+  var input = document.getElementById("search-input");
+  var list = document.getElementById("search-results");
+  var loading = null, timer = null;
+  if (!input || !list) { return; }
+
+  function tokenize(text) {
+    var tokens = [], matches = text.toLowerCase().match(TOKEN_RE) || [];
+    matches.forEach(function (token) {
+      tokens.push(token);
+      if (!/^[a-z0-9]+$/.test(token)) { tokens.push.apply(tokens, token.match(PART_RE)); }
+    });
+    return tokens;
+  }
+
+  function load() {
+    if (!loading) {
+      loading = fetch(root + "search-index.json").then(function (response) { return response.json(); });
+    }
+    return loading;
+  }
+
+  function search(index, query) {
+    var docs = index.docs, scores = {}, seen = {};
+    tokenize(query).forEach(function (term) {
+      var postings = index.terms[term];
+      if (seen[term] || !postings) { return; }
+      seen[term] = true;
+      var df = postings.length / 2;
+      var idf = Math.log(1 + (docs.length - df + 0.5) / (df + 0.5));
+      for (var i = 0; i < postings.length; i += 2) {
+        var doc = postings[i], tf = postings[i + 1];
+        var norm = K1 * (1 - B + B * docs[doc][3] / index.avg_length);
+        scores[doc] = (scores[doc] || 0) + idf * tf * (K1 + 1) / (tf + norm);
+      }
+    });
+    return Object.keys(scores)
+      .sort(function (a, b) { return scores[b] - scores[a]; })
+      .slice(0, TOP_K)
+      .map(function (doc) { return docs[doc]; });
+  }
+
+  function show(index, hits) {
+    list.innerHTML = "";
+    hits.forEach(function (doc) {
+      var item = document.createElement("li");
+      var link = document.createElement("a");
+      link.href = root + "sources/" + doc[0] + ".html#" + doc[2];
+      link.textContent = doc[1];
+      var source = document.createElement("div");
+      source.className = "source";
+      source.textContent = index.sources[doc[0]];
+      var snippet = document.createElement("p");
+      snippet.textContent = doc[4];
+      item.appendChild(link);
+      item.appendChild(source);
+      item.appendChild(snippet);
+      list.appendChild(item);
+    });
+  }
+
+  input.addEventListener("input", function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var query = input.value.trim();
+      if (!query) { list.innerHTML = ""; return; }
+      load().then(function (index) { show(index, search(index, query)); });
+    }, 150);
+  });
+})();
+"""
+
+
+# ----------------------------------------------------------------------
+# Exporter
+# ----------------------------------------------------------------------
+
+def _status_badge(result: Optional[Dict]) -> str:
+    """Status icon for a reference link, as shown in the References tab."""
+    if result is None:
+        return ""
+    if result["status"] == "ok":
+        return ' <span title="Link checked OK">✅</span>'
+    label = result.get("detail") or result["status"]
+    icon = "❌" if result["status"] in BROKEN_STATUSES else "⚠️"
+    return f' <span title="{html.escape(label)}">{icon}</span>'
+
+
+def _digest(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SiteExporter:
+    """
+    Builds the static site:
+
+    - ``index.html``: the catalog, grouped by category, with search
+    - ``sources/<slug>.html``: one page per source (guide, section
+      navigation and references)
+    - ``search-index.json``: BM25 postings over every KB section
+    - ``assets/``: stylesheet and search script
+
+    A manifest in the output directory records the hash each file was built
+    from; ``build`` rewrites only files whose inputs changed and removes
+    pages of sources that left the catalog. Files are replaced atomically,
+    so a server never sees a half-written page.
+    """
+
+    def __init__(self, kb_loader: KBLoader, out_dir: str, link_validator: Optional[LinkValidator] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            kb_loader: Loader for the catalog, KB content and references
+            out_dir: Directory to write the site into
+            link_validator: Validator whose cached results become link
+                status badges (no badges when None)
+        """
+        self.kb_loader = kb_loader
+        self.out_dir = Path(out_dir)
+        self.link_validator = link_validator
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.out_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {"files": {}}
+        if manifest.get("version") != SITE_FORMAT_VERSION:
+            return {"files": {}}
+        return manifest
+
+    def _write(self, relative_path: str, content: str) -> None:
+        path = self.out_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Inputs
+    # ------------------------------------------------------------------
+
+    def _references(self, source_slug: str) -> Dict:
+        references = self.kb_loader.get_references(source_slug)
+        return references["data"] if references["success"] else {}
+
+    def _link_statuses(self, references: Dict) -> Dict[str, Dict]:
+        """Status and detail per reference URL (check times are left out so
+        re-validating unchanged links does not rebuild pages)."""
+        if self.link_validator is None:
+            return {}
+        statuses = {}
+        for key, *_ in REFERENCE_CATEGORIES:
+            for link in references.get(key, []):
+                result = self.link_validator.get_status(link["url"])
+                if result is not None:
+                    statuses[link["url"]] = {"status": result["status"], "detail": result.get("detail")}
+        return statuses
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _document(title: str, root: str, body: str) -> str:
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<link rel="stylesheet" href="{root}assets/style.css">
+</head>
+<body data-root="{root}">
+<header class="site"><a href="{root}index.html">🛡️ SIEM Log Source Onboarding Assistant</a></header>
+{body}
+<script src="{root}assets/search.js" defer></script>
+</body>
+</html>
+"""
+
+    @staticmethod
+    def _search_box() -> str:
+        return ('<div class="search"><input id="search-input" type="search" '
+                'placeholder="Search all guides…" aria-label="Search all guides">'
+                '<ul id="search-results"></ul></div>')
+
+    @staticmethod
+    def _toc(headings: List[Dict]) -> str:
+        # Level-2 sections, each with its level-3 subsections
+        sections: List[Tuple[Dict, List[Dict]]] = []
+        for heading in headings:
+            if heading["level"] == 2 or (heading["level"] == 3 and not sections):
+                sections.append((heading, []))
+            elif heading["level"] == 3:
+                sections[-1][1].append(heading)
+
+        def link(heading: Dict) -> str:
+            return f'<a href="#{heading["anchor"]}">{render_inline(heading["title"])}</a>'
+
+        parts = ['<ul>']
+        for heading, subsections in sections:
+            nested = "".join(f'<li>{link(sub)}</li>' for sub in subsections)
+            parts.append(f'<li>{link(heading)}{f"<ul>{nested}</ul>" if nested else ""}</li>')
+        parts.append('<li><a href="#references">🔗 References</a></li></ul>')
+        return "".join(parts)
+
+    def _references_html(self, references: Dict, statuses: Dict[str, Dict]) -> str:
+        parts = ['<h2 id="references">🔗 References</h2>']
+        for key, label, icon, empty_message in REFERENCE_CATEGORIES:
+            links = references.get(key, [])
+            if not links and empty_message is None:
+                continue
+            parts.append(f'<h4>{html.escape(label)}</h4>')
+            if not links:
+                parts.append(f'<p class="empty">{empty_message}</p>')
+            for link in links:
+                parts.append(
+                    f'<div class="reference-card"><a href="{html.escape(link["url"])}" rel="noopener" '
+                    f'target="_blank">{icon} {html.escape(link["title"])}</a>'
+                    f'{_status_badge(statuses.get(link["url"]))}</div>'
+                )
+        return "\n".join(parts)
+
+    def render_source_page(self, source_slug: str, metadata: Dict, content: str, references: Dict,
+                           statuses: Dict[str, Dict]) -> Tuple[str, List[Dict]]:
+        """
+        Render one source's page.
+
+        Returns:
+            Tuple of (HTML document, headings of the guide)
+        """
+        renderer = MarkdownRenderer()
+        guide = renderer.render(content)
+        sourcetypes = ", ".join(f"<code>{html.escape(sourcetype)}</code>"
+                              for sourcetype in metadata.get("sourcetypes", []))
+        meta = (f'<div class="meta">{html.escape(metadata.get("vendor", ""))} · '
+                f'{html.escape(metadata.get("category", ""))} · index <code>'
+                f'{html.escape(metadata.get("index", ""))}</code> · {sourcetypes}</div>')
+        body = (f'<div class="layout">\n<nav class="toc"><p><a href="../index.html">← All sources</a></p>'
+                f'{self._search_box()}{self._toc(renderer.headings)}</nav>\n'
+                f'<main>\n{meta}\n{guide}\n{self._references_html(references, statuses)}\n</main>\n</div>')
+        return self._document(metadata.get("display_name", source_slug), "../", body), renderer.headings
+
+    def render_index_page(self, sources: Dict) -> str:
+        """Render the catalog page, grouping sources by category."""
+        categories: Dict[str, List[Tuple[str, Dict]]] = {}
+        for slug, metadata in sources.items():
+            categories.setdefault(metadata.get("category", "Other"), []).append((slug, metadata))
+        parts = ['<div class="layout"><main>', '<h1>Integration Guides</h1>', self._search_box()]
+        for category in sorted(categories):
+            parts.append(f'<h2>{html.escape(category)}</h2><div class="catalog">')
+            for slug, metadata in categories[category]:
+                parts.append(
+                    f'<div class="reference-card"><a href="sources/{html.escape(slug)}.html">'
+                    f'{html.escape(metadata.get("display_name", slug))}</a>'
+                    f'<p>{html.escape(metadata.get("vendor", ""))} · index '
+                    f'<code>{html.escape(metadata.get("index", ""))}</code></p></div>'
+                )
+            parts.append('</div>')
+        parts.append(f'<footer>{len(sources)} sources</footer></main></div>')
+        return self._document("SIEM Integration Guides", "", "\n".join(parts))
+
+    def build_search_index(self, sources: Dict, anchors: Dict[str, Dict[str, str]]) -> Dict:
+        """
+        Inverted index over every KB section, in the compact form the search
+        script reads: docs are ``[slug, title, anchor, length, snippet]`` and
+        each term maps to a flat ``[doc, tf, doc, tf, ...]`` postings list.
+
+        Args:
+            sources: Catalog (slug to metadata)
+            anchors: Per source, section id to the anchor used on its page
+        """
+        docs, terms = [], {}
+        total_length = 0
+        for slug in sources:
+            for block in self.kb_loader.get_kb_section_blocks(slug):
+                counts = Counter(tokenize(block["title"] + "\n" + block["content"]))
+                length = sum(counts.values())
+                doc = len(docs)
+                anchor = anchors.get(slug, {}).get(block["id"], block["anchor"])
+                snippet = plain_text(block["content"])
+                if len(snippet) > SNIPPET_CHARS:
+                    snippet = snippet[:SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+                docs.append([slug, block["title"], anchor, length, snippet])
+                total_length += length
+                for term, tf in counts.items():
+                    terms.setdefault(term, []).extend((doc, tf))
+        return {
+            "version": SITE_FORMAT_VERSION,
+            "avg_length": round(total_length / len(docs), 3) if docs else 1,
+            "sources": {slug: metadata.get("display_name", slug) for slug, metadata in sources.items()},
+            "docs": docs,
+            "terms": terms
+        }
+
+    @staticmethod
+    def _section_anchors(source_slug: str, blocks: List[Dict], headings: List[Dict]) -> Dict[str, str]:
+        """Map section ids to the (de-duplicated) anchors rendered on the page."""
+        rendered = [heading["anchor"] for heading in headings if heading["level"] in (2, 3)]
+        if len(rendered) != len(blocks):
+            return {}
+        return {block["id"]: anchor for block, anchor in zip(blocks, rendered)}
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def build(self, force: bool = False) -> Dict:
+        """
+        Bring the site up to date.
+
+        Args:
+            force: Rewrite every file, even if its inputs are unchanged
+
+        Returns:
+            Dictionary with 'success', 'written' (relative paths), 'unchanged'
+            (count), 'removed' (relative paths), 'errors', 'seconds' and
+            'message' keys
+        """
+        with self._lock, span("site.build"):
+            started = time.perf_counter()
+            manifest = {"files": {}} if force else self._read_manifest()
+            previous = manifest["files"]
+            files: Dict[str, str] = {}
+            written, errors = [], []
+            anchors: Dict[str, Dict[str, str]] = {}
+
+            def emit(relative_path: str, digest: str, render) -> None:
+                files[relative_path] = digest
+                if previous.get(relative_path) == digest and (self.out_dir / relative_path).exists():
+                    return
+                self._write(relative_path, render())
+                written.append(relative_path)
+
+            emit("assets/style.css", _digest(SITE_FORMAT_VERSION, STYLESHEET), lambda: STYLESHEET)
+            emit("assets/search.js", _digest(SITE_FORMAT_VERSION, SEARCH_SCRIPT), lambda: SEARCH_SCRIPT)
+
+            sources = self.kb_loader.get_available_sources()
+            for slug, metadata in sources.items():
+                kb_data = self.kb_loader.load_kb_content(slug)
+                if not kb_data["success"]:
+                    errors.append(f"{slug}: {kb_data['message']}")
+                    continue
+                references = self._references(slug)
+                statuses = self._link_statuses(references)
+                relative_path = f"sources/{slug}.html"
+                digest = _digest(SITE_FORMAT_VERSION, slug, metadata, kb_data["content"], references, statuses)
+                page_anchors = previous.get(f"anchors:{slug}")
+
+                if previous.get(relative_path) != digest or not (self.out_dir / relative_path).exists():
+                    with span("site.page", source=slug):
+                        page, headings = self.render_source_page(slug, metadata, kb_data["content"],
+                                                                 references, statuses)
+                        self._write(relative_path, page)
+                    written.append(relative_path)
+                    page_anchors = self._section_anchors(slug, self.kb_loader.get_kb_section_blocks(slug),
+                                                         headings)
+                files[relative_path] = digest
+                anchors[slug] = page_anchors or {}
+                files[f"anchors:{slug}"] = anchors[slug]
+
+            emit("index.html", _digest(SITE_FORMAT_VERSION, sources), lambda: self.render_index_page(sources))
+            page_digests = {slug: files.get(f"sources/{slug}.html") for slug in sources}
+            emit("search-index.json", _digest(SITE_FORMAT_VERSION, page_digests),
+                 lambda: json.dumps(self.build_search_index(sources, anchors), ensure_ascii=False,
+                                    separators=(",", ":")))
+
+            removed = []
+            for relative_path in previous:
+                if relative_path.startswith("sources/") and relative_path not in files:
+                    try:
+                        (self.out_dir / relative_path).unlink()
+                    except FileNotFoundError:
+                        pass
+                    removed.append(relative_path)
+
+            self._write(MANIFEST_NAME, json.dumps({"version": SITE_FORMAT_VERSION, "files": files},
+                                                  indent=2, sort_keys=True))
+            pages = sum(1 for path in files if path.startswith("sources/"))
+            unchanged = sum(1 for path in files if not path.startswith("anchors:")) - len(written)
+            return {
+                "success": not errors,
+                "written": written,
+                "unchanged": unchanged,
+                "removed": removed,
+                "errors": errors,
+                "seconds": round(time.perf_counter() - started, 3),
+                "message": (f"Exported {pages} sources to {self.out_dir}: {len(written)} files written, "
+                            f"{unchanged} unchanged, {len(removed)} removed")
+            }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.site_export``."""
+    parser = argparse.ArgumentParser(description="Export the integration guides and references as a static site.")
+    parser.add_argument("--out", default="site", help="Output directory")
+    parser.add_argument("--kb", default="kb", help="KB directory")
+    parser.add_argument("--force", action="store_true", help="Rewrite every file, even if unchanged")
+    parser.add_argument("--no-link-status", action="store_true",
+                        help="Leave out the badges from the last reference link validation")
+    parser.add_argument("--watch", action="store_true", help="Keep running and rebuild when the KB changes")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between rebuilds with --watch")
+    args = parser.parse_args(argv)
+
+    kb_loader = KBLoader(args.kb)
+    link_validator = None if args.no_link_status else LinkValidator.for_loader(kb_loader)
+    exporter = SiteExporter(kb_loader, args.out, link_validator)
+
+    def report(result: Dict) -> None:
+        for error in result["errors"]:
+            print(f"ERROR {error}", file=sys.stderr)
+        print(f"{result['message']} in {result['seconds']}s", file=sys.stderr)
+
+    result = exporter.build(force=args.force)
+    report(result)
+    if not args.watch:
+        return 0 if result["success"] else 1
+
+    from .kb_watcher import KBWatcher
+
+    # The watcher invalidates the loader's caches on KB and references.json
+    # edits; the periodic build then picks up whatever changed
+    watcher = KBWatcher(kb_loader).start()
+    print(f"Watching {args.kb} for changes (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(args.interval)
+            result = exporter.build()
+            if result["written"] or result["removed"] or result["errors"]:
+                report(result)
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Sizing Calculator
+Vectorized EPS, license volume, indexer and storage estimates per source.
+"""
+
+import itertools
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .kb_tables import KBTableStore
+
+BYTES_PER_GB = 1024 ** 3
+SECONDS_PER_DAY = 86400
+
+# Planning defaults used until measured rates are entered (EPS per device)
+DEFAULT_EPS_BY_PRIORITY = {"High": 10.0, "Medium": 2.0, "Low": 0.5}
+DEFAULT_EVENT_BYTES_BY_CATEGORY = {
+    "Firewall": 450,
+    "Operating System": 600,
+    "Identity & Access": 2500,
+    "Endpoint Detection & Response": 1200,
+    "Cloud Services": 2000,
+    "Email Security": 1500,
+    "Secure Web Gateway": 800
+}
+DEFAULT_EVENT_BYTES = 700
+
+# Splunk disk rule of thumb: compressed rawdata is ~15% and index files ~35% of raw volume
+RAWDATA_RATIO = 0.15
+INDEX_FILES_RATIO = 0.35
+
+# Scenario parameters and their defaults; every one may be a scalar or an array
+DEFAULT_PARAMETERS = {
+    "devices": 1.0,
+    "eps_scale": 1.0,
+    "event_bytes_scale": 1.0,
+    "retention_days": 90.0,
+    "replication_factor": 1.0,
+    "search_factor": 1.0,
+    "indexer_capacity_gb": 250.0,
+    "peak_factor": 3.0
+}
+# Parameters that vary continuously and are swept by ``sensitivity``
+SENSITIVITY_PARAMETERS = ("devices", "eps_scale", "event_bytes_scale", "retention_days", "indexer_capacity_gb")
+
+
+def _measured(value) -> Optional[float]:
+    """An override value as a float, or None when it is empty, not a number or negative."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) and value >= 0 else None
+
+
+def compute(devices, eps, event_bytes, retention_days=90.0, replication_factor=1.0,
+            search_factor=1.0, indexer_capacity_gb=250.0, peak_factor=3.0) -> Dict[str, np.ndarray]:
+    """
+    Size any number of scenarios in one pass.
+
+    ``eps`` and ``event_bytes`` carry the log types on their last axis;
+    every other argument broadcasts against the remaining (scenario) axes,
+    so a (N, L) rate matrix with (N,) device counts sizes N scenarios.
+
+    Args:
+        devices: Number of devices sending the logs
+        eps: Average events per second per device, per log type
+        event_bytes: Average raw event size in bytes, per log type
+        retention_days: Days of searchable retention
+        replication_factor: Copies of rawdata kept by the indexer cluster
+        search_factor: Searchable copies (index files) kept by the cluster
+        indexer_capacity_gb: Daily ingest one indexer can handle
+        peak_factor: Ratio of peak to average EPS
+
+    Returns:
+        Dictionary of arrays: 'avg_eps', 'peak_eps', 'gb_per_day',
+        'log_type_gb_per_day', 'indexers' and 'storage_gb'
+    """
+    devices = np.asarray(devices, dtype=float)
+    eps = np.asarray(eps, dtype=float)
+    event_bytes = np.asarray(event_bytes, dtype=float)
+
+    log_type_eps = devices[..., np.newaxis] * eps
+    log_type_gb = log_type_eps * event_bytes * (SECONDS_PER_DAY / BYTES_PER_GB)
+    avg_eps = log_type_eps.sum(axis=-1)
+    gb_per_day = log_type_gb.sum(axis=-1)
+
+    disk_ratio = (RAWDATA_RATIO * np.asarray(replication_factor, dtype=float)
+                  + INDEX_FILES_RATIO * np.asarray(search_factor, dtype=float))
+    indexers = np.maximum(np.ceil(gb_per_day / np.asarray(indexer_capacity_gb, dtype=float)), 1)
+
+    return {
+        "avg_eps": avg_eps,
+        "peak_eps": avg_eps * peak_factor,
+        "gb_per_day": gb_per_day,
+        "log_type_gb_per_day": log_type_gb,
+        "indexers": indexers.astype(int),
+        "storage_gb": gb_per_day * np.asarray(retention_days, dtype=float) * disk_ratio
+    }
+
+
+class SizingCalculator:
+    """
+    EPS and license-volume sizing for catalog sources.
+
+    Each source gets a profile of its KB log types with per-device event
+    rates and sizes (priority- and category-based defaults, overridable
+    with measured values). Scenario grids and sensitivity sweeps are built
+    as NumPy arrays and sized by a single ``compute`` call.
+    """
+
+    def __init__(self, table_store: KBTableStore):
+        """
+        Initialize the calculator.
+
+        Args:
+            table_store: Table store providing each source's log types
+        """
+        self.table_store = table_store
+
+    def profile(self, source_slug: str, overrides: Optional[Dict[str, Dict]] = None) -> Dict:
+        """
+        Build the per-log-type rate profile of a source.
+
+        Args:
+            source_slug: The slug identifier for the log source
+            overrides: Optional mapping of log type name to a dict with
+                'eps', 'event_bytes' and/or 'enabled'; empty, non-numeric
+                or negative rates keep the default
+
+        Returns:
+            Dictionary with 'source', 'log_types', 'priorities', 'eps' and
+            'event_bytes' (arrays; disabled log types have zero EPS)
+        """
+        overrides = overrides or {}
+        self.table_store.ensure_source(source_slug)
+        metadata = self.table_store.kb_loader.get_source_metadata(source_slug) or {}
+        default_bytes = DEFAULT_EVENT_BYTES_BY_CATEGORY.get(metadata.get("category"), DEFAULT_EVENT_BYTES)
+
+        rows = self.table_store.query("log_types", source=source_slug)
+        if not rows:
+            # Sources without a log type table are sized as a single stream
+            rows = [{"log_type": "All events", "priority": "Medium"}]
+
+        log_types, priorities, eps, event_bytes = [], [], [], []
+        for row in rows:
+            override = overrides.get(row["log_type"], {})
+            enabled = override.get("enabled") is not False
+            log_types.append(row["log_type"])
+            priorities.append(row["priority"])
+            rate = _measured(override.get("eps"))
+            if rate is None:
+                rate = DEFAULT_EPS_BY_PRIORITY.get(row["priority"], DEFAULT_EPS_BY_PRIORITY["Low"])
+            size = _measured(override.get("event_bytes"))
+            eps.append(rate if enabled else 0.0)
+            event_bytes.append(default_bytes if size is None else size)
+
+        return {
+            "source": source_slug,
+            "log_types": log_types,
+            "priorities": priorities,
+            "eps": np.array(eps, dtype=float),
+            "event_bytes": np.array(event_bytes, dtype=float)
+        }
+
+    @staticmethod
+    def _evaluate(profile: Dict, parameters: Dict) -> Dict[str, np.ndarray]:
+        values = {**DEFAULT_PARAMETERS, **parameters}
+        unknown = set(values) - set(DEFAULT_PARAMETERS)
+        if unknown:
+            raise KeyError(f"Unknown sizing parameters: {', '.join(sorted(unknown))}")
+        eps_scale = np.asarray(values.pop("eps_scale"), dtype=float)[..., np.newaxis]
+        bytes_scale = np.asarray(values.pop("event_bytes_scale"), dtype=float)[..., np.newaxis]
+        return compute(
+            eps=profile["eps"] * eps_scale,
+            event_bytes=profile["event_bytes"] * bytes_scale,
+            **values
+        )
+
+    def estimate(self, source_slug: str, devices: float, overrides: Optional[Dict[str, Dict]] = None,
+                 **parameters) -> Dict:
+        """
+        Size one source for a single scenario.
+
+        Args:
+            source_slug: The slug identifier for the log source
+            devices: Number of devices sending logs
+            overrides: Per-log-type rate overrides (see ``profile``)
+            **parameters: Any other scenario parameter (retention_days, ...)
+
+        Returns:
+            Dictionary with 'success', 'totals', 'log_types' and 'message' keys
+        """
+        if self.table_store.kb_loader.get_source_metadata(source_slug) is None:
+            return {"success": False, "totals": {}, "log_types": [], "message": f"Unknown source: {source_slug}"}
+
+        profile = self.profile(source_slug, overrides)
+        result = self._evaluate(profile, {**parameters, "devices": devices})
+        log_type_gb = result.pop("log_type_gb_per_day")
+        totals = {name: value.item() for name, value in result.items()}
+        gb_total = totals["gb_per_day"] or 1.0
+
+        log_types = [
+            {
+                "log_type": name,
+                "priority": priority,
+                "eps_per_device": float(rate),
+                "event_bytes": float(size),
+                "gb_per_day": float(gb),
+                "share": float(gb / gb_total)
+            }
+            for name, priority, rate, size, gb in zip(
+                profile["log_types"], profile["priorities"], profile["eps"], profile["event_bytes"], log_type_gb
+            )
+        ]
+        return {"success": True, "totals": totals, "log_types": log_types, "message": "Sizing estimate computed"}
+
+    def estimate_all(self, device_counts: Dict[str, float], **parameters) -> Dict:
+        """
+        Size several sources at once and add them up.
+
+        Profiles are padded into one (sources, log types) matrix so the
+        whole estate is sized in a single vectorized call.
+
+        Args:
+            device_counts: Mapping of source slug to number of devices
+            **parameters: Scenario parameters shared by every source
+
+        Returns:
+            Dictionary with 'success', 'sources' (one row per source),
+            'totals' and 'message' keys
+        """
+        slugs = [slug for slug in device_counts if self.table_store.kb_loader.get_source_metadata(slug)]
+        if not slugs:
+            return {"success": False, "sources": [], "totals": {}, "message": "No known sources to size"}
+
+        profiles = [self.profile(slug) for slug in slugs]
+        width = max(len(profile["eps"]) for profile in profiles)
+        eps = np.zeros((len(slugs), width))
+        event_bytes = np.zeros((len(slugs), width))
+        for i, profile in enumerate(profiles):
+            eps[i, :len(profile["eps"])] = profile["eps"]
+            event_bytes[i, :len(profile["event_bytes"])] = profile["event_bytes"]
+
+        padded = {"eps": eps, "event_bytes": event_bytes}
+        values = {**parameters, "devices": np.array([device_counts[slug] for slug in slugs], dtype=float)}
+        result = self._evaluate(padded, values)
+        result.pop("log_type_gb_per_day")
+
+        sources = [
+            {"source": slug, **{name: array[i].item() for name, array in result.items()}}
+            for i, slug in enumerate(slugs)
+        ]
+        totals = {name: float(array.sum()) for name, array in result.items() if name != "indexers"}
+        # Indexers are shared across sources, so size them on the combined volume
+        capacity = parameters.get("indexer_capacity_gb", DEFAULT_PARAMETERS["indexer_capacity_gb"])
+        totals["indexers"] = max(int(np.ceil(totals["gb_per_day"] / capacity)), 1)
+        return {"success": True, "sources": sources, "totals": totals, "message": f"Sized {len(slugs)} sources"}
+
+    def scenario_grid(self, source_slug: str, overrides: Optional[Dict[str, Dict]] = None,
+                      **ranges) -> Dict[str, np.ndarray]:
+        """
+        Size every combination of the given parameter ranges.
+
+        Example: ``scenario_grid("palo_alto", devices=range(1, 101),
+        eps_scale=np.linspace(0.5, 3, 26), retention_days=[30, 90, 365])``
+        sizes 7,800 scenarios in one call.
+
+        Args:
+            source_slug: The slug identifier for the log source
+            overrides: Per-log-type rate overrides (see ``profile``)
+            **ranges: Parameter name -> sequence of values; omitted
+                parameters keep their default
+
+        Returns:
+            Dictionary of flat arrays, one entry per scenario, holding both
+            the swept parameters and the computed outputs
+        """
+        profile = self.profile(source_slug, overrides)
+        names = list(ranges)
+        axes = [np.asarray(list(ranges[name]), dtype=float) for name in names]
+        mesh = np.meshgrid(*axes, indexing="ij") if axes else []
+        grid = {name: values.ravel() for name, values in zip(names, mesh)}
+
+        result = self._evaluate(profile, grid)
+        result.pop("log_type_gb_per_day")
+        size = int(np.prod([len(axis) for axis in axes])) if axes else 1
+        return {**grid, **{name: np.broadcast_to(values, (size,)) for name, values in result.items()}}
+
+    def sensitivity(self, source_slug: str, base: Optional[Dict] = None, spread: float = 0.5,
+                    metric: str = "gb_per_day", overrides: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """
+        One-at-a-time sensitivity of a metric to each continuous parameter.
+
+        Each parameter is moved ``spread`` below and above its base value
+        while the others stay fixed; all variants are sized together.
+
+        Args:
+            source_slug: The slug identifier for the log source
+            base: Base scenario parameters (defaults fill the rest)
+            spread: Relative change applied in each direction
+            metric: Output to measure ('gb_per_day', 'storage_gb', ...)
+            overrides: Per-log-type rate overrides (see ``profile``)
+
+        Returns:
+            List of dicts with 'parameter', 'low', 'high', 'base' and
+            'swing', largest swing first
+        """
+        profile = self.profile(source_slug, overrides)
+        base = {**DEFAULT_PARAMETERS, **(base or {})}
+        variants = list(itertools.product(SENSITIVITY_PARAMETERS, (1 - spread, 1 + spread)))
+
+        # Row 0 is the base case, then a low/high row per parameter
+        batch = {name: np.full(len(variants) + 1, float(value)) for name, value in base.items()}
+        for row, (name, factor) in enumerate(variants, start=1):
+            batch[name][row] *= factor
+
+        values = self._evaluate(profile, batch)[metric]
+        base_value = float(values[0])
+        results = []
+        for i, name in enumerate(SENSITIVITY_PARAMETERS):
+            low, high = float(values[1 + 2 * i]), float(values[2 + 2 * i])
+            results.append({
+                "parameter": name,
+                "low": low,
+                "high": high,
+                "base": base_value,
+                "swing": abs(high - low)
+            })
+        return sorted(results, key=lambda item: -item["swing"])
+
@@ -0,0 +1,157 @@
+"""
+Source Picker
+Prefix-trie and trigram index over the source catalog for typeahead search.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Set
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Matches in more specific fields rank higher
+FIELD_WEIGHTS = {
+    "display_name": 4.0,
+    "vendor": 3.0,
+    "sourcetypes": 2.0,
+    "category": 1.0
+}
+# Bonus when the query token is a prefix of the first word of the display name
+LEADING_WORD_BONUS = 1.0
+# Infix (trigram) matches score below any prefix match in the same field
+INFIX_FACTOR = 0.5
+RECENT_BOOST = 100.0
+
+
+class _TrieNode:
+    __slots__ = ("children", "weights")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Best weight per source slug for any token passing through this node
+        self.weights: Dict[str, float] = {}
+
+
+class SourceTypeahead:
+    """
+    Typeahead search over display name, vendor, category and sourcetype.
+
+    Every word of every field is inserted into a prefix trie whose nodes
+    carry the best field weight per source, so a keystroke costs one walk
+    down the trie per query word. Words that match nowhere as a prefix fall
+    back to a trigram index for infix matches (e.g. "soft" -> "Microsoft").
+    Recently used sources are ranked first among the matches.
+    """
+
+    def __init__(self, catalog: Optional[Dict] = None):
+        """
+        Initialize the picker.
+
+        Args:
+            catalog: Source catalog as returned by ``KBLoader.get_available_sources``
+        """
+        self._lock = threading.Lock()
+        self._root = _TrieNode()
+        self._trigrams: Dict[str, Dict[str, float]] = {}
+        self._order: List[str] = []
+        if catalog is not None:
+            self.build(catalog)
+
+    @staticmethod
+    def _field_words(metadata: Dict, field: str) -> List[str]:
+        value = metadata.get(field, "")
+        if isinstance(value, list):
+            value = " ".join(value)
+        return _WORD_RE.findall(value.lower())
+
+    def build(self, catalog: Dict) -> None:
+        """(Re-)build the index from a catalog, preserving catalog order for ties."""
+        root = _TrieNode()
+        trigrams: Dict[str, Dict[str, float]] = {}
+
+        for slug, metadata in catalog.items():
+            for field, weight in FIELD_WEIGHTS.items():
+                for position, word in enumerate(self._field_words(metadata, field)):
+                    word_weight = weight
+                    if field == "display_name" and position == 0:
+                        word_weight += LEADING_WORD_BONUS
+
+                    node = root
+                    for char in word:
+                        node = node.children.setdefault(char, _TrieNode())
+                        if node.weights.get(slug, 0.0) < word_weight:
+                            node.weights[slug] = word_weight
+
+                    infix_weight = weight * INFIX_FACTOR
+                    for i in range(len(word) - 2):
+                        grams = trigrams.setdefault(word[i:i + 3], {})
+                        if grams.get(slug, 0.0) < infix_weight:
+                            grams[slug] = infix_weight
+
+        with self._lock:
+            self._root = root
+            self._trigrams = trigrams
+            self._order = list(catalog)
+
+    def _prefix_weights(self, word: str) -> Dict[str, float]:
+        node = self._root
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+        return node.weights
+
+    def _infix_weights(self, word: str) -> Dict[str, float]:
+        if len(word) < 3:
+            return {}
+        grams = [self._trigrams.get(word[i:i + 3]) for i in range(len(word) - 2)]
+        if not all(grams):
+            return {}
+        # Every trigram of the word must be present in the same source
+        slugs: Set[str] = set(grams[0])
+        for gram in grams[1:]:
+            slugs &= gram.keys()
+        return {slug: min(gram[slug] for gram in grams) for slug in slugs}
+
+    def search(self, query: str, recent: Optional[List[str]] = None, top_k: int = 10) -> List[str]:
+        """
+        Return the best matching source slugs for a (partial) query.
+
+        Args:
+            query: Text typed so far; every word must match some field
+            recent: Recently used slugs, most recent first
+            top_k: Maximum number of results
+
+        Returns:
+            List of source slugs, best match first
+        """
+        recent = recent or []
+        recent_rank = {slug: len(recent) - i for i, slug in enumerate(recent)}
+        words = _WORD_RE.findall(query.lower())
+
+        with self._lock:
+            order = self._order
+            if not words:
+                ranked = [slug for slug in recent if slug in recent_rank and slug in order]
+                ranked += [slug for slug in order if slug not in recent_rank]
+                return ranked[:top_k]
+
+            scores: Optional[Dict[str, float]] = None
+            for word in words:
+                matches = self._prefix_weights(word) or self._infix_weights(word)
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {slug: score + matches[slug] for slug, score in scores.items() if slug in matches}
+                if not scores:
+                    return []
+
+        position = {slug: i for i, slug in enumerate(order)}
+        ranked = sorted(
+            scores,
+            key=lambda slug: (
+                -(scores[slug] + RECENT_BOOST * recent_rank.get(slug, 0)),
+                position.get(slug, len(position))
+            )
+        )
+        return ranked[:top_k]
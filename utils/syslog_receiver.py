@@ -0,0 +1,487 @@
+"""
+Syslog Test Receiver
+Local UDP/TCP/TLS syslog listener that classifies incoming messages against
+the catalog sources and reports live EPS, drops and parse failures.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import socket
+import ssl
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from .kb_loader import KBLoader
+from .log_analyzer import GENERIC_SYSLOG, route_line
+
+# Unprivileged stand-ins for 514 (syslog) and 6514 (syslog over TLS)
+DEFAULT_UDP_PORT = 5514
+DEFAULT_TCP_PORT = 5514
+DEFAULT_TLS_PORT = 6514
+
+MAX_DATAGRAM = 65535
+MAX_FRAME = 64 * 1024
+_MAX_LENGTH_DIGITS = len(str(MAX_FRAME))
+# Datagrams read per readiness event; they are classified as one batch
+UDP_DRAIN_LIMIT = 512
+SOCKET_RCVBUF = 8 * 1024 * 1024
+MAX_SAMPLES = 5
+
+SEVERITY_NAMES = ("emergency", "alert", "critical", "error", "warning", "notice", "informational", "debug")
+
+_PRI_RE = re.compile(r"<(\d{1,3})>(?:1 )?")
+
+
+def _kernel_udp_drops(port: int) -> Optional[int]:
+    """Datagrams the kernel dropped for sockets bound to ``port`` (Linux only)."""
+    total = None
+    for table in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    columns = line.split()
+                    if int(columns[1].rsplit(":", 1)[1], 16) == port:
+                        total = (total or 0) + int(columns[-1])
+        except (OSError, ValueError, IndexError, StopIteration):
+            continue
+    return total
+
+
+class _StreamProtocol(asyncio.Protocol):
+    """
+    TCP/TLS syslog connection supporting both RFC 6587 framings:
+    octet counting ("<len> <msg>") and newline-delimited messages.
+    """
+
+    def __init__(self, receiver: "SyslogReceiver", transport_name: str):
+        self.receiver = receiver
+        self.transport_name = transport_name
+        self.buffer = bytearray()
+        self.peer = None
+
+    def connection_made(self, transport) -> None:
+        peer = transport.get_extra_info("peername")
+        self.peer = peer[0] if peer else None
+        self.receiver.stats["connections"] += 1
+
+    def data_received(self, data: bytes) -> None:
+        buffer = self.buffer
+        buffer += data
+        frames: List[bytes] = []
+        start = 0
+        end = len(buffer)
+        overflow = False
+
+        while start < end:
+            if 48 <= buffer[start] <= 57:
+                # Octet counting only when a plausible length and a space
+                # follow; anything else (e.g. a message starting with an IP
+                # address) is a newline-delimited message
+                space = buffer.find(b" ", start, start + _MAX_LENGTH_DIGITS + 1)
+                token = bytes(buffer[start:space]) if space != -1 else bytes(buffer[start:end])
+                if space == -1 and token.isdigit() and len(token) <= _MAX_LENGTH_DIGITS:
+                    break
+                if space != -1 and token.isdigit() and 0 < int(token) <= MAX_FRAME:
+                    length = int(token)
+                    if end - space - 1 < length:
+                        break
+                    frames.append(bytes(buffer[space + 1:space + 1 + length]))
+                    start = space + 1 + length
+                    continue
+            newline = buffer.find(b"\n", start)
+            if newline == -1:
+                overflow = end - start > MAX_FRAME
+                break
+            if newline > start:
+                frames.append(bytes(buffer[start:newline]))
+            start = newline + 1
+
+        # Frames parsed before an oversized one still count
+        if frames:
+            self.receiver.process(frames, self.transport_name, self.peer)
+        if overflow:
+            self._drop_garbage()
+        else:
+            del buffer[:start]
+
+    def _drop_garbage(self) -> None:
+        # Oversized framing: discard what we have and resync
+        self.receiver.stats["dropped_oversized"] += 1
+        self.buffer.clear()
+
+    def connection_lost(self, exc) -> None:
+        remainder = bytes(self.buffer).strip()
+        self.buffer.clear()
+        if remainder:
+            self.receiver.process([remainder], self.transport_name, self.peer)
+
+
+class SyslogReceiver:
+    """
+    Asyncio syslog stand-in for validating forwarding configs.
+
+    UDP sockets are drained with non-blocking ``recvfrom`` calls, up to
+    ``UDP_DRAIN_LIMIT`` datagrams per readiness event, and each drain (or
+    TCP read) is classified as one batch. Classification reuses the sample
+    log analyzer's formats, trying the previous message's format first, so
+    only counters are updated per message.
+    """
+
+    def __init__(self, kb_loader: Optional[KBLoader] = None, host: str = "127.0.0.1",
+                 udp_port: Optional[int] = DEFAULT_UDP_PORT, tcp_port: Optional[int] = DEFAULT_TCP_PORT,
+                 tls_port: Optional[int] = None, certfile: Optional[str] = None,
+                 keyfile: Optional[str] = None, expected_source: Optional[str] = None):
+        """
+        Initialize the receiver.
+
+        Args:
+            kb_loader: Loader used to validate detections against the catalog
+            host: Address to bind
+            udp_port: UDP port (None disables, 0 picks a free port)
+            tcp_port: TCP port (None disables, 0 picks a free port)
+            tls_port: TLS port (None disables); requires certfile
+            certfile: PEM certificate for the TLS listener
+            keyfile: PEM private key (defaults to certfile)
+            expected_source: Catalog slug the traffic is supposed to come from
+        """
+        if tls_port is not None and not certfile:
+            raise ValueError("A certificate file is required for the TLS listener")
+        self.kb_loader = kb_loader
+        self.host = host
+        self.requested_ports = {"udp": udp_port, "tcp": tcp_port, "tls": tls_port}
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.expected_source = expected_source
+        self.ports: Dict[str, int] = {}
+        self._servers = []
+        self._udp_sockets: List[socket.socket] = []
+        self._kernel_drop_baseline: Dict[int, int] = {}
+        self._last_format = None
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self.stats = {
+            "received": 0,
+            "bytes": 0,
+            "parsed": 0,
+            "parse_failures": 0,
+            "dropped_oversized": 0,
+            "dropped_kernel": 0,
+            "connections": 0,
+            "transports": Counter(),
+            "sources": Counter(),
+            "sourcetypes": Counter(),
+            "senders": Counter(),
+            "priorities": Counter(),
+            "failure_samples": []
+        }
+        self._started = time.monotonic()
+        self._window = (self._started, 0)
+        self._eps = 0.0
+        self._peak_eps = 0.0
+
+    # ------------------------------------------------------------------
+    # Classification
+    # ------------------------------------------------------------------
+
+    def process(self, messages: List[bytes], transport_name: str, peer: Optional[str]) -> None:
+        """
+        Classify one batch of raw syslog messages and update the counters.
+
+        Args:
+            messages: Raw message payloads (one per datagram or frame)
+            transport_name: 'udp', 'tcp' or 'tls'
+            peer: Sender address, counted per batch
+        """
+        stats = self.stats
+        last = self._last_format
+        classified: Dict[tuple, int] = {}
+        priorities: Dict[str, int] = {}
+        failures = 0
+        size = 0
+        pri_match = _PRI_RE.match
+
+        for raw in messages:
+            size += len(raw)
+            line = raw.decode("utf-8", "replace").rstrip("\r\n\x00")
+            pri = pri_match(line)
+            if pri:
+                # Count raw PRI values; they are reduced to severities on report
+                priority = pri.group(1)
+                priorities[priority] = priorities.get(priority, 0) + 1
+                line = line[pri.end():]
+
+            last = route_line(line, last)
+            fmt = last or GENERIC_SYSLOG
+            match = fmt.pattern.search(line)
+            if match is None:
+                failures += 1
+                if len(stats["failure_samples"]) < MAX_SAMPLES:
+                    stats["failure_samples"].append(line[:500])
+                continue
+            key = (fmt.source, fmt.static_sourcetype or fmt.sourcetype(match.groupdict()))
+            classified[key] = classified.get(key, 0) + 1
+
+        self._last_format = last
+        count = len(messages)
+        stats["received"] += count
+        stats["bytes"] += size
+        stats["parse_failures"] += failures
+        stats["parsed"] += count - failures
+        stats["transports"][transport_name] += count
+        if peer:
+            stats["senders"][peer] += count
+        for (source, sourcetype), hits in classified.items():
+            stats["sources"][source] += hits
+            stats["sourcetypes"][sourcetype] += hits
+        stats["priorities"].update(priorities)
+
+    # ------------------------------------------------------------------
+    # Listeners
+    # ------------------------------------------------------------------
+
+    def _bind_udp(self, port: int) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF)
+        except OSError:
+            pass
+        sock.bind((self.host, port))
+        sock.setblocking(False)
+        return sock
+
+    def _drain_udp(self, sock: socket.socket) -> None:
+        messages = []
+        peer = None
+        recvfrom = sock.recvfrom
+        for _ in range(UDP_DRAIN_LIMIT):
+            try:
+                data, address = recvfrom(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            if peer is not None and address[0] != peer:
+                self.process(messages, "udp", peer)
+                messages = []
+            peer = address[0]
+            messages.append(data)
+        if messages:
+            self.process(messages, "udp", peer)
+
+    async def start(self) -> Dict[str, int]:
+        """
+        Bind the configured listeners.
+
+        Returns:
+            Mapping of transport name to the bound port
+        """
+        loop = asyncio.get_running_loop()
+        self._reset_stats()
+
+        udp_port = self.requested_ports["udp"]
+        if udp_port is not None:
+            sock = self._bind_udp(udp_port)
+            loop.add_reader(sock.fileno(), self._drain_udp, sock)
+            self._udp_sockets.append(sock)
+            self.ports["udp"] = sock.getsockname()[1]
+            self._kernel_drop_baseline[self.ports["udp"]] = _kernel_udp_drops(self.ports["udp"]) or 0
+
+        tcp_port = self.requested_ports["tcp"]
+        if tcp_port is not None:
+            server = await loop.create_server(
+                lambda: _StreamProtocol(self, "tcp"), self.host, tcp_port, reuse_address=True
+            )
+            self._servers.append(server)
+            self.ports["tcp"] = server.sockets[0].getsockname()[1]
+
+        tls_port = self.requested_ports["tls"]
+        if tls_port is not None:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(self.certfile, self.keyfile)
+            server = await loop.create_server(
+                lambda: _StreamProtocol(self, "tls"), self.host, tls_port, ssl=context, reuse_address=True
+            )
+            self._servers.append(server)
+            self.ports["tls"] = server.sockets[0].getsockname()[1]
+
+        return dict(self.ports)
+
+    async def stop(self) -> None:
+        """Close every listener."""
+        loop = asyncio.get_running_loop()
+        # Read the kernel counters while the sockets still exist
+        self.stats["dropped_kernel"] = self._kernel_drops()
+        self._kernel_drop_baseline.clear()
+        for sock in self._udp_sockets:
+            loop.remove_reader(sock.fileno())
+            sock.close()
+        self._udp_sockets.clear()
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _update_rate(self) -> None:
+        now = time.monotonic()
+        window_start, window_count = self._window
+        elapsed = now - window_start
+        if elapsed >= 0.5:
+            self._eps = (self.stats["received"] - window_count) / elapsed
+            self._peak_eps = max(self._peak_eps, self._eps)
+            self._window = (now, self.stats["received"])
+
+    def _kernel_drops(self) -> int:
+        drops = 0
+        for port, baseline in self._kernel_drop_baseline.items():
+            current = _kernel_udp_drops(port)
+            if current is not None:
+                drops += max(current - baseline, 0)
+        return drops
+
+    def _severities(self) -> Dict[str, int]:
+        severities = Counter()
+        for priority, count in self.stats["priorities"].items():
+            severities[SEVERITY_NAMES[int(priority) & 7]] += count
+        return dict(severities)
+
+    def snapshot(self) -> Dict:
+        """
+        Current counters.
+
+        Returns:
+            Dictionary with 'received', 'parsed', 'parse_failures',
+            'parse_rate', 'dropped', 'eps', 'peak_eps', 'avg_eps', per
+            source/sourcetype/transport/sender counts and, when an expected
+            source is set, 'matches_kb'
+        """
+        self._update_rate()
+        stats = self.stats
+        uptime = time.monotonic() - self._started
+        kernel_drops = self.stats["dropped_kernel"] + self._kernel_drops()
+        sources = dict(stats["sources"])
+        detected_source = stats["sources"].most_common(1)[0][0] if sources else None
+
+        result = {
+            "ports": dict(self.ports),
+            "uptime_seconds": round(uptime, 2),
+            "received": stats["received"],
+            "bytes": stats["bytes"],
+            "parsed": stats["parsed"],
+            "parse_failures": stats["parse_failures"],
+            "parse_rate": round(stats["parsed"] / stats["received"], 4) if stats["received"] else 0.0,
+            "dropped": kernel_drops + stats["dropped_oversized"],
+            "dropped_kernel": kernel_drops,
+            "dropped_oversized": stats["dropped_oversized"],
+            "connections": stats["connections"],
+            "eps": round(self._eps, 1),
+            "peak_eps": round(self._peak_eps, 1),
+            "avg_eps": round(stats["received"] / uptime, 1) if uptime else 0.0,
+            "detected_source": detected_source,
+            "sources": sources,
+            "sourcetypes": dict(stats["sourcetypes"]),
+            "transports": dict(stats["transports"]),
+            "senders": dict(stats["senders"].most_common(10)),
+            "severities": self._severities(),
+            "failure_samples": list(stats["failure_samples"])
+        }
+
+        if self.expected_source:
+            expected_sourcetypes = []
+            if self.kb_loader is not None:
+                expected_sourcetypes = (self.kb_loader.get_source_metadata(self.expected_source) or {}).get(
+                    "sourcetypes", []
+                )
+            unexpected = sorted(
+                sourcetype for sourcetype in stats["sourcetypes"]
+                if expected_sourcetypes and sourcetype not in expected_sourcetypes
+            )
+            result["expected_source"] = self.expected_source
+            result["matches_kb"] = detected_source == self.expected_source and not unexpected
+            result["unexpected_sourcetypes"] = unexpected
+        return result
+
+    async def serve(self, duration: Optional[float] = None, interval: float = 1.0,
+                    on_report: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Start the listeners and report every ``interval`` seconds.
+
+        Args:
+            duration: Stop after this many seconds (None runs until cancelled)
+            interval: Seconds between reports
+            on_report: Called with each snapshot
+
+        Returns:
+            The final snapshot
+        """
+        await self.start()
+        deadline = None if duration is None else time.monotonic() + duration
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                await asyncio.sleep(interval if remaining is None else min(interval, remaining))
+                if on_report is not None:
+                    on_report(self.snapshot())
+        finally:
+            await self.stop()
+        return self.snapshot()
+
+
+def _print_report(snapshot: Dict) -> None:
+    top = ", ".join(f"{name}={count}" for name, count in Counter(snapshot["sourcetypes"]).most_common(3))
+    print(
+        f"[{snapshot['uptime_seconds']:>8.1f}s] eps={snapshot['eps']:>10,.0f} "
+        f"received={snapshot['received']:,} parsed={snapshot['parse_rate']:.1%} "
+        f"failures={snapshot['parse_failures']:,} dropped={snapshot['dropped']:,} {top}",
+        file=sys.stderr
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.syslog_receiver``."""
+    parser = argparse.ArgumentParser(description="Local syslog receiver for validating log forwarding.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (0.0.0.0 for all interfaces)")
+    parser.add_argument("--udp", type=int, default=DEFAULT_UDP_PORT, help="UDP port (0 disables)")
+    parser.add_argument("--tcp", type=int, default=DEFAULT_TCP_PORT, help="TCP port (0 disables)")
+    parser.add_argument("--tls", type=int, help=f"TLS port, e.g. {DEFAULT_TLS_PORT} (requires --cert)")
+    parser.add_argument("--cert", help="PEM certificate for the TLS listener")
+    parser.add_argument("--key", help="PEM private key for the TLS listener")
+    parser.add_argument("--expect", help="Catalog slug the traffic should match")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between status lines")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+
+    receiver = None
+    try:
+        receiver = SyslogReceiver(
+            KBLoader(args.kb), host=args.host,
+            udp_port=args.udp or None, tcp_port=args.tcp or None, tls_port=args.tls,
+            certfile=args.cert, keyfile=args.key, expected_source=args.expect
+        )
+        summary = asyncio.run(receiver.serve(args.duration, args.interval, _print_report))
+    except KeyboardInterrupt:
+        if receiver is None:
+            return 130
+        summary = receiver.snapshot()
+    except (OSError, ValueError, ssl.SSLError) as e:
+        print(f"Error starting syslog receiver: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(summary, indent=2))
+    return 0 if summary.get("matches_kb", True) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
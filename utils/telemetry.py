@@ -0,0 +1,419 @@
+"""
+Telemetry
+Lightweight request tracing and Prometheus metrics for the KB loader and AI
+clients, with optional OpenTelemetry export.
+"""
+
+import bisect
+import contextvars
+import functools
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Set SIEM_TELEMETRY=0 to turn spans into no-ops
+ENABLED = os.environ.get("SIEM_TELEMETRY", "1") != "0"
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with a fixed set of label names.
+
+    Observations only increment one bucket count; buckets are accumulated
+    when rendered, which keeps ``observe`` cheap enough for hot paths.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float],
+                 label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = label_names
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, labels: Tuple[str, ...] = ()) -> Dict:
+        """Count and sum of one series."""
+        with self._lock:
+            series = self._series.get(labels)
+            return {"count": series[2], "sum": series[1]} if series else {"count": 0, "sum": 0.0}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in series_items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                bucket_labels = _format_labels(self.label_names, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Process-wide collection of metrics, rendered in Prometheus text format."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, buckets: Iterable[float],
+                  label_names: Tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets, label_names))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+SPAN_SECONDS = REGISTRY.histogram(
+    "siem_span_duration_seconds", "Duration of traced operations.", SECONDS_BUCKETS, ("span", "provider"))
+LLM_TOKENS = REGISTRY.histogram(
+    "siem_llm_tokens", "Tokens per LLM request.", TOKEN_BUCKETS, ("provider", "direction"))
+LLM_REQUESTS = REGISTRY.counter(
+    "siem_llm_requests_total", "LLM requests by outcome.", ("provider", "status"))
+LLM_RETRIES = REGISTRY.counter(
+    "siem_llm_retries_total", "LLM request retries (SDK and application level).", ("provider",))
+CACHE_EVENTS = REGISTRY.counter(
+    "siem_cache_events_total", "Cache lookups by cache and result.", ("cache", "result"))
+CASCADE_ANSWERS = REGISTRY.counter(
+    "siem_cascade_answers_total", "Cascade answers by the tier that answered and why.", ("provider", "tier", "reason"))
+
+
+# ----------------------------------------------------------------------
+# Tracing
+# ----------------------------------------------------------------------
+
+class Trace:
+    """Spans recorded while handling one request (a chat turn, an API call)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        # (name, seconds, attributes, path of enclosing span names)
+        self.spans: List[Tuple[str, float, Dict, str]] = []
+        self.usage: Dict[str, int] = {}
+        self._stack: List[str] = []
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def timings(self) -> Dict[str, float]:
+        """Total seconds per span name, in first-seen order (nested spans are included in their parents)."""
+        totals: Dict[str, float] = {}
+        for name, duration, _, _ in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def tree(self) -> Dict[str, Tuple[float, int]]:
+        """Seconds and call count per span path (e.g. "tab.chat/llm.response/llm.network")."""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for _, duration, _, path in self.spans:
+            seconds, calls = totals.get(path, (0.0, 0))
+            totals[path] = (seconds + duration, calls + 1)
+        return totals
+
+    def describe(self) -> str:
+        """One-line breakdown, e.g. "kb.load 0.4 ms · llm.network 812 ms · total 815 ms"."""
+        entries = [f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.timings().items()]
+        if self.duration is not None:
+            entries.append(f"total {self.duration * 1000:.1f} ms")
+        if self.usage:
+            entries.append(" / ".join(f"{value} {key.replace('_tokens', '')}" for key, value in self.usage.items())
+                           + " tokens")
+        return " · ".join(entries)
+
+    def server_timing(self) -> str:
+        """Value for an HTTP ``Server-Timing`` header (durations in milliseconds)."""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.timings().items()]
+        if self.duration is not None:
+            entries.append(f"total;dur={self.duration * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("siem_trace", default=None)
+_otel_tracer = None
+
+
+def enable_opentelemetry(service_name: str = "siem-onboarding") -> bool:
+    """
+    Mirror spans to OpenTelemetry, if the API package is installed.
+
+    Exporters are configured the usual way (``opentelemetry-instrument`` or
+    the SDK's OTEL_* environment variables).
+
+    Returns:
+        True when OpenTelemetry export is active
+    """
+    global _otel_tracer
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        return False
+    _otel_tracer = otel_trace.get_tracer(service_name)
+    return True
+
+
+if os.environ.get("SIEM_OTEL", "0") == "1":
+    enable_opentelemetry()
+
+
+class _Span:
+    __slots__ = ("name", "provider", "attributes", "started", "_otel", "_trace")
+
+    def __init__(self, name: str, provider: str, attributes: Dict):
+        self.name = name
+        self.provider = provider
+        self.attributes = attributes
+        self._otel = None
+
+    def set(self, **attributes) -> None:
+        """Attach attributes (kept in the trace and OpenTelemetry, not in metric labels)."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "_Span":
+        if _otel_tracer is not None:
+            manager = _otel_tracer.start_as_current_span(self.name)
+            self._otel = (manager, manager.__enter__())
+        self._trace = _current_trace.get()
+        if self._trace is not None:
+            self._trace._stack.append(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self.started
+        SPAN_SECONDS.observe(duration, (self.name, self.provider))
+        current = self._trace
+        if current is not None:
+            stack = current._stack
+            current.spans.append((self.name, duration, self.attributes, "/".join(stack)))
+            # Generator spans can close out of order; drop this span's own entry
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index] == self.name:
+                    del stack[index]
+                    break
+        if self._otel is not None:
+            manager, otel_span = self._otel
+            for key, value in self.attributes.items():
+                otel_span.set_attribute(key, value)
+            if self.provider:
+                otel_span.set_attribute("provider", self.provider)
+            manager.__exit__(exc_type, exc, tb)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, provider: str = "", **attributes):
+    """
+    Time a block of work.
+
+    The duration goes to the ``siem_span_duration_seconds`` histogram
+    (labelled by name and provider only, to keep cardinality low) and to
+    the current request trace, if any.
+
+    Args:
+        name: Span name, e.g. "kb.load" or "llm.network"
+        provider: AI provider, for LLM spans
+        **attributes: Extra details kept in the trace and OpenTelemetry
+    """
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(name, provider, attributes)
+
+
+class _TraceContext:
+    def __init__(self, name: str):
+        self._trace = Trace(name)
+        self._token = None
+        self._span = span(name)
+
+    def __enter__(self) -> Trace:
+        # The request span is entered outside the trace, so it is not part of its own breakdown
+        self._span.__enter__()
+        self._trace.started = time.perf_counter()
+        self._token = _current_trace.set(self._trace)
+        return self._trace
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_trace.reset(self._token)
+        self._trace.duration = time.perf_counter() - self._trace.started
+        self._span.__exit__(exc_type, exc, tb)
+        return False
+
+
+def trace(name: str) -> _TraceContext:
+    """
+    Collect the spans of one request.
+
+    Example::
+
+        with trace("chat") as request_trace:
+            ...
+        request_trace.timings()
+    """
+    return _TraceContext(name)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def cache_event(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    if ENABLED:
+        CACHE_EVENTS.inc((cache, "hit" if hit else "miss"))
+
+
+def record_retries(provider: str, retries: int = 1) -> None:
+    if ENABLED and retries:
+        LLM_RETRIES.inc((provider,), retries)
+
+
+def record_cascade(provider: str, tier: str, reason: str) -> None:
+    if ENABLED:
+        CASCADE_ANSWERS.inc((provider, tier, reason))
+
+
+def record_llm_result(provider: str, success: bool, usage: Optional[Dict]) -> None:
+    """Count an LLM request and its token usage."""
+    if not ENABLED:
+        return
+    LLM_REQUESTS.inc((provider, "ok" if success else "error"))
+    for direction in ("input", "output"):
+        tokens = (usage or {}).get(f"{direction}_tokens")
+        if tokens is not None:
+            LLM_TOKENS.observe(tokens, (provider, direction))
+    current = _current_trace.get()
+    if current is not None and usage:
+        for key, value in usage.items():
+            if value is not None:
+                current.usage[key] = current.usage.get(key, 0) + value
+
+
+def _source_name(args: tuple, kwargs: Dict) -> str:
+    # get_response / stream_response take (question, kb_content, source_name, ...)
+    return kwargs.get("source_name", args[2] if len(args) > 2 else "")
+
+
+def traced_response(method: Callable) -> Callable:
+    """Decorate a client's ``get_response``: span, outcome, token counts and usage ledger."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> Dict:
+        started = time.perf_counter()
+        with span("llm.response", self.PROVIDER):
+            response = method(self, *args, **kwargs)
+        record_llm_result(self.PROVIDER, response["success"], response.get("usage"))
+        self._log_usage(_source_name(args, kwargs), response["success"], response["message"],
+                        response.get("usage"), time.perf_counter() - started)
+        return response
+    return wrapper
+
+
+def traced_stream(method: Callable) -> Callable:
+    """Decorate a client's ``stream_response``: time to first token, span, outcome, tokens and usage ledger."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> Iterator[Dict]:
+        started = time.perf_counter()
+        first_token = True
+        with span("llm.stream", self.PROVIDER):
+            for event in method(self, *args, **kwargs):
+                if event["type"] == "delta" and first_token:
+                    first_token = False
+                    if ENABLED:
+                        SPAN_SECONDS.observe(time.perf_counter() - started, ("llm.first_token", self.PROVIDER))
+                elif event["type"] == "done":
+                    record_llm_result(self.PROVIDER, event["success"], event.get("usage"))
+                    self._log_usage(_source_name(args, kwargs), event["success"], event["message"],
+                                    event.get("usage"), time.perf_counter() - started)
+                yield event
+    return wrapper
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format."""
+    return REGISTRY.render()
@@ -0,0 +1,370 @@
+"""
+Usage Ledger
+Append-only record of every AI call (provider, model, source, tokens,
+latency, outcome) with daily rollups for capacity planning.
+
+    python -m utils.usage_ledger --by provider day --days 7
+    python -m utils.usage_ledger --by source --oversized
+"""
+
+import argparse
+import atexit
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .kb_loader import KBLoader
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 1.0
+MAX_PENDING = 10000
+
+# Columns the rollup can be grouped by
+GROUP_COLUMNS = ("day", "provider", "model", "source", "outcome")
+OUTCOMES = ("ok", "cached", "rate_limited", "error")
+
+_COLUMNS = ("ts", "day", "provider", "model", "source", "input_tokens", "output_tokens",
+            "cached_tokens", "latency_ms", "outcome")
+
+
+def classify_outcome(success: bool, message: str = "", cached: bool = False) -> str:
+    """Ledger outcome for a client result: ok, cached, rate_limited or error."""
+    if cached:
+        return "cached"
+    if success:
+        return "ok"
+    return "rate_limited" if "rate limit" in (message or "").lower() else "error"
+
+
+class UsageLedger:
+    """
+    SQLite-backed ledger of AI calls.
+
+    ``record()`` only enqueues; a background thread writes batches in one
+    transaction, so the request path never waits on disk. Each batch also
+    updates a per-day rollup (day, provider, model, source, outcome), which
+    is what the aggregate queries read, so they stay fast however long the
+    raw ledger grows. WAL mode lets the app, the API and the batch runner
+    share one file.
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        Initialize the ledger.
+
+        Args:
+            path: SQLite database file
+            batch_size: Maximum calls written per transaction
+            flush_interval: Seconds a call may wait before its batch is written
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=MAX_PENDING)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            "ts REAL NOT NULL, day TEXT NOT NULL, provider TEXT NOT NULL, model TEXT NOT NULL, "
+            "source TEXT NOT NULL, input_tokens INTEGER, output_tokens INTEGER, cached_tokens INTEGER, "
+            "latency_ms INTEGER NOT NULL, outcome TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily ("
+            "day TEXT NOT NULL, provider TEXT NOT NULL, model TEXT NOT NULL, source TEXT NOT NULL, "
+            "outcome TEXT NOT NULL, calls INTEGER NOT NULL, input_tokens INTEGER NOT NULL, "
+            "output_tokens INTEGER NOT NULL, cached_tokens INTEGER NOT NULL, metered_calls INTEGER NOT NULL, "
+            "latency_ms INTEGER NOT NULL, max_latency_ms INTEGER NOT NULL, "
+            "PRIMARY KEY (day, provider, model, source, outcome)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._writer = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def for_loader(cls, kb_loader: KBLoader, **kwargs) -> "UsageLedger":
+        """Ledger stored in the loader's cache directory."""
+        return cls(str(kb_loader.cache_path / "usage.sqlite"), **kwargs)
+
+    def record(self, provider: str, model: str, source: str, usage: Optional[Dict],
+               latency: float, outcome: str) -> None:
+        """
+        Append one call. Never blocks; calls are dropped (and counted) if
+        the writer falls more than ``MAX_PENDING`` calls behind.
+
+        Args:
+            provider: Provider key (e.g. 'groq')
+            model: Model name
+            source: Log source display name
+            usage: Client usage dict ('input_tokens', 'output_tokens', 'cached_tokens')
+            latency: Seconds the call took
+            outcome: One of ``OUTCOMES``
+        """
+        usage = usage or {}
+        now = time.time()
+        row = (now, time.strftime("%Y-%m-%d", time.localtime(now)), provider, model or "", source or "",
+               usage.get("input_tokens"), usage.get("output_tokens"), usage.get("cached_tokens"),
+               int(latency * 1000), outcome)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every call recorded so far is on disk."""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    self._write(batch)
+                    for waiter in waiters:
+                        waiter.set()
+                    return
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, batch: List[tuple]) -> None:
+        if not batch:
+            return
+        rollup: Dict[tuple, List[int]] = {}
+        for ts, day, provider, model, source, input_tokens, output_tokens, cached_tokens, latency_ms, outcome in batch:
+            entry = rollup.setdefault((day, provider, model, source, outcome), [0, 0, 0, 0, 0, 0, 0])
+            entry[0] += 1
+            entry[1] += input_tokens or 0
+            entry[2] += output_tokens or 0
+            entry[3] += cached_tokens or 0
+            entry[4] += 1 if input_tokens is not None else 0
+            entry[5] += latency_ms
+            entry[6] = max(entry[6], latency_ms)
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO calls ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})", batch
+                )
+                self._conn.executemany(
+                    "INSERT INTO daily VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (day, provider, model, source, outcome) DO UPDATE SET "
+                    "calls = calls + excluded.calls, input_tokens = input_tokens + excluded.input_tokens, "
+                    "output_tokens = output_tokens + excluded.output_tokens, "
+                    "cached_tokens = cached_tokens + excluded.cached_tokens, "
+                    "metered_calls = metered_calls + excluded.metered_calls, "
+                    "latency_ms = latency_ms + excluded.latency_ms, "
+                    "max_latency_ms = MAX(max_latency_ms, excluded.max_latency_ms)",
+                    [key + tuple(values) for key, values in rollup.items()]
+                )
+        except sqlite3.Error as e:
+            # Usage accounting must never take the app down
+            self.dropped += len(batch)
+            print(f"Usage ledger write failed: {str(e)}", file=sys.stderr)
+
+    def aggregate(self, group_by: Sequence[str] = ("source",), since: Optional[str] = None,
+                  until: Optional[str] = None, provider: Optional[str] = None,
+                  source: Optional[str] = None) -> List[Dict]:
+        """
+        Totals from the daily rollup.
+
+        Args:
+            group_by: Any of ``GROUP_COLUMNS``
+            since: First day included (YYYY-MM-DD)
+            until: Last day included (YYYY-MM-DD)
+            provider: Only this provider
+            source: Only this source
+
+        Returns:
+            One dict per group with 'calls', 'ok', 'cached', 'rate_limited',
+            'errors', token totals, 'avg_input_tokens' (over calls that
+            reported usage), 'avg_latency_ms' and 'max_latency_ms'; most
+            calls first
+        """
+        unknown = set(group_by) - set(GROUP_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(sorted(unknown))}")
+        where, params = [], []
+        for clause, value in (("day >= ?", since), ("day <= ?", until),
+                              ("provider = ?", provider), ("source = ?", source)):
+            if value:
+                where.append(clause)
+                params.append(value)
+        columns = ", ".join(group_by)
+        outcome_sums = ", ".join(f"SUM(CASE WHEN outcome = '{outcome}' THEN calls ELSE 0 END)"
+                                 for outcome in OUTCOMES)
+        query = (
+            f"SELECT {columns + ', ' if columns else ''}SUM(calls), {outcome_sums}, "
+            "SUM(input_tokens), SUM(output_tokens), SUM(cached_tokens), SUM(metered_calls), "
+            "SUM(latency_ms), MAX(max_latency_ms) FROM daily"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + (f" GROUP BY {columns}" if columns else "")
+            + f" ORDER BY {len(group_by) + 1} DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        results = []
+        for row in rows:
+            keys, values = row[:len(group_by)], row[len(group_by):]
+            calls, ok, cached, rate_limited, errors, input_tokens, output_tokens, cached_tokens, metered, \
+                latency_ms, max_latency_ms = values
+            if not calls:
+                continue
+            results.append({
+                **dict(zip(group_by, keys)),
+                "calls": calls,
+                "ok": ok,
+                "cached": cached,
+                "rate_limited": rate_limited,
+                "errors": errors,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cached_tokens": cached_tokens,
+                "avg_input_tokens": round(input_tokens / metered) if metered else None,
+                "avg_latency_ms": round(latency_ms / calls),
+                "max_latency_ms": max_latency_ms
+            })
+        return results
+
+    def oversized_sources(self, since: Optional[str] = None, top: int = 10) -> List[Dict]:
+        """Sources with the largest prompts (mean input tokens per call), largest first."""
+        rows = [row for row in self.aggregate(("source",), since=since) if row["avg_input_tokens"]]
+        return sorted(rows, key=lambda row: row["avg_input_tokens"], reverse=True)[:top]
+
+    def quota_report(self, day: Optional[str] = None, limits: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """
+        One day's usage per provider against its daily free-tier quota.
+
+        Args:
+            day: Day to report (default: today)
+            limits: Provider info with 'requests_per_day' / 'tokens_per_day'
+                (default: ``AIClientFactory.PROVIDERS``)
+
+        Returns:
+            Rows with 'provider', 'requests', 'tokens' and the percentage of
+            each quota used (None when the provider has no daily quota)
+        """
+        if limits is None:
+            from .ai_client import AIClientFactory
+            limits = AIClientFactory.PROVIDERS
+        day = day or date.today().isoformat()
+        report = []
+        for row in self.aggregate(("provider",), since=day, until=day):
+            # Cached answers never reach the provider
+            requests = row["calls"] - row["cached"]
+            tokens = row["input_tokens"] + row["output_tokens"]
+            info = limits.get(row["provider"], {})
+            request_quota, token_quota = info.get("requests_per_day"), info.get("tokens_per_day")
+            report.append({
+                "provider": row["provider"],
+                "requests": requests,
+                "tokens": tokens,
+                "requests_per_day": request_quota,
+                "tokens_per_day": token_quota,
+                "requests_used_pct": round(100 * requests / request_quota, 1) if request_quota else None,
+                "tokens_used_pct": round(100 * tokens / token_quota, 1) if token_quota else None
+            })
+        return report
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+
+    def close(self) -> None:
+        """Write pending calls and close the database."""
+        if self._closed:
+            return
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        self._closed = True
+        with self._lock:
+            self._conn.close()
+
+
+def _print_table(rows: List[Dict], columns: Iterable[str]) -> None:
+    columns = list(columns)
+    widths = {column: max([len(column)] + [len(str(row.get(column, ""))) for row in rows]) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(str(row.get(column, "")).ljust(widths[column]) for column in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m utils.usage_ledger``."""
+    parser = argparse.ArgumentParser(description="Summarize AI token usage and latency from the usage ledger.")
+    parser.add_argument("--by", nargs="*", default=["source"], help=f"Group by any of: {', '.join(GROUP_COLUMNS)}")
+    parser.add_argument("--days", type=int, help="Only the last N days (including today)")
+    parser.add_argument("--since", help="First day included (YYYY-MM-DD)")
+    parser.add_argument("--provider", help="Only this provider")
+    parser.add_argument("--oversized", action="store_true", help="Rank sources by mean prompt size instead")
+    parser.add_argument("--quota", action="store_true", help="Today's usage against daily free-tier quotas")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    parser.add_argument("--kb", default="kb", help="Path to the knowledge base directory")
+    args = parser.parse_args(argv)
+    unknown = set(args.by) - set(GROUP_COLUMNS)
+    if unknown:
+        parser.error(f"cannot group by {', '.join(sorted(unknown))}")
+
+    path = KBLoader(args.kb).cache_path / "usage.sqlite"
+    if not path.exists():
+        print(f"No usage recorded yet ({path} does not exist).", file=sys.stderr)
+        return 1
+    ledger = UsageLedger(str(path))
+    since = args.since
+    if args.days:
+        since = (date.today() - timedelta(days=args.days - 1)).isoformat()
+
+    if args.quota:
+        rows = ledger.quota_report()
+        columns = ["provider", "requests", "requests_per_day", "requests_used_pct",
+                   "tokens", "tokens_per_day", "tokens_used_pct"]
+    elif args.oversized:
+        rows = ledger.oversized_sources(since=since)
+        columns = ["source", "avg_input_tokens", "calls", "input_tokens", "rate_limited", "errors"]
+    else:
+        rows = ledger.aggregate(args.by, since=since, provider=args.provider)
+        columns = list(args.by) + ["calls", "ok", "cached", "rate_limited", "errors", "input_tokens",
+                                   "output_tokens", "cached_tokens", "avg_input_tokens", "avg_latency_ms",
+                                   "max_latency_ms"]
+    ledger.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    elif rows:
+        _print_table(rows, columns)
+    else:
+        print("No matching usage.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())